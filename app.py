@@ -1,150 +1,210 @@
-from flask import Flask, render_template, request
+import time
+_inicio_imports = time.perf_counter()
+
+import atexit
+import hashlib
+import hmac
+import re
+from contextlib import contextmanager
+from datetime import datetime
+from urllib.parse import quote
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 from flask_socketio import SocketIO, emit
-import cv2
-import mediapipe as mp
 import numpy as np
-import joblib
-from collections import deque
-import base64
-import io
-import os
-from PIL import Image
+
+# cv2, mediapipe e PIL são importados sob demanda (pipeline.py), e o modelo
+# compilado carrega sem sklearn/joblib: a inicialização fica leve
+import config
+import metrics
+from batch_scheduler import BatchScheduler
+from export import linhas_csv, linhas_json, linhas_jsonl, linhas_txt
+from features import FeatureSpec, extrair_features, spec_do_modelo
+from forest_engine import carregar_modelo
+from frame_mailbox import FrameMailbox, somar_stats as somar_stats_mailbox
+from hands_pool import HandsPool, somar_stats
+from logs import aviso_limitado, debug_limitado, erro_limitado, esquecer, logger
+from metrics import FALHAS_MEDIAPIPE, FRAMES_DESCARTADOS, FRAMES_RECEBIDOS, TEMPO_ETAPA
+from motion_gate import MotionGate
+from pipeline import (confirmar_gesto, criar_hands, decodificar_imagem, decodificar_landmarks,
+                      reiniciar_confirmacao)
+from session_store import ClientState, criar_session_store
+from translation_log import TranslationLog
+
+# Tempo de cada etapa da inicialização (segundos), em /stats/startup
+tempos_inicializacao = {'imports': time.perf_counter() - _inicio_imports}
+
+@contextmanager
+def medir_etapa(nome):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        tempos_inicializacao[nome] = time.perf_counter() - inicio
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'libras_bridge_secret'
-socketio = SocketIO(app, cors_allowed_origins="*", max_http_buffer_size=10000000) # Aumentar buffer para imagens grandes
+# Com vários workers/nós, a fila de mensagens entrega emits feitos em outro processo
+socketio = SocketIO(app, cors_allowed_origins="*", max_http_buffer_size=10000000, # Aumentar buffer para imagens grandes
+                    message_queue=config.MESSAGE_QUEUE_URL or None)
 
 # Carregar modelo
-try:
-    modelo = joblib.load("modelo_libras.pkl")
-    print("[INFO] Modelo carregado com sucesso!")
-except Exception as e:
-    print(f"[ERRO] Falha ao carregar modelo: {e}")
-    print("[AVISO] Modelo não encontrado ou erro de compatibilidade. Execute treinamento.py primeiro.")
-    modelo = None
-
-# Configuração MediaPipe
-mp_hands = mp.solutions.hands
-mp_draw = mp.solutions.drawing_utils
-
-# Inicialização do MediaPipe com tratamento de erro
-hands = None
-try:
-    hands = mp_hands.Hands(
-        static_image_mode=False,
-        max_num_hands=1,
-        min_detection_confidence=0.7,
-        min_tracking_confidence=0.5,
-        model_complexity=0
-    )
-    print("[INFO] MediaPipe inicializado.")
-except Exception as e:
-    print(f"[ERRO] Falha fatal ao inicializar MediaPipe: {e}")
+modelo = None
+feature_spec = FeatureSpec()  # Features com que o modelo foi treinado (features.py)
+_modelo_carregado = False
+
+def obter_modelo():
+    """Retorna o modelo, carregando-o na primeira chamada"""
+    global modelo, feature_spec, _modelo_carregado
+    if _modelo_carregado:
+        return modelo
+    _modelo_carregado = True
+
+    with medir_etapa('modelo'):
+        try:
+            modelo = carregar_modelo(config.MODEL_PATH, config.MODEL_ARTIFACT_PATH)
+            print("[INFO] Modelo carregado com sucesso!")
+        except Exception as e:
+            print(f"[ERRO] Falha ao carregar modelo: {e}")
+            print("[AVISO] Modelo não encontrado ou erro de compatibilidade. Execute treinamento.py primeiro.")
+            modelo = None
+
+    feature_spec = spec_do_modelo(modelo)
+    clip_size_modelo = getattr(modelo, 'clip_size', None)
+    if clip_size_modelo and clip_size_modelo != config.CLIP_SIZE:
+        print(f"[AVISO] Modelo treinado com clips de {clip_size_modelo} frames, "
+              f"mas CLIP_SIZE = {config.CLIP_SIZE}")
+    return modelo
+
+if not config.LAZY_STARTUP:
+    obter_modelo()
+
+# Pool de processos: MediaPipe e modelo rodam nos workers, não neste processo.
+# (__mp_main__ é este módulo reimportado dentro de um worker via spawn)
+worker_pool = None
+if config.EXECUTION_MODE == 'process_pool' and __name__ != '__mp_main__':
+    from worker_pool import FrameWorkerPool
+    with medir_etapa('pool_processos'):
+        worker_pool = FrameWorkerPool(config.MODEL_PATH, config.NUM_WORKERS, socketio.async_mode,
+                                      config.HANDS_POOL_SIZE, config.HANDS_IDLE_TIMEOUT,
+                                      config.MODEL_ARTIFACT_PATH, config.GATE_ENABLED,
+                                      config.ROI_ENABLED)
+
+# Um rastreador Hands por sessão, num pool limitado (modo inline)
+hands_pool = None
+if worker_pool is None:
+    hands_pool = HandsPool(criar_hands, config.HANDS_POOL_SIZE, config.HANDS_IDLE_TIMEOUT,
+                           MotionGate.da_config if config.GATE_ENABLED else None,
+                           config.ROI_ENABLED)
 
 # ==========================================
 # Gerenciamento de Estado por Cliente (Mobile/Web)
 # ==========================================
-class ClientState:
-    def __init__(self):
-        self.clip_size = 30
-        self.frames_clip = deque(maxlen=self.clip_size)
-        self.ultimo_gesto = None
-        self.confirmacoes = 0
-        self.last_hand_detected = False
+# Estado das sessões no backend configurado (session_store.py)
+session_store = criar_session_store()
+client_keys = {}  # sid -> identificador persistente do cliente (conexões deste processo)
+sids_conectados = set()  # Conexões abertas neste processo
 
-client_states = {}
+def get_client_key(sid):
+    return client_keys.get(sid, sid)
 
-def get_client_state():
-    sid = request.sid
-    if sid not in client_states:
-        client_states[sid] = ClientState()
-    return client_states[sid]
+def get_client_state(sid=None):
+    chave = get_client_key(sid or request.sid)
+    state = session_store.get(chave)
+    if state is None:
+        state = ClientState(chave)
+        session_store.save(chave, state)
+    return state
 
 # ==========================================
 # Lógica de Processamento (Reutilizável)
 # ==========================================
-def process_frame_logic(frame, state):
-    global hands
-    
-    # Se hands não estiver inicializado, tentar recuperar (ou retornar vazio)
-    if hands is None:
-        try:
-            print("[INFO] Tentando inicializar MediaPipe sob demanda...")
-            hands = mp_hands.Hands(
-                static_image_mode=False,
-                max_num_hands=1,
-                min_detection_confidence=0.7,
-                min_tracking_confidence=0.5,
-                model_complexity=0
-            )
-        except Exception as e:
-            print(f"[ERRO] Falha na inicialização sob demanda: {e}")
-            return {
-                'gesto': None,
-                'confianca': 0,
-                'frames_coletados': 0,
-                'hand_detected': False
-            }
+def aplicar_predicao(state, gesto_predito):
+    """Atualiza as confirmações do cliente e retorna (gesto, confiança)"""
+    metrics.PREDICOES.inc(gesto=gesto_predito)
+    gesto, confianca = confirmar_gesto(state, gesto_predito)
+    if gesto is not None:
+        metrics.GESTOS_CONFIRMADOS.inc(gesto=gesto)
+        # Só a confirmação (não cada predição seguinte igual) vai para o registro
+        if translation_log is not None and state.confirmacoes == config.NUM_CONFIRMATIONS:
+            if not translation_log.registrar(state.client_key, gesto, confianca):
+                aviso_limitado('registro_cheio', "Fila do registro de traduções cheia; tradução descartada")
+    return gesto, confianca
+
+def prever(entrada):
+    """Executa o modelo no pool de processos, se ativo, ou localmente"""
+    with TEMPO_ETAPA.time(etapa='predicao'):
+        if worker_pool is not None:
+            return worker_pool.predict(entrada)
+        return obter_modelo().predict(entrada)
 
-    # Redimensionar se necessário para consistência
-    if frame.shape[1] > 320:
-        frame = cv2.resize(frame, (320, 240))
+def process_frame_logic(frame, state, inline_predict=True):
+    """Processa um frame BGR (OpenCV)"""
+    import cv2
 
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    with TEMPO_ETAPA.time(etapa='conversao_cor'):
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return process_rgb_logic(rgb, state, inline_predict)
+
+def process_rgb_logic(rgb, state, inline_predict=True):
+    """Processa um frame RGB: MediaPipe no rastreador da sessão + classificação"""
+    chave = state.client_key
     
+    # Rastreador da sessão (criado sob demanda)
     try:
-        results = hands.process(rgb)
+        tracker = hands_pool.acquire(chave)
     except Exception as e:
-        print(f"[ERRO] Falha no processamento do MediaPipe: {e}")
-        # Tentar reiniciar o detector em caso de erro de contexto GL
-        try:
-            hands.close()
-            hands = mp_hands.Hands(
-                static_image_mode=False,
-                max_num_hands=1,
-                min_detection_confidence=0.7,
-                min_tracking_confidence=0.5,
-                model_complexity=0
-            )
-        except:
-            pass
-        return {
-            'gesto': None,
-            'confianca': 0,
-            'frames_coletados': 0,
-            'hand_detected': False
-        }
+        FALHAS_MEDIAPIPE.inc(tipo='inicializacao')
+        erro_limitado('mediapipe_init', f"Falha na inicialização do MediaPipe: {e}")
+        return resultado_vazio()
+
+    try:
+        with TEMPO_ETAPA.time(etapa='mediapipe'):
+            coords = tracker.process(rgb)
+    except Exception as e:
+        FALHAS_MEDIAPIPE.inc(tipo='processamento')
+        erro_limitado('mediapipe_process', f"Falha no processamento do MediaPipe: {e}")
+        # Descartar o detector em caso de erro de contexto GL;
+        # o próximo frame da sessão recebe uma instância nova
+        hands_pool.discard(chave)
+        return resultado_vazio()
     
+    return process_landmarks_logic(coords, state, inline_predict)
+
+def process_landmarks_logic(coords, state, inline_predict=True):
+    """Adiciona os landmarks do frame ao clip do cliente e classifica se pronto"""
     gesto_atual = None
     confianca = 0
     
-    if results.multi_hand_landmarks:
+    if coords is not None:
         state.last_hand_detected = True
-        for hand_landmarks in results.multi_hand_landmarks:
-            coords = []
-            for lm in hand_landmarks.landmark:
-                coords.extend([lm.x, lm.y, lm.z])
-            state.frames_clip.append(coords)
+        state.frames_clip.append(coords)
     else:
+        if state.last_hand_detected:
+            # A mão saiu: repetir o gesto depois da pausa é uma tradução nova
+            reiniciar_confirmacao(state)
         state.last_hand_detected = False
     
-    # Predição
-    if len(state.frames_clip) == state.clip_size and modelo is not None:
+    # Predição: janela cheia e FRAME_SKIP frames novos desde a última
+    if state.frames_clip.pronto(config.FRAME_SKIP) and obter_modelo() is not None:
+        state.frames_clip.marcar_predicao()
+        # Com features brutas, é uma view do buffer (sem cópia)
+        with TEMPO_ETAPA.time(etapa='features'):
+            entrada = extrair_features(state.frames_clip.window(), feature_spec)
+        if not inline_predict:
+            # A predição será feita pelo agendador de lote; copiar, pois o
+            # buffer continua recebendo frames até o lote ser executado
+            return {
+                'gesto': None,
+                'confianca': 0,
+                'frames_coletados': len(state.frames_clip),
+                'hand_detected': state.last_hand_detected,
+                'entrada': entrada.copy()
+            }
         try:
-            entrada = np.array(state.frames_clip).flatten().reshape(1, -1)
-            gesto_predito = modelo.predict(entrada)[0]
-            
-            if gesto_predito == state.ultimo_gesto:
-                state.confirmacoes += 1
-            else:
-                state.confirmacoes = 1
-                state.ultimo_gesto = gesto_predito
-            
-            if state.confirmacoes >= 2:
-                gesto_atual = gesto_predito
-                confianca = min(state.confirmacoes * 30, 95)
+            gesto_predito = prever(entrada)[0]
+            gesto_atual, confianca = aplicar_predicao(state, gesto_predito)
         except Exception as e:
-            print(f"[ERRO] Predição: {e}")
+            erro_limitado('predicao', f"Predição: {e}")
             
     return {
         'gesto': gesto_atual,
@@ -153,25 +213,108 @@ def process_frame_logic(frame, state):
         'hand_detected': state.last_hand_detected
     }
 
+def resultado_vazio():
+    return {
+        'gesto': None,
+        'confianca': 0,
+        'frames_coletados': 0,
+        'hand_detected': False
+    }
+
 # ==========================================
 # Startup Check
 # ==========================================
 def check_mediapipe():
     print("[INFO] Verificando MediaPipe...")
-    if hands is None:
-        print("[ERRO] MediaPipe não foi inicializado.")
+    if worker_pool is not None:
+        print("[INFO] Modo process_pool: MediaPipe será inicializado em cada worker.")
         return
 
     try:
+        hands = criar_hands()
         dummy_frame = np.zeros((240, 320, 3), dtype=np.uint8)
         results = hands.process(dummy_frame)
+        hands.close()
         print("[INFO] MediaPipe inicializado com sucesso (teste de inferência ok)")
     except Exception as e:
         print(f"[ERRO] Falha na verificação do MediaPipe: {e}")
 
-# Executar verificação na inicialização
-with app.app_context():
-    check_mediapipe()
+# Executar verificação na inicialização (não nos workers do pool);
+# com LAZY_STARTUP o MediaPipe é carregado no primeiro frame
+if __name__ != '__mp_main__' and not config.LAZY_STARTUP:
+    with app.app_context(), medir_etapa('warmup_mediapipe'):
+        check_mediapipe()
+
+# ==========================================
+# Inferência em Lote
+# ==========================================
+def emitir_resultado_lote(item, gesto_predito):
+    """Aplica a predição do lote ao estado do cliente e envia ao socket"""
+    sid, state = item['sid'], item['state']
+    if sid not in sids_conectados:
+        # Desconectou com o clip no lote: regravar o estado o traria de volta
+        # ao store depois do release
+        return
+
+    gesto_atual, confianca = None, 0
+    # start_camera pode ter trocado o estado enquanto o clip estava no lote;
+    # a predição do clip antigo não vale para o estado novo
+    if gesto_predito is not None and session_store.get(state.client_key) is state:
+        gesto_atual, confianca = aplicar_predicao(state, gesto_predito)
+        session_store.save(state.client_key, state)
+
+    resposta = {
+        'gesto': gesto_atual,
+        'confianca': confianca,
+        'hand_detected': item['extra'].get('hand_detected', False)
+    }
+    if item['extra'].get('seq') is not None:
+        resposta['seq'] = item['extra']['seq']
+    socketio.emit('frame_processed', resposta, to=sid)
+
+batch_scheduler = None
+if config.BATCH_INFERENCE:
+    batch_scheduler = BatchScheduler(
+        predict_fn=prever,
+        on_result=emitir_resultado_lote,
+        window_ms=config.BATCH_WINDOW_MS,
+        max_batch=config.BATCH_MAX_SIZE,
+        sleep_fn=socketio.sleep
+    )
+
+# Registro das traduções de cada sessão (SQLite, gravação em lotes em background)
+translation_log = None
+if config.TRANSLATION_LOG_ENABLED and __name__ != '__mp_main__':
+    translation_log = TranslationLog(sleep_fn=socketio.sleep, async_mode=socketio.async_mode)
+    atexit.register(translation_log.fechar)
+
+def iniciar_agendador():
+    """Inicia o agendador de lote e o registro de traduções (apenas uma vez por processo)"""
+    if batch_scheduler is not None and not batch_scheduler.running:
+        batch_scheduler.running = True
+        socketio.start_background_task(batch_scheduler.run)
+    if translation_log is not None and not translation_log.running:
+        translation_log.running = True
+        socketio.start_background_task(translation_log.run)
+
+# Métricas lidas na hora da coleta (/metrics)
+def _stats_hands():
+    if worker_pool is not None:
+        return somar_stats(worker_pool.hands_stats())
+    return hands_pool.get_stats()
+
+metrics.REGISTRO.registrar(metrics.Counter(
+    'libras_mediapipe_recriacoes_total', 'Instâncias do Hands recriadas após erro',
+    funcao=lambda: _stats_hands()['recriados']))
+metrics.REGISTRO.registrar(metrics.Gauge(
+    'libras_mediapipe_instancias', 'Instâncias do Hands vivas',
+    funcao=lambda: _stats_hands()['ativos']))
+metrics.REGISTRO.registrar(metrics.Gauge(
+    'libras_lote_pendentes', 'Clips aguardando o agendador de lote',
+    funcao=lambda: batch_scheduler.pending() if batch_scheduler is not None else 0))
+metrics.REGISTRO.registrar(metrics.Gauge(
+    'libras_traducoes_pendentes', 'Traduções aguardando gravação no registro',
+    funcao=lambda: translation_log.pending() if translation_log is not None else 0))
 
 # ==========================================
 # Rotas e Eventos
@@ -180,71 +323,301 @@ with app.app_context():
 def index():
     return render_template('index.html')
 
+@app.route('/metrics')
+def metrics_endpoint():
+    """Métricas no formato de texto do Prometheus"""
+    return Response(metrics.REGISTRO.exportar(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/stats/batch')
+def batch_stats():
+    if batch_scheduler is None:
+        return jsonify({'ativo': False})
+    return jsonify(dict(batch_scheduler.get_stats(), ativo=True))
+
+@app.route('/stats/startup')
+def startup_stats():
+    return jsonify({etapa: segundos * 1000 for etapa, segundos in tempos_inicializacao.items()})
+
+@app.route('/stats/hands')
+def hands_stats():
+    # ?sessoes=1 inclui os contadores de cada sessão (frames pulados, etc.)
+    por_sessao = request.args.get('sessoes') == '1'
+    if worker_pool is not None:
+        return jsonify(somar_stats(worker_pool.hands_stats(por_sessao)))
+    return jsonify(hands_pool.get_stats(por_sessao))
+
+@app.route('/stats/mailbox')
+def mailbox_stats():
+    return jsonify(dict(somar_stats_mailbox(mailboxes.values()), ativo=config.BACKPRESSURE))
+
+@app.route('/stats/sessions')
+def sessions_stats():
+    return jsonify(session_store.get_stats())
+
+@app.route('/stats/translations')
+def translations_stats():
+    if translation_log is None:
+        return jsonify({'ativo': False})
+    return jsonify(dict(translation_log.get_stats(), ativo=True))
+
+FORMATOS_EXPORT = {
+    'csv': 'text/csv',
+    'json': 'application/json',
+    'jsonl': 'application/x-ndjson',
+    'txt': 'text/plain',
+}
+
+def token_export(chave):
+    """Token do export de uma sessão, entregue só à conexão dona dela"""
+    return hmac.new(app.config['SECRET_KEY'].encode(), chave.encode(), hashlib.sha256).hexdigest()
+
+@app.route('/export/<sessao>')
+def export_sessao(sessao):
+    """
+    Histórico de traduções da sessão (?formato=csv|json|jsonl|txt&token=...),
+    nos formatos de export.py; lido do SQLite em blocos e enviado aos poucos.
+    O token vem no evento 'export' da conexão da própria sessão.
+    """
+    if translation_log is None:
+        return jsonify({'erro': 'Registro de traduções desativado (TRANSLATION_LOG_ENABLED)'}), 404
+    if not hmac.compare_digest(request.args.get('token', ''), token_export(sessao)):
+        return jsonify({'erro': 'Token de export inválido para esta sessão'}), 403
+    formato = request.args.get('formato', 'csv')
+    if formato not in FORMATOS_EXPORT:
+        return jsonify({'erro': f"Formato deve ser um de: {', '.join(FORMATOS_EXPORT)}"}), 400
+
+    itens = translation_log.iterar(sessao)
+    if formato == 'csv':
+        corpo = linhas_csv(itens)
+    elif formato == 'jsonl':
+        corpo = linhas_jsonl(itens)
+    elif formato == 'txt':
+        corpo = linhas_txt(itens)
+    else:
+        corpo = linhas_json(itens, {
+            'sessao': sessao,
+            'total_traducoes': translation_log.contar(sessao),
+            'exportado_em': datetime.now().isoformat(),
+            'sistema': 'Libras Bridge v1.0'
+        })
+    nome = re.sub(r'[^\w.-]', '_', sessao)
+    return Response(stream_with_context(corpo), mimetype=FORMATOS_EXPORT[formato],
+                    headers={'Content-Disposition': f'attachment; filename="traducoes_{nome}.{formato}"'})
+
 @socketio.on('connect')
-def handle_connect():
-    print(f'[INFO] Cliente conectado: {request.sid}')
+def handle_connect(auth=None):
+    logger.info(f'Cliente conectado: {request.sid}')
+    metrics.SESSOES_ATIVAS.inc()
+    sids_conectados.add(request.sid)
+    # O navegador envia um id persistente para reaproveitar o rastreador na
+    # reconexão. Se outra conexão aberta já usa o id (aba duplicada copia o
+    # sessionStorage, ou um cliente reusa o id de outro), esta fica com o sid:
+    # duas conexões nunca dividem o mesmo estado e rastreador
+    if isinstance(auth, dict) and auth.get('client_id'):
+        chave = str(auth['client_id'])[:64]
+        if chave in client_keys.values() or chave in sids_conectados:
+            aviso_limitado('client_id_em_uso', f"client_id já usado por outra conexão; {request.sid} usa o sid")
+        else:
+            client_keys[request.sid] = chave
+    iniciar_agendador()
     emit('status', {'message': 'Conectado ao servidor'})
+    chave = get_client_key(request.sid)
+    emit('export', {'url': f"/export/{quote(chave, safe='')}?token={token_export(chave)}"})
+    emit('rate_hint', {'intervalo_ms': config.FRAME_INTERVAL_MS})
 
 @socketio.on('disconnect')
 def handle_disconnect():
-    print(f'[INFO] Cliente desconectado: {request.sid}')
-    if request.sid in client_states:
-        del client_states[request.sid]
+    logger.info(f'Cliente desconectado: {request.sid}')
+    metrics.SESSOES_ATIVAS.dec()
+    sids_conectados.discard(request.sid)
+    esquecer(request.sid)
+    caixa = mailboxes.pop(request.sid, None)
+    if caixa is not None:
+        caixa.fechar()
+
+    # Manter o rastreador disponível para reconexão até expirar por ociosidade
+    # (e, com backend compartilhado, o estado da sessão até SESSION_TTL)
+    chave = client_keys.pop(request.sid, request.sid)
+    session_store.release(chave)
+    if worker_pool is not None:
+        worker_pool.release(chave)
+    else:
+        hands_pool.release(chave)
 
 @socketio.on('start_camera')
 def handle_start_camera():
     sid = request.sid
-    print(f'[INFO] Iniciando câmera para: {sid}')
+    logger.info(f'Iniciando câmera para: {sid}')
     # Reiniciar estado do cliente
-    client_states[sid] = ClientState()
+    chave = get_client_key(sid)
+    session_store.save(chave, ClientState(chave))
 
 @socketio.on('stop_camera')
 def handle_stop_camera():
     sid = request.sid
-    print(f'[INFO] Parando câmera para: {sid}')
-    if sid in client_states:
+    logger.info(f'Parando câmera para: {sid}')
+    state = session_store.get(get_client_key(sid))
+    if state is not None:
         # Opcional: limpar buffer ou manter histórico
-        client_states[sid].frames_clip.clear()
+        state.frames_clip.clear()
+        reiniciar_confirmacao(state)
+        session_store.save(state.client_key, state)
 
-@socketio.on('process_frame_web')
-def handle_process_frame(data):
-    try:
-        # Debug simples para verificar se está chegando
-        print(f"Frame recebido: {len(data['image'])} bytes")
+# ==========================================
+# Contrapressão: um frame pendente por sessão
+# ==========================================
+mailboxes = {}  # sid -> FrameMailbox
 
-        image_data = base64.b64decode(data['image'])
-        image = Image.open(io.BytesIO(image_data))
-        
-        # DEBUG: Verificar imagem
-        # print(f"Imagem decodificada: {image.size} modo={image.mode}")
+def receber_imagem(imagem, seq=None):
+    """Entrega o frame à caixa da sessão (ou processa direto, sem contrapressão)"""
+    sid = request.sid
+    FRAMES_RECEBIDOS.inc(tipo='imagem')
+    if not config.BACKPRESSURE:
+        processar_imagem(imagem, get_client_state(sid), sid, seq)
+        return
 
-        frame = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-        
-        # Processamento
-        state = get_client_state()
-        result = process_frame_logic(frame, state)
-        
-        # Debug se detectou mão
-        if result['hand_detected']:
-             print(f"[DEBUG] Mão detectada! Gesto: {result['gesto']} Confiança: {result['confianca']} Frames: {result['frames_coletados']}/{state.clip_size}")
-             if modelo is None:
-                 print("[AVISO] Modelo não carregado! Predição impossível.")
+    caixa = mailboxes.get(sid)
+    if caixa is None:
+        caixa = mailboxes[sid] = FrameMailbox(config.FRAME_INTERVAL_MS, config.FRAME_INTERVAL_MAX_MS,
+                                              config.RATE_HINT_FACTOR)
+    descartados = caixa.descartados
+    if caixa.depositar((imagem, seq)):
+        socketio.start_background_task(consumir_mailbox, sid, caixa)
+    elif caixa.descartados > descartados:
+        FRAMES_DESCARTADOS.inc()
+
+def consumir_mailbox(sid, caixa):
+    """Processa sempre o frame mais recente da sessão até a caixa esvaziar"""
+    while True:
+        # Ceder ao loop: handlers pendentes depositam seus frames (e
+        # substituem o atual) antes de o processamento começar
+        socketio.sleep(0)
+        item = caixa.retirar()
+        if item is None:
+            return
+        (imagem, seq), chegada = item
+        TEMPO_ETAPA.observe(time.perf_counter() - chegada, etapa='espera')
+        state = get_client_state(sid)
+        try:
+            processar_imagem(imagem, state, sid, seq)
+        except Exception as e:
+            erro_limitado('frame', f"Processamento de frame: {e}")
+        if caixa.fechada:
+            # Desconectou durante o processamento: não reter o estado regravado
+            session_store.release(state.client_key)
+            return
+        intervalo = caixa.registrar(chegada)
+        if intervalo is not None:
+            socketio.emit('rate_hint', {'intervalo_ms': intervalo}, to=sid)
+
+def processar_imagem(imagem, state, sid, seq=None):
+    """Decodifica um JPEG (bytes ou base64), processa e envia o resultado"""
+    with TEMPO_ETAPA.time(etapa='frame'):
+        inline_predict = batch_scheduler is None
+
+        if worker_pool is not None:
+            # Decodificação e MediaPipe rodam num processo do pool
+            with TEMPO_ETAPA.time(etapa='worker'):
+                saida = worker_pool.process_frame(state.client_key, imagem)
+            if saida['ok']:
+                result = process_landmarks_logic(saida['coords'], state, inline_predict)
+            else:
+                FALHAS_MEDIAPIPE.inc(tipo='worker')
+                result = resultado_vazio()
+        else:
+            # Decodifica direto para RGB, sem passar por BGR
+            with TEMPO_ETAPA.time(etapa='decodificacao'):
+                rgb = decodificar_imagem(imagem)
+            result = process_rgb_logic(rgb, state, inline_predict)
         
-        # Enviar resultado
-    emit('frame_processed', {
+        enviar_resultado(result, state, sid, seq)
+
+def enviar_resultado(result, state, sid, seq=None):
+    """
+    Envia o resultado ao cliente (ou delega ao agendador de lote).
+    seq: número do frame enviado pelo cliente, devolvido na resposta
+    (permite medir a latência de ida e volta de cada frame)
+    """
+    # Debug se detectou mão (no máximo uma linha por sessão a cada LOG_RATE_LIMIT_S)
+    if result['hand_detected']:
+         debug_limitado(('mao', sid), f"Mão detectada! Gesto: {result['gesto']} Confiança: {result['confianca']} Frames: {result['frames_coletados']}/{state.clip_size}")
+         if obter_modelo() is None:
+             aviso_limitado('sem_modelo', "Modelo não carregado! Predição impossível.")
+    
+    # Publicar o estado atualizado (no-op prático no backend em memória)
+    session_store.save(state.client_key, state)
+    
+    # Clip pronto: o resultado será enviado pelo agendador de lote
+    if 'entrada' in result:
+        batch_scheduler.submit(sid, state, result['entrada'],
+                               {'hand_detected': result['hand_detected'], 'seq': seq})
+        return
+
+    # Enviar resultado
+    resposta = {
         'gesto': result['gesto'],
         'confianca': result['confianca'],
         'hand_detected': result['hand_detected']
-    })
-        
+    }
+    if seq is not None:
+        resposta['seq'] = seq
+    socketio.emit('frame_processed', resposta, to=sid)
+
+@socketio.on('process_frame_web')
+def handle_process_frame(data):
+    """Frame JPEG em base64 (protocolo original, mantido por compatibilidade)"""
+    try:
+        # Debug simples para verificar se está chegando
+        debug_limitado(('frame', request.sid), f"Frame recebido: {len(data['image'])} bytes")
+        receber_imagem(data['image'], data.get('seq'))
     except Exception as e:
-        print(f"[ERRO] Processamento de frame: {e}")
-        pass
+        erro_limitado('frame', f"Processamento de frame: {e}")
+
+@socketio.on('process_frame_binary')
+def handle_process_frame_binary(data):
+    """Frame JPEG binário (Blob/ArrayBuffer), sem a inflação do base64"""
+    try:
+        seq = None
+        if isinstance(data, dict):
+            seq = data.get('seq')
+            data = data.get('image')
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            erro_limitado('frame_binario_tipo', "process_frame_binary espera bytes JPEG")
+            return
+        receber_imagem(data, seq)
+    except Exception as e:
+        erro_limitado('frame_binario', f"Processamento de frame binário: {e}")
+
+@socketio.on('process_landmarks')
+def handle_process_landmarks(data):
+    """
+    Landmarks já extraídos no dispositivo do cliente: 21x3 float32
+    (252 bytes). Pula decodificação de imagem e MediaPipe no servidor.
+    """
+    FRAMES_RECEBIDOS.inc(tipo='landmarks')
+    try:
+        with TEMPO_ETAPA.time(etapa='landmarks'):
+            seq = None
+            if isinstance(data, dict):
+                seq = data.get('seq')
+                data = data.get('landmarks', b'')
+            coords = decodificar_landmarks(data)
+            state = get_client_state()
+            result = process_landmarks_logic(coords, state, batch_scheduler is None)
+            enviar_resultado(result, state, request.sid, seq)
+    except Exception as e:
+        erro_limitado('landmarks', f"Processamento de landmarks: {e}")
 
     
     
+# Resumo do cold start
+tempos_inicializacao['total'] = time.perf_counter() - _inicio_imports
+if __name__ != '__mp_main__':
+    print("[INFO] Inicialização: " + " | ".join(
+        f"{etapa} {segundos * 1000:.0f}ms" for etapa, segundos in tempos_inicializacao.items()))
+
 if __name__ == '__main__':
     print("[INFO] Iniciando servidor Libras Bridge...")
-    print("[INFO] Acesse (Web): http://localhost:5000")
+    print(f"[INFO] Acesse (Web): http://localhost:{config.SERVER_PORT}")
         
-    socketio.run(app, debug=False, host='0.0.0.0', port=5000)
\ No newline at end of file
+    socketio.run(app, debug=False, host=config.SERVER_HOST, port=config.SERVER_PORT)
\ No newline at end of file
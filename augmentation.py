@@ -0,0 +1,158 @@
+"""
+Aumento de dados dos clips de landmarks do Libras Bridge
+Gera lotes aumentados sob demanda (nada é gravado em disco), com cada
+transformação aplicada ao lote inteiro em operações vetorizadas do NumPy:
+
+- espelhamento horizontal (sinalizantes canhotos)
+- ruído nas coordenadas
+- escala e rotação em torno do centro da mão no clip
+- distorção temporal (o gesto acelera ou desacelera ao longo do clip)
+
+Os sorteios vêm de um np.random.Generator com seed, então a mesma seed
+gera os mesmos lotes.
+
+Uso:
+    python augmentation.py [--lote 256] [--lotes 50] [--seed 0]   # vazão em clips/s
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import config
+from features import NUM_LANDMARKS
+
+
+class Aumentador:
+    def __init__(self, espelhar=None, ruido=None, escala=None, rotacao_graus=None,
+                 distorcao_tempo=None, seed=None):
+        self.espelhar = config.AUG_MIRROR_PROB if espelhar is None else espelhar
+        self.ruido = config.AUG_JITTER_STD if ruido is None else ruido
+        self.escala = config.AUG_SCALE if escala is None else escala
+        self.rotacao = np.deg2rad(config.AUG_ROTATION_DEG if rotacao_graus is None else rotacao_graus)
+        self.distorcao_tempo = config.AUG_TIME_WARP if distorcao_tempo is None else distorcao_tempo
+        # x e y são normalizados pela largura e pela altura: a rotação é feita
+        # em unidades proporcionais ao pixel
+        self.aspecto = config.CAMERA_WIDTH / config.CAMERA_HEIGHT
+        self.rng = np.random.default_rng(seed)
+        self.clips_gerados = 0
+        self.tempo_s = 0.0
+
+    def distorcer_tempo(self, pontos):
+        """t -> t + a*t*(1-t), com a sorteado por clip (|a| < 1 mantém a ordem)"""
+        n, T = pontos.shape[:2]
+        u = np.linspace(0, 1, T, dtype=np.float32)
+        a = self.rng.uniform(-self.distorcao_tempo, self.distorcao_tempo, (n, 1)).astype(np.float32)
+        t = (u + a * u * (1 - u)) * (T - 1)
+        i0 = np.minimum(np.floor(t).astype(np.intp), T - 2)
+        # i0 é inteiro: sem o cast, t - i0 promoveria o lote inteiro a float64
+        peso = (t - i0.astype(np.float32)).reshape(n * T, 1)
+        # Índices no lote achatado (n*T frames): um único gather por vizinho
+        i0 = (i0 + np.arange(n)[:, np.newaxis] * T).ravel()
+        frames = pontos.reshape(n * T, -1)
+        return (frames[i0] * (1 - peso) + frames[i0 + 1] * peso).reshape(pontos.shape)
+
+    def aplicar(self, clips):
+        """(n, T, 63) -> (n, T, 63) float32 aumentado"""
+        inicio = time.perf_counter()
+        clips = np.asarray(clips, dtype=np.float32)
+        n, T = clips.shape[:2]
+        pontos = clips.reshape(n, T, NUM_LANDMARKS, 3)
+
+        if self.distorcao_tempo > 0 and T > 2:
+            pontos = self.distorcer_tempo(pontos)
+        else:
+            pontos = pontos.copy()
+
+        if self.espelhar > 0:
+            espelhados = self.rng.random(n) < self.espelhar
+            pontos[espelhados, :, :, 0] = 1.0 - pontos[espelhados, :, :, 0]
+
+        if self.escala > 0 or self.rotacao > 0:
+            # Escala e rotação em torno do centro da mão no clip
+            x = pontos[..., 0] * self.aspecto
+            y = pontos[..., 1]
+            cx = x.mean(axis=(1, 2), keepdims=True)
+            cy = y.mean(axis=(1, 2), keepdims=True)
+            angulo = self.rng.uniform(-self.rotacao, self.rotacao, (n, 1, 1))
+            fator = self.rng.uniform(1 - self.escala, 1 + self.escala, (n, 1, 1)).astype(np.float32)
+            cos = (np.cos(angulo) * fator).astype(np.float32)
+            sen = (np.sin(angulo) * fator).astype(np.float32)
+            dx, dy = x - cx, y - cy
+            pontos[..., 0] = (cos * dx - sen * dy + cx) / self.aspecto
+            pontos[..., 1] = sen * dx + cos * dy + cy
+            pontos[..., 2] *= fator
+
+        if self.ruido > 0:
+            pontos += self.rng.standard_normal(pontos.shape, dtype=np.float32) * np.float32(self.ruido)
+
+        self.clips_gerados += n
+        self.tempo_s += time.perf_counter() - inicio
+        return pontos.reshape(n, T, -1)
+
+    @property
+    def vazao(self):
+        """Clips aumentados por segundo, desde a criação"""
+        return self.clips_gerados / self.tempo_s if self.tempo_s else 0.0
+
+
+def lotes(X, y, tamanho_lote=256, copias=1, aumentador=None, seed=None):
+    """
+    Gera (X_aumentado, y) em lotes de até `tamanho_lote` clips: `copias`
+    passadas aumentadas por X, em ordem embaralhada. X pode ser o
+    memory-map do store; só os clips do lote são lidos.
+    """
+    aumentador = aumentador or Aumentador(seed=seed)
+    y = np.asarray(y)
+    for _ in range(copias):
+        ordem = aumentador.rng.permutation(len(X))
+        for inicio in range(0, len(ordem), tamanho_lote):
+            # Leitura em ordem crescente de posição (acesso sequencial ao disco)
+            indices = np.sort(ordem[inicio:inicio + tamanho_lote])
+            yield aumentador.aplicar(X[indices]), y[indices]
+
+
+if __name__ == "__main__":
+    from dataset_store import DatasetStore
+
+    parser = argparse.ArgumentParser(description="Vazão do aumento de dados")
+    parser.add_argument('--lote', type=int, default=256)
+    parser.add_argument('--lotes', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    store = DatasetStore()
+    store.ingerir_pasta()
+    X, y = store.X, store.y
+    print(f"[INFO] {len(X)} clips no store; lotes de {args.lote}")
+
+    base = dict(espelhar=0, ruido=0, escala=0, rotacao_graus=0, distorcao_tempo=0)
+    transformacoes = {
+        'espelhamento': dict(base, espelhar=1.0),
+        'ruído': dict(base, ruido=config.AUG_JITTER_STD),
+        'escala + rotação': dict(base, escala=config.AUG_SCALE, rotacao_graus=config.AUG_ROTATION_DEG),
+        'distorção temporal': dict(base, distorcao_tempo=config.AUG_TIME_WARP),
+        'todas (config.py)': {},
+    }
+    rng = np.random.default_rng(args.seed)
+    entrada = np.asarray(X[rng.integers(0, len(X), args.lote)])
+
+    print("\n" + "=" * 50)
+    print(f"{'transformação':<24} {'clips/s':>12} {'ms/lote':>10}")
+    print("=" * 50)
+    for nome, parametros in transformacoes.items():
+        aumentador = Aumentador(seed=args.seed, **parametros)
+        for _ in range(args.lotes):
+            aumentador.aplicar(entrada)
+        print(f"{nome:<24} {aumentador.vazao:>12.0f} "
+              f"{aumentador.tempo_s / args.lotes * 1000:>10.2f}")
+    print("=" * 50)
+
+    # Gerador completo, lendo do memory-map
+    aumentador = Aumentador(seed=args.seed)
+    inicio = time.perf_counter()
+    total = sum(len(lote_y) for _, lote_y in lotes(X, y, args.lote, copias=5, aumentador=aumentador))
+    duracao = time.perf_counter() - inicio
+    print(f"Gerador: {total} clips em {duracao:.2f}s ({total / duracao:.0f} clips/s, "
+          f"5 cópias do store)")
@@ -0,0 +1,137 @@
+"""
+Agendador de inferência em lote do Libras Bridge
+Agrupa os clips prontos de todos os clientes numa janela curta
+e executa uma única chamada ao modelo para o lote inteiro
+"""
+
+import time
+from collections import deque
+
+import numpy as np
+
+JANELA_MINIMA_MS = 1  # Com janela 0, o loop ocioso ocuparia a CPU sem parar
+
+
+class BatchScheduler:
+    def __init__(self, predict_fn, on_result, window_ms=10, max_batch=64,
+                 sleep_fn=time.sleep, stats_interval=30.0):
+        """
+        predict_fn: recebe uma matriz (n, n_features) e retorna n predições
+        on_result: chamado como on_result(item, gesto_predito) para cada clip
+        sleep_fn: função de espera (use socketio.sleep com eventlet)
+        """
+        self.predict_fn = predict_fn
+        self.on_result = on_result
+        self.window = max(window_ms, JANELA_MINIMA_MS) / 1000.0
+        self.max_batch = max_batch
+        self.sleep_fn = sleep_fn
+        self.stats_interval = stats_interval
+
+        self.pendentes = deque()
+        self.running = False
+
+        # Estatísticas (janela móvel das últimas amostras)
+        self.total_lotes = 0
+        self.total_clips = 0
+        self.maior_lote = 0
+        self.tamanhos = deque(maxlen=1000)
+        self.atrasos = deque(maxlen=1000)
+        self.tempos_predicao = deque(maxlen=1000)
+        self._ultimo_log = time.monotonic()
+
+    def submit(self, sid, state, entrada, extra=None):
+        """Enfileira um clip pronto (1, n_features) para a próxima janela"""
+        self.pendentes.append({
+            'sid': sid,
+            'state': state,
+            'entrada': entrada,
+            'extra': extra or {},
+            'enfileirado_em': time.monotonic()
+        })
+
+    def pending(self):
+        return len(self.pendentes)
+
+    def run(self):
+        """Loop principal; deve rodar como tarefa de background"""
+        self.running = True
+        print(f"[INFO] Agendador de lote iniciado (janela={self.window * 1000:.0f}ms, máx={self.max_batch})")
+        while self.running:
+            # Com um lote cheio à espera, só cede o loop de eventos (sleep(0))
+            self.sleep_fn(self.window if len(self.pendentes) < self.max_batch else 0)
+            if self.pendentes:
+                self.flush()
+            self._log_periodico()
+
+    def stop(self):
+        self.running = False
+
+    def flush(self):
+        """Executa uma predição para todos os clips pendentes (até max_batch)"""
+        lote = []
+        while self.pendentes and len(lote) < self.max_batch:
+            lote.append(self.pendentes.popleft())
+        if not lote:
+            return 0
+
+        agora = time.monotonic()
+        for item in lote:
+            self.atrasos.append(agora - item['enfileirado_em'])
+
+        try:
+            X = np.vstack([item['entrada'] for item in lote])
+            inicio = time.perf_counter()
+            predicoes = self.predict_fn(X)
+            self.tempos_predicao.append(time.perf_counter() - inicio)
+        except Exception as e:
+            print(f"[ERRO] Predição em lote ({len(lote)} clips): {e}")
+            predicoes = [None] * len(lote)
+
+        self.total_lotes += 1
+        self.total_clips += len(lote)
+        self.maior_lote = max(self.maior_lote, len(lote))
+        self.tamanhos.append(len(lote))
+
+        for item, gesto_predito in zip(lote, predicoes):
+            try:
+                self.on_result(item, gesto_predito)
+            except Exception as e:
+                print(f"[ERRO] Envio de resultado para {item['sid']}: {e}")
+
+        return len(lote)
+
+    def get_stats(self):
+        """Retorna estatísticas de tamanho de lote e atraso de fila"""
+        def percentil(valores, p):
+            if not valores:
+                return 0.0
+            return float(np.percentile(np.fromiter(valores, dtype=float), p))
+
+        return {
+            'janela_ms': self.window * 1000,
+            'max_lote': self.max_batch,
+            'pendentes': len(self.pendentes),
+            'total_lotes': self.total_lotes,
+            'total_clips': self.total_clips,
+            'maior_lote': self.maior_lote,
+            'lote_medio': self.total_clips / self.total_lotes if self.total_lotes else 0.0,
+            'lote_p50': percentil(self.tamanhos, 50),
+            'lote_p95': percentil(self.tamanhos, 95),
+            'atraso_fila_ms_p50': percentil(self.atrasos, 50) * 1000,
+            'atraso_fila_ms_p95': percentil(self.atrasos, 95) * 1000,
+            'atraso_fila_ms_max': max(self.atrasos, default=0.0) * 1000,
+            'predicao_ms_p50': percentil(self.tempos_predicao, 50) * 1000,
+            'predicao_ms_p95': percentil(self.tempos_predicao, 95) * 1000,
+        }
+
+    def _log_periodico(self):
+        if not self.stats_interval or not self.total_lotes:
+            return
+        agora = time.monotonic()
+        if agora - self._ultimo_log < self.stats_interval:
+            return
+        self._ultimo_log = agora
+        s = self.get_stats()
+        print(f"[INFO] Lotes: {s['total_lotes']} | lote médio: {s['lote_medio']:.1f} "
+              f"(p95 {s['lote_p95']:.0f}) | atraso fila p95: {s['atraso_fila_ms_p95']:.1f}ms "
+              f"| predição p95: {s['predicao_ms_p95']:.1f}ms")
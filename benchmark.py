@@ -0,0 +1,286 @@
+"""
+Benchmark offline do pipeline de frames do Libras Bridge
+Passa frames JPEG (gravados ou sintéticos) e os clips de landmarks do
+store empacotado (dataset_store.py) por cada etapa do pipeline de app.py e mede a
+latência (p50/p95/p99) e a vazão de cada uma e do caminho completo.
+
+Etapas:
+    base64 -> decodificação JPEG (PIL, como o servidor; e cv2.imdecode)
+    -> conversão de cor -> redimensionamento -> hands.process
+    -> features -> modelo.predict
+Caminhos completos: frame JPEG em base64 até a predição (como
+process_frame_web) e landmarks binários até a predição (process_landmarks).
+
+Os frames sintéticos não têm mão: o caminho completo é medido com o motion
+gate desligado, para que cada frame passe pelo MediaPipe; com GATE_ENABLED
+há uma etapa a mais com o gate ligado, e o total de frames pulados por ele
+é mostrado. Os clips vêm do store empacotado já existente, aberto só para
+leitura (rode preprocessamento.py antes); sem store, as etapas que usam
+clips são puladas.
+
+Uso:
+    python benchmark.py [--frames pasta_ou_video] [--n 300] [--resolucao 640x480]
+                        [--json resultado.json]
+Os resultados em JSON incluem commit, máquina e versões, para comparar
+execuções entre commits e máquinas.
+"""
+
+import argparse
+import base64
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+import config
+from clip_buffer import ClipBuffer
+from features import extrair_features, spec_do_modelo
+from forest_engine import carregar_modelo
+from hands_pool import TrackerSessao
+from motion_gate import MotionGate
+from dataset_store import DatasetStore
+from pipeline import criar_hands, decodificar_imagem, decodificar_jpeg, decodificar_landmarks
+
+
+def frames_sinteticos(n, largura, altura, seed=0):
+    """Gradiente com ruído e um bloco em movimento (sem mão: caminho de detecção)"""
+    import cv2
+
+    rng = np.random.default_rng(seed)
+    base = np.dstack([np.tile(np.linspace(0, 255, largura, dtype=np.uint8), (altura, 1))] * 3)
+    frames = []
+    for i in range(n):
+        frame = base.copy()
+        x = (i * 7) % max(1, largura - 60)
+        frame[altura // 3:altura // 3 + 60, x:x + 60] = (200, 150, 120)
+        ruido = rng.integers(0, 8, frame.shape, dtype=np.uint8)
+        frame = cv2.add(frame, ruido)
+        frames.append(cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, config.JPEG_QUALITY])[1].tobytes())
+    return frames
+
+
+def frames_gravados(origem, n, largura, altura):
+    """JPEGs de uma pasta (*.jpg) ou frames de um vídeo, recodificados em JPEG"""
+    import cv2
+
+    if os.path.isdir(origem):
+        arquivos = sorted(glob.glob(os.path.join(origem, '*.jpg')) + glob.glob(os.path.join(origem, '*.jpeg')))
+        frames = []
+        for arquivo in arquivos[:n]:
+            with open(arquivo, 'rb') as f:
+                frames.append(f.read())
+        return frames
+
+    cap = cv2.VideoCapture(origem)
+    frames = []
+    while len(frames) < n:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frame = cv2.resize(frame, (largura, altura))
+        frames.append(cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, config.JPEG_QUALITY])[1].tobytes())
+    cap.release()
+    return frames
+
+
+def medir(fn, entradas, aquecimento=5):
+    """Latência (ms) de fn em cada entrada, na ordem"""
+    for entrada in entradas[:aquecimento]:
+        fn(entrada)
+    tempos = np.empty(len(entradas))
+    for i, entrada in enumerate(entradas):
+        inicio = time.perf_counter()
+        fn(entrada)
+        tempos[i] = time.perf_counter() - inicio
+    return tempos * 1000
+
+
+def resumir(tempos_ms):
+    return {
+        'n': int(len(tempos_ms)),
+        'media_ms': float(tempos_ms.mean()),
+        'p50_ms': float(np.percentile(tempos_ms, 50)),
+        'p95_ms': float(np.percentile(tempos_ms, 95)),
+        'p99_ms': float(np.percentile(tempos_ms, 99)),
+        'fps': float(1000 / tempos_ms.mean()) if tempos_ms.mean() > 0 else None,
+    }
+
+
+def ambiente():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    import cv2
+    import mediapipe
+
+    return {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'maquina': platform.node(),
+        'plataforma': platform.platform(),
+        'processador': platform.processor() or platform.machine(),
+        'nucleos': os.cpu_count(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'mediapipe': mediapipe.__version__,
+    }
+
+
+def carregar_clips(n, seed):
+    """
+    n clips sorteados do store empacotado, sem ingerir nem criar nada
+    (DatasetStore cria o store se ele não existir); None sem store
+    """
+    if not os.path.exists(os.path.join(config.DATASET_STORE_PATH, "header.json")):
+        return None
+    store = DatasetStore()
+    if not len(store):
+        return None
+    rng = np.random.default_rng(seed)
+    return np.asarray(store.X[np.sort(rng.integers(0, len(store), n))])
+
+
+def executar(frames, clips, modelo):
+    """
+    Mede cada etapa; retorna (resultados por etapa, frames pulados pelo gate
+    na etapa com o gate ligado ou None). clips=None pula as etapas com clips.
+    """
+    import cv2
+
+    spec = spec_do_modelo(modelo)
+    etapas = {}
+
+    b64 = [base64.b64encode(f).decode('ascii') for f in frames]
+    etapas['base64'] = medir(base64.b64decode, b64)
+    etapas['decodificar_jpeg (PIL)'] = medir(
+        lambda f: decodificar_jpeg(f, config.FRAME_INPUT_WIDTH, config.FRAME_INPUT_HEIGHT), frames)
+    etapas['imdecode (cv2, BGR)'] = medir(
+        lambda f: cv2.imdecode(np.frombuffer(f, np.uint8), cv2.IMREAD_COLOR), frames)
+
+    bgr = [cv2.imdecode(np.frombuffer(f, np.uint8), cv2.IMREAD_COLOR) for f in frames]
+    etapas['cvtColor BGR->RGB'] = medir(lambda f: cv2.cvtColor(f, cv2.COLOR_BGR2RGB), bgr)
+    rgb = [cv2.cvtColor(f, cv2.COLOR_BGR2RGB) for f in bgr]
+    etapas['resize 320x240'] = medir(lambda f: cv2.resize(f, (320, 240)), rgb)
+
+    hands = criar_hands()
+    entrada_hands = [cv2.resize(f, (320, 240)) if f.shape[1] > 320 else f for f in rgb]
+    etapas['hands.process'] = medir(hands.process, entrada_hands)
+    hands.close()
+
+    if clips is not None:
+        etapas['features'] = medir(lambda c: extrair_features(c, spec), list(clips))
+        entradas = [extrair_features(c, spec) for c in clips]
+        etapas['modelo.predict (lote 1)'] = medir(modelo.predict, entradas)
+
+    def ponta_a_ponta(gate):
+        # Caminho completo de uma imagem, com o rastreador da sessão (ROI
+        # conforme config.py) e a predição a cada FRAME_SKIP frames com clip cheio
+        tracker = TrackerSessao(criar_hands(), gate, config.ROI_ENABLED)
+        buffer = ClipBuffer(config.CLIP_SIZE)
+        # Sem mão nos frames, o clip é pré-preenchido para que haja predições
+        for coords in (clips[0] if clips is not None else np.zeros((config.CLIP_SIZE, 63), np.float32)):
+            buffer.append(coords)
+
+        def frame_completo(imagem):
+            coords = tracker.process(decodificar_imagem(imagem))
+            if coords is not None:
+                buffer.append(coords)
+            else:
+                buffer.append(buffer.window()[-1])
+            if buffer.pronto(config.FRAME_SKIP):
+                buffer.marcar_predicao()
+                modelo.predict(extrair_features(buffer.window(), spec))
+
+        tempos = medir(frame_completo, b64)
+        tracker.close()
+        return tempos, tracker.frames_pulados
+
+    etapas['ponta a ponta (JPEG base64)'], _ = ponta_a_ponta(None)
+    pulados = None
+    if config.GATE_ENABLED:
+        etapas['ponta a ponta (JPEG, gate)'], pulados = ponta_a_ponta(MotionGate.da_config())
+
+    if clips is not None:
+        # Caminho de landmarks: os frames dos clips do dataset em sequência
+        payloads = [np.asarray(frame, dtype='<f4').tobytes()
+                    for clip in clips for frame in clip][:len(frames)]
+        buffer_lm = ClipBuffer(config.CLIP_SIZE)
+
+        def landmarks_completo(dados):
+            buffer_lm.append(decodificar_landmarks(dados))
+            if buffer_lm.pronto(config.FRAME_SKIP):
+                buffer_lm.marcar_predicao()
+                modelo.predict(extrair_features(buffer_lm.window(), spec))
+
+        etapas['ponta a ponta (landmarks)'] = medir(landmarks_completo, payloads)
+
+    return {nome: resumir(tempos) for nome, tempos in etapas.items()}, pulados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latência por etapa do pipeline de frames")
+    parser.add_argument('--frames', help="pasta com JPEGs ou arquivo de vídeo (padrão: sintéticos)")
+    parser.add_argument('--n', type=int, default=300, help="frames por etapa")
+    parser.add_argument('--resolucao', default='320x240', help="resolução dos frames sintéticos/vídeo")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="grava o resultado neste arquivo")
+    args = parser.parse_args()
+
+    largura, altura = (int(v) for v in args.resolucao.lower().split('x'))
+    if args.frames:
+        frames = frames_gravados(args.frames, args.n, largura, altura)
+        origem = args.frames
+    else:
+        frames = frames_sinteticos(args.n, largura, altura, args.seed)
+        origem = f"sintéticos {largura}x{altura}"
+    if not frames:
+        print(f"[ERRO] Nenhum frame lido de {args.frames}")
+        sys.exit(1)
+
+    clips = carregar_clips(args.n, args.seed)
+    modelo = carregar_modelo(config.MODEL_PATH, config.MODEL_ARTIFACT_PATH)
+
+    if clips is None:
+        print(f"[AVISO] Nenhum store em {config.DATASET_STORE_PATH} (rode preprocessamento.py); "
+              f"etapas com clips puladas")
+        print(f"[INFO] {len(frames)} frames ({origem})")
+    else:
+        print(f"[INFO] {len(frames)} frames ({origem}), {len(clips)} clips sorteados do store")
+    resultados, pulados = executar(frames, clips, modelo)
+
+    print("\n" + "=" * 88)
+    print(f"{'etapa':<32} {'n':>5} {'p50 (ms)':>10} {'p95 (ms)':>10} {'p99 (ms)':>10} {'frames/s':>12}")
+    print("=" * 88)
+    for nome, r in resultados.items():
+        print(f"{nome:<32} {r['n']:>5} {r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f} "
+              f"{r['p99_ms']:>10.3f} {r['fps']:>12.1f}")
+    print("=" * 88)
+    if pulados is None:
+        print("[INFO] Motion gate desligado (GATE_ENABLED = False)")
+    else:
+        print(f"[INFO] Motion gate: desligado em 'ponta a ponta (JPEG base64)'; em "
+              f"'ponta a ponta (JPEG, gate)' pulou {pulados} de {len(frames)} frames "
+              f"sem rodar o MediaPipe")
+
+    if args.json:
+        saida = {
+            'ambiente': ambiente(),
+            'parametros': dict(vars(args), origem_frames=origem, clip_size=config.CLIP_SIZE,
+                               frame_skip=config.FRAME_SKIP, gate=config.GATE_ENABLED,
+                               frames_pulados_gate=pulados, clips_do_store=clips is not None,
+                               roi=config.ROI_ENABLED,
+                               feature_spec=spec_do_modelo(modelo).to_dict()),
+            'etapas': resultados,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(saida, f, ensure_ascii=False, indent=2)
+        print(f"[INFO] Resultados salvos em {args.json}")
@@ -0,0 +1,162 @@
+"""
+Benchmark de escala horizontal do Libras Bridge
+Sobe N instâncias do servidor (uma porta cada, como atrás de um balanceador
+com sticky sessions), distribui clientes Socket.IO entre elas e mede a
+vazão total de frames processados para N = 1, 2, ..., --max-workers.
+
+Cada cliente envia um frame, espera o 'frame_processed' e envia o próximo
+(carga fechada), então a vazão sobe com N enquanto houver núcleos livres.
+
+Uso:
+    python benchmark_workers.py [--max-workers 4] [--clientes-por-worker 4]
+                                [--segundos 10] [--modo jpeg|landmarks]
+                                [--backend memory|redis] [--json saida.json]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+import uuid
+
+import numpy as np
+
+PORTA_BASE = 5100
+
+
+def criar_payload(modo):
+    if modo == 'landmarks':
+        rng = np.random.default_rng(0)
+        return 'process_landmarks', rng.random(63, dtype=np.float32).tobytes()
+
+    import cv2
+
+    # Frame sintético 320x240 (gradiente), sem mão: o MediaPipe roda a detecção
+    x = np.linspace(0, 255, 320, dtype=np.uint8)
+    frame = np.dstack([np.tile(x, (240, 1))] * 3)
+    return 'process_frame_binary', cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 50])[1].tobytes()
+
+
+def _cliente(url, evento, payload, fim, latencias):
+    import socketio
+
+    sio = socketio.Client()
+    resposta = threading.Event()
+    sio.on('frame_processed', lambda dados: resposta.set())
+    sio.connect(url, auth={'client_id': uuid.uuid4().hex}, transports=['websocket'])
+    try:
+        while time.perf_counter() < fim:
+            resposta.clear()
+            inicio = time.perf_counter()
+            sio.emit(evento, payload)
+            if not resposta.wait(5):
+                break
+            latencias.append(time.perf_counter() - inicio)
+    finally:
+        sio.disconnect()
+
+
+def _grupo_clientes(args):
+    """Processo com os clientes de uma instância; retorna as latências"""
+    url, modo, clientes, segundos = args
+    evento, payload = criar_payload(modo)
+    fim = time.perf_counter() + segundos
+    latencias = []
+    threads = [threading.Thread(target=_cliente, args=(url, evento, payload, fim, latencias))
+               for _ in range(clientes)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencias
+
+
+def subir_instancias(n, backend):
+    processos = []
+    for i in range(n):
+        env = dict(os.environ, LIBRAS_PORT=str(PORTA_BASE + i), LIBRAS_SESSION_BACKEND=backend)
+        processos.append(subprocess.Popen([sys.executable, "app.py"], env=env,
+                                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+
+    limite = time.time() + 120
+    for i in range(n):
+        while True:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{PORTA_BASE + i}/stats/startup", timeout=1)
+                break
+            except OSError:
+                if time.time() > limite or processos[i].poll() is not None:
+                    derrubar_instancias(processos)
+                    raise RuntimeError(f"Instância {i} não subiu na porta {PORTA_BASE + i}")
+                time.sleep(0.5)
+    return processos
+
+
+def derrubar_instancias(processos):
+    for p in processos:
+        p.terminate()
+    for p in processos:
+        try:
+            p.wait(10)
+        except subprocess.TimeoutExpired:
+            p.kill()
+
+
+def medir(n, args):
+    processos = subir_instancias(n, args.backend)
+    try:
+        tarefas = [(f"http://127.0.0.1:{PORTA_BASE + i}", args.modo,
+                    args.clientes_por_worker, args.segundos) for i in range(n)]
+        with multiprocessing.get_context('spawn').Pool(n) as pool:
+            grupos = pool.map(_grupo_clientes, tarefas)
+    finally:
+        derrubar_instancias(processos)
+
+    latencias = np.array([x for grupo in grupos for x in grupo]) * 1000
+    return {
+        'workers': n,
+        'clientes': n * args.clientes_por_worker,
+        'frames': int(len(latencias)),
+        'fps': len(latencias) / args.segundos,
+        'latencia_p50_ms': float(np.percentile(latencias, 50)) if len(latencias) else None,
+        'latencia_p95_ms': float(np.percentile(latencias, 95)) if len(latencias) else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vazão do Libras Bridge por número de workers")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--clientes-por-worker', type=int, default=4)
+    parser.add_argument('--segundos', type=float, default=10)
+    parser.add_argument('--modo', choices=['jpeg', 'landmarks'], default='jpeg')
+    parser.add_argument('--backend', choices=['memory', 'redis'], default='memory',
+                        help="SESSION_BACKEND das instâncias (redis usa LIBRAS_SESSION_REDIS_URL)")
+    parser.add_argument('--json', help="grava os resultados neste arquivo")
+    args = parser.parse_args()
+
+    print(f"[INFO] {os.cpu_count()} núcleos | modo {args.modo} | backend {args.backend}")
+    resultados = []
+    for n in range(1, args.max_workers + 1):
+        resultados.append(medir(n, args))
+        print(f"[INFO] {n} worker(s): {resultados[-1]['fps']:.1f} frames/s")
+
+    base = resultados[0]['fps'] or 1
+    print("\n" + "=" * 64)
+    print(f"{'workers':>8} {'clientes':>9} {'frames/s':>10} {'escala':>8} {'p50 (ms)':>10} {'p95 (ms)':>10}")
+    print("=" * 64)
+    for r in resultados:
+        p50 = f"{r['latencia_p50_ms']:.1f}" if r['latencia_p50_ms'] is not None else '-'
+        p95 = f"{r['latencia_p95_ms']:.1f}" if r['latencia_p95_ms'] is not None else '-'
+        print(f"{r['workers']:>8} {r['clientes']:>9} {r['fps']:>10.1f} "
+              f"{r['fps'] / base:>7.2f}x {p50:>10} {p95:>10}")
+    print("=" * 64)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'resultados': resultados}, f, indent=2)
+        print(f"[INFO] Resultados salvos em {args.json}")
@@ -0,0 +1,61 @@
+"""
+Buffer circular da janela de frames (clip) de cada sessão
+Os landmarks são gravados no lugar num array float32 pré-alocado e a
+janela é exposta como uma view contígua, sem cópias a cada frame.
+"""
+
+import numpy as np
+
+
+class ClipBuffer:
+    def __init__(self, clip_size=30, num_coords=63):
+        self.clip_size = clip_size
+        self.num_coords = num_coords
+        # Cada frame é gravado duas vezes (posição i e i + clip_size), de modo
+        # que qualquer janela de clip_size frames é uma fatia contígua
+        self._dados = np.zeros((2 * clip_size, num_coords), dtype=np.float32)
+        self._pos = 0     # próxima posição de escrita (= frame mais antigo quando cheio)
+        self._n = 0       # frames válidos na janela
+        self._novos = 0   # frames gravados desde a última predição
+
+    def __len__(self):
+        return self._n
+
+    def append(self, coords):
+        self._dados[self._pos] = coords
+        self._dados[self._pos + self.clip_size] = coords
+        self._pos = (self._pos + 1) % self.clip_size
+        self._n = min(self._n + 1, self.clip_size)
+        self._novos += 1
+
+    def clear(self):
+        self._pos = 0
+        self._n = 0
+        self._novos = 0
+
+    def is_full(self):
+        return self._n == self.clip_size
+
+    def window(self):
+        """View (n, num_coords) em ordem cronológica; não copiar = não guardar"""
+        if self._n < self.clip_size:
+            return self._dados[:self._n]
+        return self._dados[self._pos:self._pos + self.clip_size]
+
+    def pronto(self, stride=1):
+        """Janela cheia e com pelo menos `stride` frames novos desde a última predição"""
+        return self._n == self.clip_size and self._novos >= stride
+
+    def marcar_predicao(self):
+        self._novos = 0
+
+    @property
+    def novos(self):
+        return self._novos
+
+    def restaurar(self, janela, novos=0):
+        """Recria o buffer a partir de uma janela salva (ex.: session_store)"""
+        self.clear()
+        for coords in janela[-self.clip_size:]:
+            self.append(coords)
+        self._novos = novos
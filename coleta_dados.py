@@ -1,67 +1,195 @@
+"""
+Coleta de clips de um gesto pela webcam (ou de um vídeo gravado)
+
+Os frames com mão entram numa janela deslizante de CLIP_SIZE frames; a
+cada --passo frames novos a janela vira um clip. Com passo = CLIP_SIZE
+(padrão) os clips não se sobrepõem, como antes; com um passo menor, uma
+gravação contínua gera um clip a cada poucos frames.
+
+Os clips vão para uma fila limitada e são gravados por uma thread
+separada (dataset/<gesto>/clip_N.npy e o store empacotado), em lotes,
+sem travar a câmera. Se a fila encher, o clip é descartado com um aviso.
+
+Uso:
+    python coleta_dados.py <gesto> [--passo 10] [--camera 0]
+    python coleta_dados.py <gesto> --video gravacao.mp4 [--mostrar]
+"""
+
+import argparse
+import os
+import queue
+import threading
+from collections import deque
+
 import cv2
 import mediapipe as mp
 import numpy as np
-import os
 
-# Configurações
-gesto = "nao"  # altere para "sim" ou "nao"
-saida = f"dataset/{gesto}"
-os.makedirs(saida, exist_ok=True)
+import config
+from dataset_store import DatasetStore, assinatura, proximo_clip
+from pipeline import criar_hands
 
-mp_hands = mp.solutions.hands
-mp_draw = mp.solutions.drawing_utils
-hands = mp_hands.Hands(static_image_mode=False,
-                       max_num_hands=1,
-                       min_detection_confidence=0.7,
-                       model_complexity=0)
+LOTE_MAXIMO = 64  # Clips gravados por acréscimo ao store
 
-cap = cv2.VideoCapture(0)  # troque para 1 ou 2 se quiser outra câmera
-clip_size = 30  # 30 frames = ~1,5s
-frames_clip = []
-contador = 0
 
-print(f"[INFO] Gravando gestos do tipo: {gesto}")
+class JanelaDeslizante:
+    """Últimos clip_size frames; um clip a cada `passo` frames novos"""
 
-while cap.isOpened():
-    ret, frame = cap.read()
-    if not ret:
-        break
+    def __init__(self, clip_size, passo):
+        self.frames = deque(maxlen=clip_size)
+        self.passo = passo
+        self.novos = 0
 
-    # Espelhar a câmera
-    frame = cv2.flip(frame, 1)
+    def adicionar(self, coords):
+        """Retorna o clip (clip_size, 63) quando houver um novo, senão None"""
+        self.frames.append(coords)
+        self.novos += 1
+        if len(self.frames) < self.frames.maxlen or self.novos < self.passo:
+            return None
+        self.novos = 0
+        return np.array(self.frames, dtype=np.float32)
 
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = hands.process(rgb)
+    def __len__(self):
+        return len(self.frames)
 
-    if results.multi_hand_landmarks:
-        for hand_landmarks in results.multi_hand_landmarks:
-            mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
 
-            coords = []
-            for lm in hand_landmarks.landmark:
-                coords.extend([lm.x, lm.y, lm.z])
+class GravadorClips:
+    """Thread que grava os clips da fila em dataset/<gesto>/ e no store"""
+
+    def __init__(self, gesto, pasta=None, tamanho_fila=None):
+        self.gesto = gesto
+        self.saida = os.path.join(pasta or config.DATASET_PATH, gesto)
+        os.makedirs(self.saida, exist_ok=True)
+        # Continuar a numeração dos clips já gravados, sem sobrescrevê-los
+        self.contador = proximo_clip(self.saida)
+        self.store = DatasetStore()  # só esta thread acrescenta ao store
+
+        self.fila = queue.Queue(maxsize=tamanho_fila or config.COLLECT_QUEUE_SIZE)
+        self.gravados = 0
+        self.descartados = 0
+        self._thread = threading.Thread(target=self._executar, daemon=True)
+        self._thread.start()
+
+    def enfileirar(self, clip):
+        try:
+            self.fila.put_nowait(clip)
+            return True
+        except queue.Full:
+            self.descartados += 1
+            print(f"[AVISO] Fila de gravação cheia; clip descartado ({self.descartados} no total)")
+            return False
+
+    def _executar(self):
+        while True:
+            clip = self.fila.get()
+            if clip is None:
+                break
+            # Junta o que já estiver na fila num único acréscimo ao store
+            lote = [clip]
+            fim = False
+            while len(lote) < LOTE_MAXIMO:
+                try:
+                    proximo = self.fila.get_nowait()
+                except queue.Empty:
+                    break
+                if proximo is None:
+                    fim = True
+                    break
+                lote.append(proximo)
+            self._gravar(lote)
+            if fim:
+                break
+
+    def _gravar(self, lote):
+        origens, assinaturas = [], []
+        for clip in lote:
+            arquivo = f"clip_{self.contador}.npy"
+            caminho = os.path.join(self.saida, arquivo)
+            np.save(caminho, clip)
+            origens.append(f"{self.gesto}/{arquivo}")
+            assinaturas.append(assinatura(caminho))
+            self.contador += 1
+        self.store.adicionar_lote(np.stack(lote), [self.gesto] * len(lote), origens, assinaturas)
+        self.gravados += len(lote)
+        print(f"[INFO] Salvo: {origens[-1] if len(lote) == 1 else f'{len(lote)} clips até {origens[-1]}'} "
+              f"({len(self.store)} clips no store)")
 
-            frames_clip.append(coords)
+    def fechar(self):
+        """Espera a fila esvaziar e encerra a thread"""
+        self.fila.put(None)
+        self._thread.join()
 
-    # Mostrar texto e cruz central
+
+def desenhar(frame, gesto, janela, gravador):
     h, w, _ = frame.shape
-    cv2.putText(frame, f"Gesto: {gesto} | Frames: {len(frames_clip)}",
-                (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+    cv2.putText(frame, f"Gesto: {gesto} | Frames: {len(janela)} | Clips: {gravador.gravados}",
+                (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+    cv2.putText(frame, f"Fila: {gravador.fila.qsize()}/{gravador.fila.maxsize}",
+                (10, h - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, config.COLOR_TEXT, 1)
+    # Cruz central
     cv2.line(frame, (w//2 - 20, h//2), (w//2 + 20, h//2), (0, 0, 255), 2)
     cv2.line(frame, (w//2, h//2 - 20), (w//2, h//2 + 20), (0, 0, 255), 2)
 
-    cv2.imshow("Coleta de Dados", frame)
 
-    # Quando tiver N frames, salva um clipe
-    if len(frames_clip) == clip_size:
-        arquivo = os.path.join(saida, f"clip_{contador}.npy")
-        np.save(arquivo, np.array(frames_clip))
-        print(f"[INFO] Salvo: {arquivo}")
-        frames_clip = []
-        contador += 1
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Coleta de clips de um gesto em Libras")
+    parser.add_argument('gesto', help="nome do gesto (subpasta de dataset/)")
+    parser.add_argument('--passo', type=int, default=config.COLLECT_STRIDE or config.CLIP_SIZE,
+                        help="frames novos entre clips (menor que CLIP_SIZE = clips sobrepostos)")
+    parser.add_argument('--camera', type=int, default=config.CAMERA_INDEX)
+    parser.add_argument('--video', help="extrair clips deste arquivo em vez da câmera (sem janela)")
+    parser.add_argument('--mostrar', action='store_true', help="com --video: exibir a janela")
+    args = parser.parse_args()
+
+    if args.passo < 1:
+        parser.error("--passo deve ser >= 1")
+
+    mp_hands = mp.solutions.hands
+    mp_draw = mp.solutions.drawing_utils
+    hands = criar_hands()
+
+    cap = cv2.VideoCapture(args.video if args.video else args.camera)
+    mostrar = args.mostrar or not args.video
+    janela = JanelaDeslizante(config.CLIP_SIZE, args.passo)
+    gravador = GravadorClips(args.gesto)
+
+    print(f"[INFO] Gravando gestos do tipo: {args.gesto} (um clip a cada {args.passo} frames com mão)")
+
+    while cap.isOpened():
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        # Espelhar a câmera
+        frame = cv2.flip(frame, 1)
+
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        results = hands.process(rgb)
+
+        if results.multi_hand_landmarks:
+            hand_landmarks = results.multi_hand_landmarks[0]
+            if mostrar:
+                mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+
+            coords = []
+            for lm in hand_landmarks.landmark:
+                coords.extend([lm.x, lm.y, lm.z])
+
+            clip = janela.adicionar(coords)
+            if clip is not None:
+                gravador.enfileirar(clip)
+
+        if mostrar:
+            desenhar(frame, args.gesto, janela, gravador)
+            cv2.imshow("Coleta de Dados", frame)
+            if cv2.waitKey(1) & 0xFF == 27:  # ESC para sair
+                break
 
-    if cv2.waitKey(1) & 0xFF == 27:  # ESC para sair
-        break
+    cap.release()
+    hands.close()
+    if mostrar:
+        cv2.destroyAllWindows()
 
-cap.release()
-cv2.destroyAllWindows()
+    gravador.fechar()
+    print(f"[INFO] {gravador.gravados} clips gravados em {gravador.saida}"
+          + (f", {gravador.descartados} descartados (fila cheia)" if gravador.descartados else ""))
@@ -3,9 +3,11 @@ Configurações do Libras Bridge
 Edite este arquivo para personalizar o comportamento do sistema
 """
 
+import os
+
 # ============ CONFIGURAÇÕES DO SERVIDOR ============
 SERVER_HOST = '0.0.0.0'  # '0.0.0.0' permite acesso externo, '127.0.0.1' apenas local
-SERVER_PORT = 5000
+SERVER_PORT = int(os.environ.get('LIBRAS_PORT', 5000))  # Uma porta por instância ao escalar
 DEBUG_MODE = False
 
 # ============ CONFIGURAÇÕES DA CÂMERA ============
@@ -18,12 +20,59 @@ CAMERA_FPS = 30
 MIN_DETECTION_CONFIDENCE = 0.7  # 0.5 = mais sensível, 0.9 = mais preciso
 MIN_TRACKING_CONFIDENCE = 0.5
 MAX_NUM_HANDS = 1  # Detectar apenas 1 mão
+HANDS_POOL_SIZE = 32  # Máximo de instâncias do Hands por processo (uma por sessão)
+HANDS_IDLE_TIMEOUT = 120  # Segundos sem frames até liberar o Hands de uma sessão
+# Filtro antes do MediaPipe: sessões sem mão há GATE_NO_HAND_FRAMES frames só
+# rodam a detecção se a imagem mudar ou a cada GATE_IDLE_INTERVAL frames
+GATE_ENABLED = True
+GATE_MOTION_THRESHOLD = 3.0  # Diferença média (0-255) entre miniaturas 32x24 que conta como movimento
+GATE_NO_HAND_FRAMES = 10  # Frames seguidos sem mão até a sessão ficar ociosa
+GATE_IDLE_INTERVAL = 5  # Sessão ociosa e cena parada: detecção a cada K frames
+# Recorte (ROI): processar só a região da mão do frame anterior, expandida
+ROI_ENABLED = True
+ROI_EXPANSION = 2.0  # Lado do recorte = maior lado da caixa dos landmarks x fator
+ROI_MIN_SIZE = 96  # Lado mínimo do recorte, em pixels
+ROI_MAX_SIZE = 256  # Recortes maiores são reduzidos para este lado antes do MediaPipe
 
 # ============ CONFIGURAÇÕES DO MODELO ============
 MODEL_PATH = "modelo_libras.pkl"
+MODEL_ARTIFACT_PATH = "modelo_libras"  # Artefato compilado com memory-map (python forest_engine.py converter)
+MODEL_MANIFEST_PATH = "modelo_libras_manifesto.json"  # Versões do modelo e clips do store vistos por cada uma
 CLIP_SIZE = 30  # Número de frames por predição (~1.5s a 20fps)
 NUM_CONFIRMATIONS = 2  # Quantos clips iguais seguidos para confirmar
 
+# ============ CONFIGURAÇÕES DO TREINAMENTO (treinamento.py) ============
+TRAIN_N_ESTIMATORS = 500  # Árvores do treino padrão (sem --busca)
+TRAIN_CV_FOLDS = 5  # Folds da validação cruzada da busca
+TRAIN_ACCURACY_TARGET = 0.95  # A busca escolhe o modelo mais rápido com acurácia média >= alvo
+TRAIN_N_JOBS = -1  # Processos do treino e da validação cruzada (-1 = todos os núcleos)
+# Treino incremental (--incremental): árvores novas treinadas só com os clips
+# novos e uma amostra dos já vistos, somadas à floresta implantada
+TRAIN_REPLAY_PER_CLASS = 50  # Clips já vistos, por gesto, misturados aos novos
+TRAIN_INCREMENTAL_MIN_TREES = 10  # Mínimo de árvores acrescentadas por atualização
+TRAIN_MAX_TREES = 500  # Acima disso, as árvores mais antigas saem (o bloco novo tem no máximo a metade)
+
+# ============ AUMENTO DE DADOS (augmentation.py) ============
+AUG_COPIES = 0  # Blocos de árvores em treinamento.py, cada um com uma cópia aumentada do treino (0 = sem aumento)
+AUG_MIRROR_PROB = 0.5  # Probabilidade de espelhar o clip (sinalizantes canhotos)
+AUG_JITTER_STD = 0.003  # Desvio padrão do ruído nas coordenadas normalizadas
+AUG_SCALE = 0.1  # Fator de escala sorteado em [1 - AUG_SCALE, 1 + AUG_SCALE]
+AUG_ROTATION_DEG = 10  # Rotação sorteada em [-AUG_ROTATION_DEG, AUG_ROTATION_DEG] graus
+AUG_TIME_WARP = 0.3  # Intensidade da distorção temporal (0 = desligada, < 1)
+
+# ============ CONFIGURAÇÕES DE FEATURES (features.py) ============
+# Valem para o próximo treinamento; o modelo salvo guarda as que usou
+FEATURE_NORMALIZE = False  # Coordenadas relativas ao punho e normalizadas pelo tamanho da mão
+FEATURE_K_FRAMES = 0  # Reamostrar o clip para K frames (0 = manter CLIP_SIZE)
+FEATURE_VELOCITY = False  # Incluir diferenças entre frames consecutivos
+
+# ============ CONFIGURAÇÕES DO DATASET ============
+DATASET_PATH = "dataset"  # Clips gravados por coleta_dados.py (dataset/<gesto>/clip_N.npy)
+DATASET_STORE_PATH = "dataset_libras"  # Store empacotado com memory-map (python dataset_store.py info)
+# Coleta (coleta_dados.py): janela deslizante sobre os frames com mão
+COLLECT_STRIDE = 0  # Frames novos entre clips (0 = CLIP_SIZE, sem sobreposição; --passo)
+COLLECT_QUEUE_SIZE = 256  # Clips aguardando gravação em disco; com a fila cheia, o clip é descartado
+
 # ============ GESTOS SUPORTADOS ============
 GESTOS_LABELS = ["ola", "sim", "nao"]  # Adicione mais gestos aqui
 
@@ -43,9 +92,51 @@ LANDMARK_CIRCLE_RADIUS = 2
 
 # ============ CONFIGURAÇÕES DE PERFORMANCE ============
 JPEG_QUALITY = 50  # 1-100, menor = mais rápido mas pior qualidade
-FRAME_SKIP = 2  # Processar 1 a cada N frames (1 = todos)
+# Resolução máxima de decodificação dos frames recebidos; acima de 320x240
+# só compensa com ROI_ENABLED (o frame inteiro é reduzido para 320x240)
+FRAME_INPUT_WIDTH = 320
+FRAME_INPUT_HEIGHT = 240
+FRAME_SKIP = 2  # Classificar a janela a cada N frames novos (1 = todos)
 WEBSOCKET_FPS = 30  # Frames por segundo enviados ao navegador
 
+# ============ CONTRAPRESSÃO (BACKPRESSURE) ============
+# Cada sessão guarda só o frame mais recente não processado (os antigos são
+# descartados) e o servidor sugere ao cliente o intervalo de envio ('rate_hint')
+BACKPRESSURE = True
+FRAME_INTERVAL_MS = 100  # Intervalo inicial de envio do navegador (10 FPS) e mínimo sugerido
+FRAME_INTERVAL_MAX_MS = 1000  # Limite superior do intervalo sugerido (1 FPS)
+RATE_HINT_FACTOR = 1.5  # Intervalo sugerido = latência média de processamento x fator
+
+# ============ CONFIGURAÇÕES DE EXECUÇÃO ============
+# 'inline': MediaPipe e modelo rodam no próprio processo do servidor
+# 'process_pool': rodam num pool de processos (um Hands e um modelo por worker)
+EXECUTION_MODE = 'inline'
+NUM_WORKERS = 0  # Processos do pool (0 = um por núcleo de CPU)
+
+# ============ CONFIGURAÇÕES DE INICIALIZAÇÃO ============
+# True: carrega o modelo e aquece o MediaPipe só no primeiro uso
+# (reinícios de worker e autoscaling mais rápidos; o primeiro frame paga o custo)
+LAZY_STARTUP = False
+
+# ============ CONFIGURAÇÕES DE INFERÊNCIA EM LOTE ============
+BATCH_INFERENCE = True  # Agrupar clips de vários clientes numa única predição
+BATCH_WINDOW_MS = 10  # Janela de coleta antes de rodar o modelo (maior = lotes maiores, mais atraso)
+BATCH_MAX_SIZE = 64  # Máximo de clips por lote
+
+# ============ CONFIGURAÇÕES DE ESCALA (VÁRIOS WORKERS/NÓS) ============
+# 'memory': estado das sessões no processo (exige um único worker)
+# 'redis': estado compartilhado num Redis (ou 'local://' para o substituto em memória)
+SESSION_BACKEND = os.environ.get('LIBRAS_SESSION_BACKEND', 'memory')
+SESSION_REDIS_URL = os.environ.get('LIBRAS_SESSION_REDIS_URL', 'redis://localhost:6379/0')
+SESSION_TTL = 3600  # Segundos que o estado de uma sessão desconectada fica no store
+# Fila de mensagens do Flask-SocketIO (ex.: 'redis://localhost:6379/0');
+# necessária para emitir entre processos. Vazio = desativada
+MESSAGE_QUEUE_URL = os.environ.get('LIBRAS_MESSAGE_QUEUE_URL', '')
+
+# ============ LOG E MÉTRICAS ============
+LOG_LEVEL = os.environ.get('LIBRAS_LOG_LEVEL', 'INFO')  # 'DEBUG' mostra as mensagens por frame
+LOG_RATE_LIMIT_S = 5.0  # Mensagens repetidas (por frame) saem no máximo uma vez por intervalo
+
 # ============ CONFIGURAÇÕES DE HISTÓRICO ============
 MAX_HISTORY_ITEMS = 10  # Quantas traduções manter no histórico
 
@@ -57,6 +148,20 @@ TTS_SPEED = 1.0
 # ============ CONFIGURAÇÕES DE EXPORTAÇÃO (FUTURO) ============
 ENABLE_EXPORT = False  # Ainda não implementado
 EXPORT_FORMAT = 'txt'  # 'txt', 'pdf', 'csv'
+# TranslationExporter(streaming=True): arquivos contínuos só de acréscimo
+EXPORT_STREAM_FORMATS = ('jsonl', 'csv')  # Formatos gravados a cada tradução
+EXPORT_ROTATE_MB = 50  # Tamanho de cada arquivo antes de abrir o próximo
+EXPORT_FLUSH_EVERY = 50  # Traduções em buffer antes de gravar em disco
+EXPORT_FLUSH_INTERVAL_S = 5.0  # ... ou segundos desde a última gravação
+EXPORT_TAIL_SIZE = 1000  # Traduções mantidas em memória (resumo e export_*)
+
+# ============ REGISTRO DE TRADUÇÕES (translation_log.py) ============
+# Traduções confirmadas de cada sessão, em SQLite, exportáveis em /export/<sessão>
+TRANSLATION_LOG_ENABLED = True
+TRANSLATION_LOG_PATH = os.environ.get('LIBRAS_TRANSLATION_LOG', 'traducoes.db')
+TRANSLATION_LOG_BATCH = 200  # Máximo de traduções por transação
+TRANSLATION_LOG_FLUSH_MS = 500  # Intervalo entre gravações da fila
+TRANSLATION_LOG_QUEUE_SIZE = 10000  # Com a fila cheia, novas traduções são descartadas
 
 # ============ CONFIGURAÇÕES DE SEGURANÇA ============
 SECRET_KEY = 'libras_bridge_secret_key_change_in_production'
@@ -107,15 +212,111 @@ def validate_config():
     if not 0 <= MIN_TRACKING_CONFIDENCE <= 1:
         errors.append("MIN_TRACKING_CONFIDENCE deve estar entre 0 e 1")
     
+    if HANDS_POOL_SIZE < 1:
+        errors.append("HANDS_POOL_SIZE deve ser >= 1")
+    
+    if GATE_MOTION_THRESHOLD < 0:
+        errors.append("GATE_MOTION_THRESHOLD deve ser >= 0")
+    
+    if GATE_NO_HAND_FRAMES < 1 or GATE_IDLE_INTERVAL < 1:
+        errors.append("GATE_NO_HAND_FRAMES e GATE_IDLE_INTERVAL devem ser >= 1")
+    
+    if ROI_EXPANSION < 1:
+        errors.append("ROI_EXPANSION deve ser >= 1")
+    
+    if not 0 < ROI_MIN_SIZE <= ROI_MAX_SIZE:
+        errors.append("Deve valer 0 < ROI_MIN_SIZE <= ROI_MAX_SIZE")
+    
     if CLIP_SIZE < 10:
         errors.append("CLIP_SIZE deve ser >= 10")
     
     if NUM_CONFIRMATIONS < 1:
         errors.append("NUM_CONFIRMATIONS deve ser >= 1")
     
+    if TRAIN_N_ESTIMATORS < 1:
+        errors.append("TRAIN_N_ESTIMATORS deve ser >= 1")
+    
+    if TRAIN_CV_FOLDS < 2:
+        errors.append("TRAIN_CV_FOLDS deve ser >= 2")
+    
+    if not 0 < TRAIN_ACCURACY_TARGET <= 1:
+        errors.append("TRAIN_ACCURACY_TARGET deve estar entre 0 e 1")
+    
+    if TRAIN_REPLAY_PER_CLASS < 0:
+        errors.append("TRAIN_REPLAY_PER_CLASS deve ser >= 0")
+    
+    if not 1 <= TRAIN_INCREMENTAL_MIN_TREES <= TRAIN_MAX_TREES // 2:
+        errors.append("Deve valer 1 <= TRAIN_INCREMENTAL_MIN_TREES <= TRAIN_MAX_TREES / 2")
+    
+    if AUG_COPIES < 0:
+        errors.append("AUG_COPIES deve ser >= 0")
+    
+    if not 0 <= AUG_MIRROR_PROB <= 1:
+        errors.append("AUG_MIRROR_PROB deve estar entre 0 e 1")
+    
+    if AUG_JITTER_STD < 0 or not 0 <= AUG_SCALE < 1 or AUG_ROTATION_DEG < 0:
+        errors.append("AUG_JITTER_STD e AUG_ROTATION_DEG devem ser >= 0 e AUG_SCALE entre 0 e 1")
+    
+    if not 0 <= AUG_TIME_WARP < 1:
+        errors.append("AUG_TIME_WARP deve estar entre 0 e 1 (exclusive)")
+    
+    if COLLECT_STRIDE < 0:
+        errors.append("COLLECT_STRIDE deve ser >= 0")
+    
+    if COLLECT_QUEUE_SIZE < 1:
+        errors.append("COLLECT_QUEUE_SIZE deve ser >= 1")
+    
+    if not set(EXPORT_STREAM_FORMATS) <= {'jsonl', 'csv'}:
+        errors.append("EXPORT_STREAM_FORMATS aceita só 'jsonl' e 'csv'")
+    
+    if EXPORT_ROTATE_MB <= 0 or EXPORT_FLUSH_EVERY < 1 or EXPORT_FLUSH_INTERVAL_S < 0:
+        errors.append("EXPORT_ROTATE_MB e EXPORT_FLUSH_EVERY devem ser > 0 e EXPORT_FLUSH_INTERVAL_S >= 0")
+    
+    if EXPORT_TAIL_SIZE < 1:
+        errors.append("EXPORT_TAIL_SIZE deve ser >= 1")
+    
+    if TRANSLATION_LOG_BATCH < 1 or TRANSLATION_LOG_QUEUE_SIZE < 1:
+        errors.append("TRANSLATION_LOG_BATCH e TRANSLATION_LOG_QUEUE_SIZE devem ser >= 1")
+    
+    if TRANSLATION_LOG_FLUSH_MS < 0:
+        errors.append("TRANSLATION_LOG_FLUSH_MS deve ser >= 0")
+    
+    if FEATURE_K_FRAMES < 0 or FEATURE_K_FRAMES == 1:
+        errors.append("FEATURE_K_FRAMES deve ser 0 ou >= 2")
+    
+    if FRAME_SKIP < 1:
+        errors.append("FRAME_SKIP deve ser >= 1")
+    
     if not 1 <= JPEG_QUALITY <= 100:
         errors.append("JPEG_QUALITY deve estar entre 1 e 100")
     
+    if not 0 < FRAME_INTERVAL_MS <= FRAME_INTERVAL_MAX_MS:
+        errors.append("Deve valer 0 < FRAME_INTERVAL_MS <= FRAME_INTERVAL_MAX_MS")
+    
+    if RATE_HINT_FACTOR < 1:
+        errors.append("RATE_HINT_FACTOR deve ser >= 1")
+    
+    if EXECUTION_MODE not in ('inline', 'process_pool'):
+        errors.append("EXECUTION_MODE deve ser 'inline' ou 'process_pool'")
+    
+    if NUM_WORKERS < 0:
+        errors.append("NUM_WORKERS deve ser >= 0")
+    
+    if BATCH_WINDOW_MS < 1:
+        errors.append("BATCH_WINDOW_MS deve ser >= 1")
+    
+    if BATCH_MAX_SIZE < 1:
+        errors.append("BATCH_MAX_SIZE deve ser >= 1")
+    
+    if str(LOG_LEVEL).upper() not in ('DEBUG', 'INFO', 'WARNING', 'ERROR'):
+        errors.append("LOG_LEVEL deve ser 'DEBUG', 'INFO', 'WARNING' ou 'ERROR'")
+    
+    if SESSION_BACKEND not in ('memory', 'redis'):
+        errors.append("SESSION_BACKEND deve ser 'memory' ou 'redis'")
+    
+    if SESSION_TTL < 1:
+        errors.append("SESSION_TTL deve ser >= 1")
+    
     if errors:
         print("❌ ERROS DE CONFIGURAÇÃO:")
         for error in errors:
@@ -143,17 +344,99 @@ def get_config():
             'min_detection_confidence': MIN_DETECTION_CONFIDENCE,
             'min_tracking_confidence': MIN_TRACKING_CONFIDENCE,
             'max_num_hands': MAX_NUM_HANDS,
+            'hands_pool_size': HANDS_POOL_SIZE,
+            'hands_idle_timeout': HANDS_IDLE_TIMEOUT,
+            'gate_enabled': GATE_ENABLED,
+            'gate_motion_threshold': GATE_MOTION_THRESHOLD,
+            'gate_no_hand_frames': GATE_NO_HAND_FRAMES,
+            'gate_idle_interval': GATE_IDLE_INTERVAL,
+            'roi_enabled': ROI_ENABLED,
+            'roi_expansion': ROI_EXPANSION,
+            'roi_min_size': ROI_MIN_SIZE,
+            'roi_max_size': ROI_MAX_SIZE,
         },
         'model': {
             'path': MODEL_PATH,
+            'artifact_path': MODEL_ARTIFACT_PATH,
+            'manifest_path': MODEL_MANIFEST_PATH,
             'clip_size': CLIP_SIZE,
             'num_confirmations': NUM_CONFIRMATIONS,
             'gestos': GESTOS_LABELS,
         },
+        'training': {
+            'n_estimators': TRAIN_N_ESTIMATORS,
+            'cv_folds': TRAIN_CV_FOLDS,
+            'accuracy_target': TRAIN_ACCURACY_TARGET,
+            'n_jobs': TRAIN_N_JOBS,
+            'replay_per_class': TRAIN_REPLAY_PER_CLASS,
+            'incremental_min_trees': TRAIN_INCREMENTAL_MIN_TREES,
+            'max_trees': TRAIN_MAX_TREES,
+        },
+        'augmentation': {
+            'copies': AUG_COPIES,
+            'mirror_prob': AUG_MIRROR_PROB,
+            'jitter_std': AUG_JITTER_STD,
+            'scale': AUG_SCALE,
+            'rotation_deg': AUG_ROTATION_DEG,
+            'time_warp': AUG_TIME_WARP,
+        },
+        'dataset': {
+            'path': DATASET_PATH,
+            'store_path': DATASET_STORE_PATH,
+            'collect_stride': COLLECT_STRIDE,
+            'collect_queue_size': COLLECT_QUEUE_SIZE,
+        },
+        'features': {
+            'normalize': FEATURE_NORMALIZE,
+            'k_frames': FEATURE_K_FRAMES,
+            'velocity': FEATURE_VELOCITY,
+        },
         'performance': {
             'jpeg_quality': JPEG_QUALITY,
+            'frame_input_width': FRAME_INPUT_WIDTH,
+            'frame_input_height': FRAME_INPUT_HEIGHT,
             'frame_skip': FRAME_SKIP,
             'websocket_fps': WEBSOCKET_FPS,
+        },
+        'backpressure': {
+            'enabled': BACKPRESSURE,
+            'frame_interval_ms': FRAME_INTERVAL_MS,
+            'frame_interval_max_ms': FRAME_INTERVAL_MAX_MS,
+            'rate_hint_factor': RATE_HINT_FACTOR,
+        },
+        'execution': {
+            'lazy_startup': LAZY_STARTUP,
+            'mode': EXECUTION_MODE,
+            'num_workers': NUM_WORKERS,
+        },
+        'batch': {
+            'enabled': BATCH_INFERENCE,
+            'window_ms': BATCH_WINDOW_MS,
+            'max_size': BATCH_MAX_SIZE,
+        },
+        'logging': {
+            'level': LOG_LEVEL,
+            'rate_limit_s': LOG_RATE_LIMIT_S,
+        },
+        'scaling': {
+            'session_backend': SESSION_BACKEND,
+            'session_redis_url': SESSION_REDIS_URL,
+            'session_ttl': SESSION_TTL,
+            'message_queue_url': MESSAGE_QUEUE_URL,
+        },
+        'export': {
+            'stream_formats': EXPORT_STREAM_FORMATS,
+            'rotate_mb': EXPORT_ROTATE_MB,
+            'flush_every': EXPORT_FLUSH_EVERY,
+            'flush_interval_s': EXPORT_FLUSH_INTERVAL_S,
+            'tail_size': EXPORT_TAIL_SIZE,
+        },
+        'translation_log': {
+            'enabled': TRANSLATION_LOG_ENABLED,
+            'path': TRANSLATION_LOG_PATH,
+            'batch': TRANSLATION_LOG_BATCH,
+            'flush_ms': TRANSLATION_LOG_FLUSH_MS,
+            'queue_size': TRANSLATION_LOG_QUEUE_SIZE,
         }
     }
 
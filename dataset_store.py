@@ -0,0 +1,357 @@
+"""
+Dataset empacotado do Libras Bridge
+Todos os clips ficam num único arquivo float32 contíguo, aberto com
+memory-map, e um índice com o gesto e a origem de cada clip. O treino lê
+fatias do arquivo sem copiar nada, e novos clips são acrescentados no fim
+(pela coleta ou pela ingestão de dataset/<gesto>/clip_N.npy), sem
+reescrever o que já está no store.
+
+Cada clip guarda a assinatura (mtime em ns e tamanho) do arquivo de
+origem; um clip_N.npy regravado é substituído no lugar, na mesma posição.
+Cada gravação incrementa a revisão do store, registrada nos clips que
+escreveu: o treino incremental usa os clips com revisão posterior à do
+último treino.
+
+    dataset_libras/
+        header.json   formato, versão, clip_size, coordenadas, total de clips, revisão
+        clips.f32     (n, clip_size, 63) float32 little-endian
+        indice.jsonl  uma linha por clip: gesto, origem, data, assinatura, revisão
+
+O total em header.json é gravado por último, a cada acréscimo; bytes ou
+linhas além dele (acréscimo interrompido) são ignorados na leitura e
+descartados no acréscimo seguinte. Leitores podem abrir o store enquanto
+outro processo acrescenta clips; só um processo deve acrescentar por vez.
+
+Uso:
+    python dataset_store.py info [store]
+    python dataset_store.py ingerir [pasta_dataset] [store]      # só clips novos ou alterados
+    python dataset_store.py reconstruir [pasta_dataset] [store]  # do zero
+"""
+
+import json
+import os
+import re
+import shutil
+import sys
+from datetime import datetime
+
+import numpy as np
+
+import config
+
+FORMATO = "libras-bridge-dataset"
+VERSAO = 1
+NUM_COORDS = 63  # 21 landmarks x (x, y, z)
+DTYPE = np.dtype('<f4')
+
+
+def _numero_clip(arquivo):
+    """clip_12.npy -> 12 (ordem numérica, não alfabética)"""
+    encontrado = re.search(r'(\d+)', arquivo)
+    return (int(encontrado.group(1)) if encontrado else -1, arquivo)
+
+
+def listar_gestos(pasta=None):
+    """Gestos do dataset: as subpastas de dataset/, em ordem alfabética"""
+    pasta = pasta or config.DATASET_PATH
+    if not os.path.isdir(pasta):
+        return []
+    return sorted(nome for nome in os.listdir(pasta) if os.path.isdir(os.path.join(pasta, nome)))
+
+
+def listar_clips(pasta_gesto):
+    if not os.path.isdir(pasta_gesto):
+        return []
+    return sorted((a for a in os.listdir(pasta_gesto) if a.endswith(".npy")), key=_numero_clip)
+
+
+def assinatura(caminho):
+    """[mtime em ns, tamanho] do arquivo: muda quando o clip é regravado"""
+    info = os.stat(caminho)
+    return [info.st_mtime_ns, info.st_size]
+
+
+def proximo_clip(pasta_gesto):
+    """Número do próximo clip_N.npy, sem sobrescrever os existentes"""
+    return max((_numero_clip(a)[0] for a in listar_clips(pasta_gesto)), default=-1) + 1
+
+
+class DatasetStore:
+    def __init__(self, pasta=None, clip_size=None):
+        self.pasta = pasta or config.DATASET_STORE_PATH
+        self._arquivo_clips = os.path.join(self.pasta, "clips.f32")
+        self._arquivo_indice = os.path.join(self.pasta, "indice.jsonl")
+        self._arquivo_header = os.path.join(self.pasta, "header.json")
+
+        if os.path.exists(self._arquivo_header):
+            self._abrir(clip_size)
+        else:
+            self._criar(clip_size or config.CLIP_SIZE)
+
+    def _criar(self, clip_size):
+        os.makedirs(self.pasta, exist_ok=True)
+        self.clip_size = clip_size
+        self.n = 0
+        self.revisao = 0
+        self._indice = []
+        self._restos = False
+        open(self._arquivo_clips, 'wb').close()
+        open(self._arquivo_indice, 'w', encoding='utf-8').close()
+        self._gravar_header()
+
+    def _abrir(self, clip_size):
+        with open(self._arquivo_header, encoding='utf-8') as f:
+            header = json.load(f)
+        if header.get('formato') != FORMATO:
+            raise ValueError(f"{self.pasta} não é um dataset do Libras Bridge")
+        if header.get('versao') != VERSAO:
+            raise ValueError(f"Versão de dataset não suportada: {header.get('versao')}")
+        if clip_size is not None and header['clip_size'] != clip_size:
+            raise ValueError(f"{self.pasta} tem clips de {header['clip_size']} frames, "
+                             f"não {clip_size}")
+        self.clip_size = header['clip_size']
+        self.n = header['clips']
+        self.revisao = header.get('revisao', 0)
+
+        with open(self._arquivo_indice, encoding='utf-8') as f:
+            self._indice = [json.loads(linha) for linha in f if linha.strip()]
+        if len(self._indice) < self.n:
+            raise ValueError(f"Índice de {self.pasta} tem {len(self._indice)} linhas, "
+                             f"header indica {self.n} clips")
+
+        # Linhas além do total vêm de um acréscimo interrompido; são
+        # descartadas no próximo acréscimo (abrir para leitura não altera nada)
+        self._restos = len(self._indice) > self.n
+        self._indice = self._indice[:self.n]
+
+    def _gravar_header(self):
+        header = {
+            'formato': FORMATO,
+            'versao': VERSAO,
+            'clip_size': self.clip_size,
+            'num_coords': NUM_COORDS,
+            'dtype': DTYPE.str,
+            'clips': self.n,
+            'revisao': self.revisao,
+            'atualizado_em': datetime.now().isoformat(timespec='seconds'),
+        }
+        temporario = self._arquivo_header + ".tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(header, f, ensure_ascii=False, indent=2)
+        os.replace(temporario, self._arquivo_header)
+
+    def _reescrever_indice(self):
+        temporario = self._arquivo_indice + ".tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            for registro in self._indice:
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        os.replace(temporario, self._arquivo_indice)
+
+    @property
+    def bytes_por_clip(self):
+        return self.clip_size * NUM_COORDS * DTYPE.itemsize
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def X(self):
+        """(n, clip_size, 63) float32 somente leitura, mapeado do disco"""
+        if self.n == 0:
+            return np.empty((0, self.clip_size, NUM_COORDS), dtype=DTYPE)
+        return np.memmap(self._arquivo_clips, dtype=DTYPE, mode='r',
+                         shape=(self.n, self.clip_size, NUM_COORDS))
+
+    @property
+    def y(self):
+        return np.array([registro['gesto'] for registro in self._indice])
+
+    @property
+    def gestos(self):
+        return sorted({registro['gesto'] for registro in self._indice})
+
+    @property
+    def origens(self):
+        return {registro['origem'] for registro in self._indice if registro.get('origem')}
+
+    def registro(self, i):
+        """Gesto, origem e data do clip na posição i"""
+        return dict(self._indice[i])
+
+    def contagem(self):
+        contagem = {}
+        for registro in self._indice:
+            contagem[registro['gesto']] = contagem.get(registro['gesto'], 0) + 1
+        return contagem
+
+    def adicionar(self, clip, gesto, origem=None):
+        """Acrescenta um clip (clip_size, 63); retorna sua posição no store"""
+        self.adicionar_lote(np.asarray(clip)[np.newaxis], [gesto], [origem])
+        return self.n - 1
+
+    def _validar(self, clips):
+        clips = np.ascontiguousarray(clips, dtype=DTYPE)
+        if clips.ndim != 3 or clips.shape[1:] != (self.clip_size, NUM_COORDS):
+            raise ValueError(f"Clips devem ter formato (n, {self.clip_size}, {NUM_COORDS}), "
+                             f"recebido {clips.shape}")
+        return clips
+
+    def adicionar_lote(self, clips, gestos, origens=None, assinaturas=None):
+        clips = self._validar(clips)
+        if len(gestos) != len(clips):
+            raise ValueError("Um gesto por clip")
+        origens = origens if origens is not None else [None] * len(clips)
+        assinaturas = assinaturas if assinaturas is not None else [None] * len(clips)
+        if not len(clips):
+            return 0
+
+        agora = datetime.now().isoformat(timespec='seconds')
+        self.revisao += 1
+        registros = [{'gesto': str(g), 'origem': o, 'adicionado_em': agora,
+                      'assinatura': a, 'revisao': self.revisao}
+                     for g, o, a in zip(gestos, origens, assinaturas)]
+
+        if self._restos:
+            self._reescrever_indice()
+            self._restos = False
+
+        with open(self._arquivo_clips, 'r+b') as f:
+            f.seek(self.n * self.bytes_por_clip)
+            f.write(clips.tobytes())
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self._arquivo_indice, 'a', encoding='utf-8') as f:
+            for registro in registros:
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+        self._indice.extend(registros)
+        self.n += len(clips)
+        self._gravar_header()
+        return len(clips)
+
+    def substituir_lote(self, posicoes, clips, assinaturas):
+        """Regrava no lugar os clips das posições (arquivo de origem regravado)"""
+        clips = self._validar(clips)
+        if not len(clips):
+            return 0
+        self.revisao += 1
+        agora = datetime.now().isoformat(timespec='seconds')
+        # Clips primeiro, índice e header depois: se a gravação parar no
+        # meio, a assinatura antiga faz a próxima ingestão regravar de novo
+        with open(self._arquivo_clips, 'r+b') as f:
+            for posicao, clip in zip(posicoes, clips):
+                f.seek(posicao * self.bytes_por_clip)
+                f.write(clip.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        for posicao, a in zip(posicoes, assinaturas):
+            self._indice[posicao].update(assinatura=a, revisao=self.revisao, substituido_em=agora)
+        self._reescrever_indice()
+        self._restos = False
+        self._gravar_header()
+        return len(clips)
+
+    def revisados_desde(self, revisao):
+        """Posições gravadas ou regravadas depois da revisão `revisao`"""
+        return np.array([i for i, registro in enumerate(self._indice)
+                         if registro.get('revisao', 0) > revisao], dtype=np.intp)
+
+    def ingerir_pasta(self, pasta=None, gestos=None):
+        """
+        Acrescenta os clips de pasta/<gesto>/*.npy que ainda não estão no
+        store (pela origem 'gesto/arquivo') e regrava no lugar os que
+        mudaram (assinatura diferente). Retorna quantos entraram ou mudaram.
+        """
+        pasta = pasta or config.DATASET_PATH
+        posicoes = {registro['origem']: i for i, registro in enumerate(self._indice)
+                    if registro.get('origem')}
+        clips, rotulos, origens, assinaturas = [], [], [], []
+        alterados, clips_alterados, assinaturas_alteradas = [], [], []
+        sem_assinatura = False
+
+        for gesto in gestos or listar_gestos(pasta):
+            pasta_gesto = os.path.join(pasta, gesto)
+            for arquivo in listar_clips(pasta_gesto):
+                origem = f"{gesto}/{arquivo}"
+                caminho = os.path.join(pasta_gesto, arquivo)
+                atual = assinatura(caminho)
+                posicao = posicoes.get(origem)
+                if posicao is not None:
+                    anterior = self._indice[posicao].get('assinatura')
+                    if anterior is None:
+                        # Ingerido antes das assinaturas: tomado como igual ao arquivo
+                        self._indice[posicao]['assinatura'] = atual
+                        sem_assinatura = True
+                        continue
+                    if anterior == atual:
+                        continue
+                clip = np.load(caminho)
+                if clip.shape != (self.clip_size, NUM_COORDS):
+                    print(f"[AVISO] {origem} ignorado: formato {clip.shape}")
+                    continue
+                if posicao is not None:
+                    alterados.append(posicao)
+                    clips_alterados.append(clip)
+                    assinaturas_alteradas.append(atual)
+                else:
+                    clips.append(clip)
+                    rotulos.append(gesto)
+                    origens.append(origem)
+                    assinaturas.append(atual)
+
+        if alterados:
+            self.substituir_lote(alterados, np.stack(clips_alterados), assinaturas_alteradas)
+            print(f"[INFO] {len(alterados)} clips regravados em dataset/ substituídos no store")
+        elif sem_assinatura:
+            self._reescrever_indice()
+            self._restos = False
+        if not clips:
+            return len(alterados)
+        return len(alterados) + self.adicionar_lote(np.stack(clips), rotulos, origens, assinaturas)
+
+    def info(self):
+        return {
+            'pasta': self.pasta,
+            'clips': self.n,
+            'revisao': self.revisao,
+            'clip_size': self.clip_size,
+            'tamanho_mb': round(self.n * self.bytes_por_clip / 1e6, 2),
+            'gestos': self.contagem(),
+        }
+
+
+def carregar(pasta_dataset=None, pasta_store=None, gestos=None):
+    """
+    Sincroniza o store com dataset/ (só clips novos ou alterados) e retorna (X, y);
+    X é mapeado do disco. Com `gestos`, só os clips desses gestos (cópia).
+    """
+    store = DatasetStore(pasta_store)
+    novos = store.ingerir_pasta(pasta_dataset)
+    if novos:
+        print(f"[INFO] {novos} clips novos ou alterados gravados em {store.pasta}")
+    X, y = store.X, store.y
+    if gestos is not None:
+        selecao = np.isin(y, gestos)
+        X, y = X[selecao], y[selecao]
+    return X, y
+
+
+if __name__ == "__main__":
+    comando = sys.argv[1] if len(sys.argv) > 1 else "info"
+
+    if comando == "info":
+        store = DatasetStore(sys.argv[2] if len(sys.argv) > 2 else None)
+        print(json.dumps(store.info(), ensure_ascii=False, indent=2))
+    elif comando in ("ingerir", "reconstruir"):
+        pasta_dataset = sys.argv[2] if len(sys.argv) > 2 else config.DATASET_PATH
+        pasta_store = sys.argv[3] if len(sys.argv) > 3 else config.DATASET_STORE_PATH
+        if comando == "reconstruir":
+            shutil.rmtree(pasta_store, ignore_errors=True)
+        store = DatasetStore(pasta_store)
+        novos = store.ingerir_pasta(pasta_dataset)
+        print(f"[INFO] {novos} clips novos ou alterados; {len(store)} no total em {store.pasta}")
+        print(json.dumps(store.contagem(), ensure_ascii=False))
+    else:
+        print(__doc__)
+        sys.exit(1)
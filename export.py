@@ -1,88 +1,324 @@
 """
 Utilitários para exportar traduções
 Use este módulo para salvar histórico de traduções
+
+Modo contínuo (streaming=True), para processos que rodam por dias: cada
+tradução é acrescentada assim que chega a arquivos JSONL/CSV rotativos
+(exports/<prefixo>_<data>_<n>.jsonl|csv), com escrita em buffer; a memória
+guarda só as últimas EXPORT_TAIL_SIZE traduções, e as contagens e somas
+de confiança por gesto são mantidas a cada tradução. Resumo e
+estatísticas não percorrem o histórico, e os export_* gravam só as
+traduções em memória. O que fica em buffer vai para o disco a cada
+EXPORT_FLUSH_EVERY traduções ou, numa sessão parada, por um timer
+EXPORT_FLUSH_INTERVAL_S depois da primeira tradução pendente.
+
+Os formatos também são gerados como sequências de trechos de texto
+(linhas_txt, linhas_csv, linhas_json, linhas_jsonl), a partir de qualquer
+iterável de traduções: o servidor usa as mesmas funções para enviar o
+histórico de uma sessão aos poucos (translation_log.py).
 """
 
+import io
 import json
 import csv
+import textwrap
+import threading
+import time
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 
+import config
+
+CAMPOS_BASE = ('gesto', 'confianca', 'timestamp', 'data', 'hora')
+
+
+def montar_item(gesto, confianca, timestamp=None, **extras):
+    """Tradução no formato dos exports (extras: campos adicionais, ex. video)"""
+    if timestamp is None:
+        timestamp = datetime.now()
+    
+    item = {
+        'gesto': gesto,
+        'confianca': confianca,
+        'timestamp': timestamp.isoformat(),
+        'data': timestamp.strftime('%d/%m/%Y'),
+        'hora': timestamp.strftime('%H:%M:%S')
+    }
+    item.update(extras)
+    return item
+
+
+def linhas_txt(itens, campos_extras=()):
+    """Relatório TXT, um trecho por tradução"""
+    yield "="*60 + "\n"
+    yield "HISTÓRICO DE TRADUÇÕES - LIBRAS BRIDGE\n"
+    yield "="*60 + "\n\n"
+    
+    total = 0
+    for item in itens:
+        texto = (f"Data: {item['data']} às {item['hora']}\n"
+                 f"Gesto: {item['gesto'].upper()}\n"
+                 f"Confiança: {item['confianca']}%\n")
+        for chave in campos_extras:
+            if chave in item:
+                texto += f"{chave.capitalize()}: {item[chave]}\n"
+        yield texto + "-"*60 + "\n\n"
+        total += 1
+    
+    yield f"\nTotal de traduções: {total}\n"
+
+
+def linhas_csv(itens, campos_extras=()):
+    """CSV com cabeçalho, uma linha por tradução"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=['data', 'hora', 'gesto', 'confianca'] + list(campos_extras),
+                            extrasaction='ignore')
+    writer.writeheader()
+    for item in itens:
+        writer.writerow(item)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Só o cabeçalho, se não houver traduções
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def linhas_json(itens, metadata):
+    """Mesmo documento de export_json ({metadata, traducoes}), por partes"""
+    cabecalho = json.dumps({'metadata': metadata}, ensure_ascii=False, indent=2)
+    yield cabecalho[:-2] + ',\n  "traducoes": ['
+    separador = "\n"
+    for item in itens:
+        yield separador + textwrap.indent(json.dumps(item, ensure_ascii=False, indent=2), "    ")
+        separador = ",\n"
+    yield "]\n}" if separador == "\n" else "\n  ]\n}"
+
+
+def linhas_jsonl(itens):
+    """Uma tradução JSON por linha"""
+    for item in itens:
+        yield json.dumps(item, ensure_ascii=False) + "\n"
+
+
+class _ArquivoRotativo:
+    """Arquivo de texto só de acréscimo; abre o próximo ao passar de max_bytes"""
+    
+    def __init__(self, pasta, prefixo, extensao, max_bytes):
+        self.pasta = pasta
+        self.prefixo = prefixo
+        self.extensao = extensao
+        self.max_bytes = max_bytes
+        self.arquivos = []
+        self.cabecalho = ''  # escrito no início de cada arquivo (CSV)
+        self._sequencia = 0
+        self._f = None
+        self._bytes = 0
+    
+    def escrever(self, texto):
+        if self._f is None or self._bytes >= self.max_bytes:
+            self.rotacionar()
+        self._f.write(texto)
+        self._bytes += len(texto.encode('utf-8'))
+    
+    def rotacionar(self):
+        self.fechar()
+        data = datetime.now().strftime('%Y%m%d_%H%M%S')
+        # 'x': outro exportador (ou processo) com o mesmo prefixo pode ter
+        # criado o mesmo nome no mesmo segundo; nunca truncar o arquivo dele
+        while True:
+            caminho = self.pasta / f"{self.prefixo}_{data}_{self._sequencia:03d}.{self.extensao}"
+            self._sequencia += 1
+            try:
+                self._f = open(caminho, 'x', encoding='utf-8', newline='')
+                break
+            except FileExistsError:
+                continue
+        self._bytes = 0
+        self.arquivos.append(str(caminho))
+        if self.cabecalho:
+            self.escrever(self.cabecalho)
+    
+    def flush(self):
+        if self._f is not None:
+            self._f.flush()
+    
+    def fechar(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+
 class TranslationExporter:
-    def __init__(self, output_dir="exports"):
+    def __init__(self, output_dir="exports", streaming=False, prefixo="traducoes", formatos=None,
+                 tail_size=None):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
-        self.history = []
+        self.streaming = streaming
+        # Modo contínuo: só as últimas traduções ficam em memória
+        self.history = deque(maxlen=tail_size or config.EXPORT_TAIL_SIZE) if streaming else []
+        
+        # Estatísticas mantidas a cada tradução (resumo sem percorrer o histórico)
+        self.total = 0
+        self.confianca_total = 0
+        self.gestos_count = {}
+        self.confianca_por_gesto = {}
+        self.primeiro = None
+        self.ultimo = None
+        self._extras = []
+        
+        self._arquivos = {}
+        self._pendentes = 0
+        self._ultimo_flush = time.monotonic()
+        self._timer = None
+        self._lock = threading.Lock()  # o timer grava de outra thread
+        if streaming:
+            max_bytes = config.EXPORT_ROTATE_MB * 1024 * 1024
+            for formato in formatos or config.EXPORT_STREAM_FORMATS:
+                if formato not in ('jsonl', 'csv'):
+                    raise ValueError(f"Formato contínuo não suportado: {formato} (use 'jsonl' ou 'csv')")
+                self._arquivos[formato] = _ArquivoRotativo(self.output_dir, prefixo, formato, max_bytes)
+            self._csv_buffer = io.StringIO()
     
-    def add_translation(self, gesto, confianca, timestamp=None):
-        """Adiciona uma tradução ao histórico"""
-        if timestamp is None:
-            timestamp = datetime.now()
+    def add_translation(self, gesto, confianca, timestamp=None, **extras):
+        """Adiciona uma tradução ao histórico (extras: campos adicionais, ex. video)"""
+        item = montar_item(gesto, confianca, timestamp, **extras)
+        self.history.append(item)
+        
+        self.total += 1
+        self.confianca_total += confianca
+        self.gestos_count[gesto] = self.gestos_count.get(gesto, 0) + 1
+        self.confianca_por_gesto[gesto] = self.confianca_por_gesto.get(gesto, 0) + confianca
+        if self.primeiro is None:
+            self.primeiro = item
+        self.ultimo = item
+        
+        novos_campos = False
+        for chave in extras:
+            if chave not in CAMPOS_BASE and chave not in self._extras:
+                self._extras.append(chave)
+                novos_campos = True
+        
+        if self.streaming:
+            with self._lock:
+                self._escrever(item, novos_campos)
+    
+    def _campos_extras(self):
+        return list(self._extras)
+    
+    def _escrever(self, item, novos_campos):
+        """Acrescenta a tradução aos arquivos contínuos (flush a cada N ou T segundos)"""
+        if 'jsonl' in self._arquivos:
+            self._arquivos['jsonl'].escrever(next(linhas_jsonl([item])))
+        
+        if 'csv' in self._arquivos:
+            arquivo = self._arquivos['csv']
+            if novos_campos or not arquivo.cabecalho:
+                # Colunas novas: novo arquivo, com o cabeçalho atualizado
+                self._csv_writer = csv.DictWriter(self._csv_buffer, extrasaction='ignore',
+                                                  fieldnames=['data', 'hora', 'gesto', 'confianca'] + self._extras)
+                self._csv_writer.writeheader()
+                arquivo.cabecalho = self._retirar_csv()
+                arquivo.rotacionar()
+            self._csv_writer.writerow(item)
+            arquivo.escrever(self._retirar_csv())
         
-        self.history.append({
-            'gesto': gesto,
-            'confianca': confianca,
-            'timestamp': timestamp.isoformat(),
-            'data': timestamp.strftime('%d/%m/%Y'),
-            'hora': timestamp.strftime('%H:%M:%S')
-        })
+        self._pendentes += 1
+        if (self._pendentes >= config.EXPORT_FLUSH_EVERY
+                or time.monotonic() - self._ultimo_flush >= config.EXPORT_FLUSH_INTERVAL_S):
+            self._gravar()
+        elif self._timer is None:
+            # Sem novas traduções, o buffer ainda vai para o disco no prazo
+            self._timer = threading.Timer(config.EXPORT_FLUSH_INTERVAL_S, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def _retirar_csv(self):
+        texto = self._csv_buffer.getvalue()
+        self._csv_buffer.seek(0)
+        self._csv_buffer.truncate()
+        return texto
+    
+    def flush(self):
+        """Grava em disco as traduções ainda em buffer (modo contínuo)"""
+        with self._lock:
+            self._gravar()
+    
+    def _gravar(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for arquivo in self._arquivos.values():
+            arquivo.flush()
+        self._pendentes = 0
+        self._ultimo_flush = time.monotonic()
+    
+    def close(self):
+        with self._lock:
+            self._gravar()
+            for arquivo in self._arquivos.values():
+                arquivo.fechar()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def arquivos(self):
+        """Arquivos contínuos gravados até agora, por formato"""
+        return {formato: list(arquivo.arquivos) for formato, arquivo in self._arquivos.items()}
     
     def export_txt(self, filename=None):
-        """Exporta para arquivo TXT"""
+        """Exporta para arquivo TXT (modo contínuo: só as traduções em memória)"""
+        self.flush()
         if filename is None:
             filename = f"traducoes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
         
         filepath = self.output_dir / filename
         
         with open(filepath, 'w', encoding='utf-8') as f:
-            f.write("="*60 + "\n")
-            f.write("HISTÓRICO DE TRADUÇÕES - LIBRAS BRIDGE\n")
-            f.write("="*60 + "\n\n")
-            
-            for item in self.history:
-                f.write(f"Data: {item['data']} às {item['hora']}\n")
-                f.write(f"Gesto: {item['gesto'].upper()}\n")
-                f.write(f"Confiança: {item['confianca']}%\n")
-                f.write("-"*60 + "\n\n")
-            
-            f.write(f"\nTotal de traduções: {len(self.history)}\n")
+            f.writelines(linhas_txt(self.history, self._campos_extras()))
+            if len(self.history) < self.total:
+                f.write(f"(últimas {len(self.history)} de {self.total}; todas em {self._listar_arquivos()})\n")
         
         print(f"✅ Exportado para: {filepath}")
         return str(filepath)
     
     def export_csv(self, filename=None):
-        """Exporta para arquivo CSV"""
+        """Exporta para arquivo CSV (modo contínuo: só as traduções em memória)"""
+        self.flush()
         if filename is None:
             filename = f"traducoes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         
         filepath = self.output_dir / filename
         
         with open(filepath, 'w', encoding='utf-8', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=['data', 'hora', 'gesto', 'confianca'])
-            writer.writeheader()
-            writer.writerows(self.history)
+            f.writelines(linhas_csv(self.history, self._campos_extras()))
         
         print(f"✅ Exportado para: {filepath}")
         return str(filepath)
     
     def export_json(self, filename=None):
-        """Exporta para arquivo JSON"""
+        """Exporta para arquivo JSON (modo contínuo: só as traduções em memória)"""
+        self.flush()
         if filename is None:
             filename = f"traducoes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
         filepath = self.output_dir / filename
         
-        data = {
-            'metadata': {
-                'total_traducoes': len(self.history),
-                'exportado_em': datetime.now().isoformat(),
-                'sistema': 'Libras Bridge v1.0'
-            },
-            'traducoes': self.history
+        metadata = {
+            'total_traducoes': self.total,
+            'traducoes_exportadas': len(self.history),
+            'exportado_em': datetime.now().isoformat(),
+            'sistema': 'Libras Bridge v1.0'
         }
+        if self.streaming:
+            metadata['arquivos'] = self.arquivos()
         
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.writelines(linhas_json(self.history, metadata))
         
         print(f"✅ Exportado para: {filepath}")
         return str(filepath)
@@ -94,32 +330,24 @@ class TranslationExporter:
         
         filepath = self.output_dir / filename
         
-        # Calcular estatísticas
-        gestos_count = {}
-        confianca_total = 0
-        
-        for item in self.history:
-            gesto = item['gesto']
-            gestos_count[gesto] = gestos_count.get(gesto, 0) + 1
-            confianca_total += item['confianca']
-        
-        confianca_media = confianca_total / len(self.history) if self.history else 0
+        confianca_media = self.confianca_total / self.total if self.total else 0
         
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write("="*60 + "\n")
             f.write("ESTATÍSTICAS - LIBRAS BRIDGE\n")
             f.write("="*60 + "\n\n")
             
-            f.write(f"Total de traduções: {len(self.history)}\n")
+            f.write(f"Total de traduções: {self.total}\n")
             f.write(f"Confiança média: {confianca_media:.2f}%\n\n")
             
             f.write("Gestos mais usados:\n")
             f.write("-"*60 + "\n")
             
-            sorted_gestos = sorted(gestos_count.items(), key=lambda x: x[1], reverse=True)
+            sorted_gestos = sorted(self.gestos_count.items(), key=lambda x: x[1], reverse=True)
             for gesto, count in sorted_gestos:
-                percentage = (count / len(self.history)) * 100
-                f.write(f"  {gesto.upper()}: {count} vezes ({percentage:.1f}%)\n")
+                percentage = (count / self.total) * 100
+                media = self.confianca_por_gesto[gesto] / count
+                f.write(f"  {gesto.upper()}: {count} vezes ({percentage:.1f}%), confiança média {media:.1f}%\n")
             
             f.write("\n" + "="*60 + "\n")
         
@@ -127,26 +355,36 @@ class TranslationExporter:
         return str(filepath)
     
     def clear_history(self):
-        """Limpa o histórico"""
+        """Limpa o histórico e as estatísticas (os arquivos contínuos são mantidos)"""
         self.history.clear()
+        self.total = 0
+        self.confianca_total = 0
+        self.gestos_count = {}
+        self.confianca_por_gesto = {}
+        self.primeiro = None
+        self.ultimo = None
+        self._extras = []
+        if 'csv' in self._arquivos:
+            # A próxima tradução abre um arquivo com o cabeçalho sem as colunas antigas
+            self._arquivos['csv'].cabecalho = ''
         print("✅ Histórico limpo")
     
     def get_summary(self):
         """Retorna resumo do histórico"""
-        if not self.history:
+        if not self.total:
             return "Nenhuma tradução registrada"
         
-        gestos_count = {}
-        for item in self.history:
-            gesto = item['gesto']
-            gestos_count[gesto] = gestos_count.get(gesto, 0) + 1
-        
         return {
-            'total': len(self.history),
-            'gestos': gestos_count,
-            'primeiro': self.history[0],
-            'ultimo': self.history[-1]
+            'total': self.total,
+            'gestos': dict(self.gestos_count),
+            'confianca_media': {gesto: soma / self.gestos_count[gesto]
+                                for gesto, soma in self.confianca_por_gesto.items()},
+            'primeiro': self.primeiro,
+            'ultimo': self.ultimo
         }
+    
+    def _listar_arquivos(self):
+        return ', '.join(caminho for caminhos in self.arquivos().values() for caminho in caminhos)
 
 
 # Exemplo de uso
@@ -187,4 +425,22 @@ if __name__ == "__main__":
     print("RESUMO")
     print("="*60)
     summary = exporter.get_summary()
-    print(json.dumps(summary, indent=2, ensure_ascii=False))
\ No newline at end of file
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    
+    # Modo contínuo: custo por tradução e do resumo independe do histórico
+    print("\n" + "="*60)
+    print("MODO CONTÍNUO")
+    print("="*60)
+    n = 20000
+    with TranslationExporter(streaming=True, prefixo="teste_continuo") as continuo:
+        inicio = time.perf_counter()
+        for i in range(n):
+            gesto, conf = gestos_exemplo[i % len(gestos_exemplo)]
+            continuo.add_translation(gesto, conf, base_time + timedelta(seconds=i))
+        duracao = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        continuo.get_summary()
+        duracao_resumo = time.perf_counter() - inicio
+        print(f"{n} traduções em {duracao:.2f}s ({n / duracao:.0f}/s), resumo em {duracao_resumo * 1e6:.0f} µs, "
+              f"{len(continuo.history)} em memória")
+        print(json.dumps(continuo.arquivos(), indent=2, ensure_ascii=False))
\ No newline at end of file
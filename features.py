@@ -0,0 +1,190 @@
+"""
+Extração de features dos clips de landmarks do Libras Bridge
+Usada no treinamento e em todos os caminhos de inferência, para que o
+modelo sempre receba o mesmo vetor com que foi treinado.
+
+Configurações (FeatureSpec):
+- normalizar: coordenadas relativas ao punho e divididas pelo tamanho da mão
+- k_frames: reamostra o clip para K frames (0 = mantém os frames originais)
+- velocidade: acrescenta as diferenças entre frames consecutivos
+
+Uso:
+    python features.py   # compara acurácia e latência de cada configuração
+"""
+
+import json
+import time
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+PUNHO = 0
+MCP_MEDIO = 9  # base do dedo médio: punho -> MCP_MEDIO define a escala da mão
+
+
+class FeatureSpec:
+    def __init__(self, normalizar=False, k_frames=0, velocidade=False):
+        self.normalizar = bool(normalizar)
+        self.k_frames = int(k_frames or 0)
+        self.velocidade = bool(velocidade)
+
+    def to_dict(self):
+        return {
+            'normalizar': self.normalizar,
+            'k_frames': self.k_frames,
+            'velocidade': self.velocidade,
+        }
+
+    @classmethod
+    def from_dict(cls, dados):
+        return cls(**(dados or {}))
+
+    def is_raw(self):
+        """Coordenadas absolutas achatadas (formato original, 30x63 = 1890)"""
+        return not (self.normalizar or self.k_frames or self.velocidade)
+
+    def n_features(self, clip_size):
+        frames = self.k_frames or clip_size
+        n = frames * NUM_LANDMARKS * 3
+        if self.velocidade:
+            n += (frames - 1) * NUM_LANDMARKS * 3
+        return n
+
+    def __repr__(self):
+        return f"FeatureSpec({json.dumps(self.to_dict())})"
+
+    def __eq__(self, outro):
+        return isinstance(outro, FeatureSpec) and self.to_dict() == outro.to_dict()
+
+
+def spec_do_modelo(modelo):
+    """FeatureSpec gravado no modelo pelo treinamento (padrão: brutas)"""
+    return FeatureSpec.from_dict(getattr(modelo, 'feature_spec_', None))
+
+
+def spec_da_config():
+    import config
+
+    return FeatureSpec(config.FEATURE_NORMALIZE, config.FEATURE_K_FRAMES, config.FEATURE_VELOCITY)
+
+
+def reamostrar(pontos, k):
+    """Interpolação linear no eixo do tempo: (n, T, ...) -> (n, k, ...)"""
+    T = pontos.shape[1]
+    t = np.linspace(0, T - 1, k, dtype=np.float32)
+    i0 = np.floor(t).astype(np.intp)
+    i1 = np.minimum(i0 + 1, T - 1)
+    peso = (t - i0).reshape((1, k) + (1,) * (pontos.ndim - 2))
+    return pontos[:, i0] * (1 - peso) + pontos[:, i1] * peso
+
+
+def extrair_features(clips, spec):
+    """
+    clips: (n, T, 63) ou um único clip (T, 63)
+    Retorna (n, d) float32. Com o spec bruto, dados float32 contíguos
+    (ex.: a janela do ClipBuffer) são apenas remodelados, sem cópia.
+    """
+    X = np.asarray(clips, dtype=np.float32)
+    if X.ndim == 2:
+        X = X[np.newaxis]
+    n, T = X.shape[:2]
+
+    if spec.is_raw():
+        return X.reshape(n, -1)
+
+    pontos = X.reshape(n, T, NUM_LANDMARKS, 3)
+
+    if spec.normalizar:
+        pontos = pontos - pontos[:, :, PUNHO:PUNHO + 1, :]
+        escala = np.linalg.norm(pontos[:, :, MCP_MEDIO, :2], axis=-1)
+        pontos = pontos / np.maximum(escala, 1e-6)[:, :, np.newaxis, np.newaxis]
+
+    if spec.k_frames and spec.k_frames != T:
+        pontos = reamostrar(pontos, spec.k_frames)
+
+    partes = [pontos.reshape(n, -1)]
+    if spec.velocidade:
+        partes.append(np.diff(pontos, axis=1).reshape(n, -1))
+
+    return np.concatenate(partes, axis=1).astype(np.float32, copy=False)
+
+
+CONFIGURACOES_PADRAO = [
+    FeatureSpec(),
+    FeatureSpec(normalizar=True),
+    FeatureSpec(normalizar=True, k_frames=15),
+    FeatureSpec(normalizar=True, k_frames=10),
+    FeatureSpec(normalizar=True, k_frames=15, velocidade=True),
+    FeatureSpec(normalizar=True, k_frames=10, velocidade=True),
+]
+
+
+def comparar_configuracoes(X, y, specs=CONFIGURACOES_PADRAO, n_estimators=100, folds=5):
+    """Acurácia (validação cruzada) e latência de cada configuração de features"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import cross_val_score
+
+    from forest_engine import CompiledForest
+
+    resultados = []
+    for spec in specs:
+        inicio = time.perf_counter()
+        F = extrair_features(X, spec)
+        tempo_extracao_lote = time.perf_counter() - inicio
+
+        modelo = RandomForestClassifier(n_estimators=n_estimators, random_state=42, n_jobs=-1)
+        inicio = time.perf_counter()
+        acuracias = cross_val_score(modelo, F, y, cv=folds, n_jobs=-1)
+        tempo_cv = time.perf_counter() - inicio
+
+        modelo.fit(F, y)
+        compilado = CompiledForest.from_sklearn(modelo)
+
+        # Latência por frame como na inferência: um clip por vez
+        clip = X[:1]
+        repeticoes = 200
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            extrair_features(clip, spec)
+        extracao_ms = (time.perf_counter() - inicio) / repeticoes * 1000
+
+        entrada = extrair_features(clip, spec)
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            compilado.predict(entrada)
+        predicao_ms = (time.perf_counter() - inicio) / repeticoes * 1000
+
+        resultados.append({
+            'spec': spec.to_dict(),
+            'n_features': F.shape[1],
+            'acuracia_media': float(acuracias.mean()),
+            'acuracia_desvio': float(acuracias.std()),
+            'tempo_cv_s': tempo_cv,
+            'extracao_lote_ms': tempo_extracao_lote * 1000,
+            'extracao_ms': extracao_ms,
+            'predicao_ms': predicao_ms,
+            'nos_floresta': len(compilado.feature),
+        })
+    return resultados
+
+
+if __name__ == "__main__":
+    from preprocessamento import carregar_dataset
+
+    X, y = carregar_dataset()
+    print(f"[INFO] {len(X)} clips, formato {X.shape}\n")
+
+    resultados = comparar_configuracoes(X, y)
+
+    print("=" * 96)
+    print(f"{'configuração':<44} {'dim':>5} {'acurácia':>15} {'extração':>10} {'predição':>10} {'nós':>7}")
+    print("=" * 96)
+    for r in resultados:
+        spec = r['spec']
+        nome = (f"norm={'s' if spec['normalizar'] else 'n'} "
+                f"k={spec['k_frames'] or '-'} vel={'s' if spec['velocidade'] else 'n'}")
+        print(f"{nome:<44} {r['n_features']:>5} "
+              f"{r['acuracia_media'] * 100:>8.1f}±{r['acuracia_desvio'] * 100:<4.1f}% "
+              f"{r['extracao_ms']:>8.3f}ms {r['predicao_ms']:>8.3f}ms {r['nos_floresta']:>7}")
+    print("=" * 96)
+    print("Latências por clip (lote 1); predição com a floresta compilada de 100 árvores.")
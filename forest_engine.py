@@ -0,0 +1,338 @@
+"""
+Motor de inferência compilado para o RandomForest do Libras Bridge
+Converte a floresta treinada (modelo_libras.pkl) em arrays NumPy planos
+(feature, threshold, filhos e valores das folhas) e percorre todas as
+árvores de forma vetorizada, sem o overhead por árvore do sklearn.
+
+A floresta é gravada no formato de artefato de model_artifact.py
+(header JSON + arrays com memory-map), que carrega sem sklearn.
+
+Uso:
+    python forest_engine.py converter [modelo.pkl] [pasta_artefato]
+    python forest_engine.py benchmark [modelo.pkl] [pasta_artefato]
+"""
+
+import copy
+import hashlib
+import os
+import sys
+import time
+
+import numpy as np
+
+import model_artifact
+
+TIPO_ARTEFATO = "compiled_forest"
+
+
+class FlorestaCombinada:
+    """
+    Florestas sklearn treinadas em momentos diferentes (treino incremental),
+    cada uma com as suas classes, votando como uma só floresta no espaço da
+    união das classes. A probabilidade de cada gesto é a média entre as
+    árvores que o conhecem: árvores treinadas antes de um gesto existir se
+    abstêm nele, em vez de votar zero. As árvores não são alteradas; só as
+    colunas de predict_proba de cada floresta são remapeadas.
+    """
+
+    def __init__(self, florestas):
+        self.florestas = [f for f in florestas if len(f.estimators_)]
+        self.classes_ = np.unique(np.concatenate([np.asarray(f.classes_) for f in self.florestas]))
+        self.n_classes_ = len(self.classes_)
+        self.n_features_in_ = getattr(self.florestas[-1], 'n_features_in_', None)
+
+    @classmethod
+    def combinar(cls, base, bloco, max_arvores=None):
+        """
+        Florestas de `base` (floresta ou FlorestaCombinada) seguidas de
+        `bloco`; acima de max_arvores, as árvores mais antigas saem primeiro
+        """
+        florestas = list(getattr(base, 'florestas', [base])) + [bloco]
+        excesso = sum(len(f.estimators_) for f in florestas) - max_arvores if max_arvores else 0
+        mantidas = []
+        for floresta in florestas:
+            if excesso > 0 and floresta is not bloco:
+                cortadas = min(excesso, len(floresta.estimators_))
+                excesso -= cortadas
+                floresta = copy.copy(floresta)
+                floresta.estimators_ = floresta.estimators_[cortadas:]
+            mantidas.append(floresta)
+        return cls(mantidas)
+
+    @property
+    def estimators_(self):
+        return [arvore for floresta in self.florestas for arvore in floresta.estimators_]
+
+    @property
+    def n_estimators(self):
+        return sum(len(floresta.estimators_) for floresta in self.florestas)
+
+    def colunas(self, floresta):
+        """Posição das classes de `floresta` em self.classes_"""
+        return np.searchsorted(self.classes_, np.asarray(floresta.classes_))
+
+    def arvores_por_classe(self):
+        """Quantas árvores conhecem cada gesto (o denominador da média)"""
+        contagem = np.zeros(self.n_classes_)
+        for floresta in self.florestas:
+            contagem[self.colunas(floresta)] += len(floresta.estimators_)
+        return contagem
+
+    def set_params(self, **params):
+        for floresta in self.florestas:
+            floresta.set_params(**params)
+        return self
+
+    def predict_proba(self, X):
+        soma = np.zeros((len(X), self.n_classes_))
+        for floresta in self.florestas:
+            soma[:, self.colunas(floresta)] += len(floresta.estimators_) * floresta.predict_proba(X)
+        proba = soma / self.arvores_por_classe()
+        return proba / proba.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+class CompiledForest:
+    def __init__(self, feature, threshold, left, right, values, roots, classes, max_depth,
+                 n_features=None):
+        self.feature = feature        # (n_nos,) índice da feature testada (0 nas folhas)
+        self.threshold = threshold    # (n_nos,) limiar do teste X[feature] <= threshold
+        self.left = left              # (n_nos,) filho esquerdo (folhas apontam para si mesmas)
+        self.right = right            # (n_nos,) filho direito
+        self.values = values          # (n_nos, n_classes) probabilidades normalizadas por nó
+        self.roots = roots            # (n_arvores,) índice da raiz de cada árvore
+        self.classes_ = classes
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = n_features
+        self.origem_sha1 = ''  # SHA-1 do .pkl de origem, para detectar conversões desatualizadas
+        self.feature_spec_ = None  # FeatureSpec usado no treinamento (features.py)
+        self.clip_size = None  # Frames por clip com que o modelo foi treinado
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    @classmethod
+    def from_sklearn(cls, modelo):
+        """Converte um RandomForestClassifier (ou ExtraTrees, ou FlorestaCombinada) já treinado"""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        deslocamento = 0
+        max_depth = 0
+
+        # Cada árvore vota nas colunas das classes da sua floresta, com peso
+        # n_arvores / árvores que conhecem a classe (igual a 1 numa floresta só)
+        classes = np.asarray(modelo.classes_)
+        florestas = getattr(modelo, 'florestas', [modelo])
+        if isinstance(modelo, FlorestaCombinada):
+            peso = modelo.n_estimators / modelo.arvores_por_classe()
+        else:
+            peso = np.ones(len(classes))
+        arvores = [(arvore, np.searchsorted(classes, np.asarray(floresta.classes_)))
+                   for floresta in florestas for arvore in floresta.estimators_]
+
+        for arvore, colunas in arvores:
+            t = arvore.tree_
+            n = t.node_count
+            folha = t.children_left == -1
+            indices = np.arange(n)
+
+            features.append(np.where(folha, 0, t.feature))
+            thresholds.append(np.where(folha, 0.0, t.threshold))
+            # Folhas apontam para si mesmas: continuar descendo não muda o nó
+            lefts.append(np.where(folha, indices, t.children_left) + deslocamento)
+            rights.append(np.where(folha, indices, t.children_right) + deslocamento)
+
+            # Mesma normalização de DecisionTreeClassifier.predict_proba
+            valor = t.value[:, 0, :].astype(np.float64)
+            soma = valor.sum(axis=1, keepdims=True)
+            soma[soma == 0] = 1.0
+            valores = np.zeros((n, len(classes)))
+            valores[:, colunas] = valor / soma * peso[colunas]
+            values.append(valores)
+
+            roots.append(deslocamento)
+            deslocamento += n
+            max_depth = max(max_depth, t.max_depth)
+
+        compilado = cls(
+            feature=np.concatenate(features).astype(np.int32),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.int32),
+            right=np.concatenate(rights).astype(np.int32),
+            values=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int32),
+            classes=classes,
+            max_depth=max_depth,
+            n_features=getattr(modelo, 'n_features_in_', None),
+        )
+        compilado.feature_spec_ = getattr(modelo, 'feature_spec_', None)
+        return compilado
+
+    def _folhas(self, X):
+        """Índice da folha alcançada em cada árvore: (n_amostras, n_arvores)"""
+        # O sklearn compara em float32 contra limiares float64
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        nos = np.broadcast_to(self.roots, (X.shape[0], len(self.roots))).copy()
+        linhas = np.arange(X.shape[0])[:, None]
+        for _ in range(self.max_depth):
+            vai_esquerda = X[linhas, self.feature[nos]] <= self.threshold[nos]
+            nos = np.where(vai_esquerda, self.left[nos], self.right[nos])
+        return nos
+
+    def predict_proba(self, X):
+        folhas = self._folhas(X)
+        # Normalizado por linha: numa floresta só, a soma das linhas é o número de árvores
+        soma = self.values[folhas].sum(axis=1)
+        return soma / soma.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+    def save(self, pasta):
+        """Grava no formato de artefato (model_artifact.py)"""
+        return model_artifact.salvar(
+            pasta,
+            arrays={
+                'feature': self.feature,
+                'threshold': self.threshold,
+                'left': self.left,
+                'right': self.right,
+                'values': self.values,
+                'roots': self.roots,
+            },
+            metadados={
+                'tipo': TIPO_ARTEFATO,
+                'labels': [str(c) for c in self.classes_],
+                'clip_size': self.clip_size,
+                'n_features': self.n_features_in_,
+                'feature_spec': self.feature_spec_,
+                'max_depth': self.max_depth,
+                'n_arvores': self.n_estimators,
+                'origem_sha1': self.origem_sha1,
+            }
+        )
+
+    @classmethod
+    def load(cls, pasta, mmap=True):
+        header, arrays = model_artifact.carregar(pasta, mmap=mmap)
+        if header.get('tipo') != TIPO_ARTEFATO:
+            raise ValueError(f"Tipo de artefato não suportado: {header.get('tipo')}")
+
+        compilado = cls(
+            classes=np.asarray(header['labels']),
+            max_depth=header['max_depth'],
+            n_features=header.get('n_features'),
+            **arrays
+        )
+        compilado.origem_sha1 = header.get('origem_sha1', '')
+        compilado.feature_spec_ = header.get('feature_spec')
+        compilado.clip_size = header.get('clip_size')
+        return compilado
+
+
+def sha1_arquivo(caminho):
+    h = hashlib.sha1()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def carregar_modelo(model_path, artifact_path=None):
+    """
+    Carrega o artefato compilado se existir e tiver sido gerado a partir do
+    .pkl atual (ou se não houver .pkl); caso contrário, carrega o modelo
+    sklearn com joblib.
+    """
+    if artifact_path and os.path.exists(artifact_path):
+        modelo = CompiledForest.load(artifact_path)
+        if os.path.exists(model_path) and modelo.origem_sha1 != sha1_arquivo(model_path):
+            print(f"[AVISO] {artifact_path} não corresponde a {model_path}; "
+                  f"usando o modelo sklearn. Rode: python forest_engine.py converter")
+        else:
+            print(f"[INFO] Floresta compilada carregada: {artifact_path} "
+                  f"({modelo.n_estimators} árvores)")
+            return modelo
+
+    import joblib
+    return joblib.load(model_path)
+
+
+def converter(model_path, artifact_path, clip_size=None):
+    import joblib
+
+    import config
+
+    modelo = joblib.load(model_path)
+    compilado = CompiledForest.from_sklearn(modelo)
+    compilado.origem_sha1 = sha1_arquivo(model_path)
+    compilado.clip_size = clip_size or config.CLIP_SIZE
+    compilado.save(artifact_path)
+    print(f"[INFO] {model_path} -> {artifact_path}/ "
+          f"({compilado.n_estimators} árvores, {len(compilado.feature)} nós, "
+          f"profundidade máx. {compilado.max_depth})")
+    return compilado
+
+
+def benchmark(model_path, artifact_path, tamanhos=(1, 2, 4, 8, 16, 32, 64, 128, 256), repeticoes=20):
+    import warnings
+
+    import joblib
+
+    from features import extrair_features, spec_do_modelo
+    from preprocessamento import carregar_dataset
+
+    with warnings.catch_warnings(record=True) as avisos:
+        warnings.simplefilter('always')
+        modelo = joblib.load(model_path)
+    compilado = CompiledForest.load(artifact_path)
+
+    if any(type(a.message).__name__ == 'InconsistentVersionWarning' for a in avisos):
+        print("[AVISO] Modelo treinado com outra versão do sklearn: as probabilidades "
+              "do sklearn instalado podem não ser confiáveis para comparação")
+
+    clips, _ = carregar_dataset()
+    X = extrair_features(clips, spec_do_modelo(modelo))
+    print(f"[INFO] Verificando equivalência em {len(X)} clips do dataset...")
+    iguais = np.array_equal(modelo.predict(X), compilado.predict(X))
+    erro_proba = np.abs(modelo.predict_proba(X) - compilado.predict_proba(X)).max()
+    print(f"  predições idênticas: {iguais} | diferença máx. de probabilidade: {erro_proba:.2e}")
+
+    print("\n" + "=" * 60)
+    print(f"{'lote':>6} {'sklearn (ms)':>14} {'compilado (ms)':>16} {'ganho':>8}")
+    print("=" * 60)
+    rng = np.random.default_rng(42)
+    for tamanho in tamanhos:
+        lote = X[rng.integers(0, len(X), tamanho)]
+        tempos = []
+        for prever in (modelo.predict, compilado.predict):
+            prever(lote)  # aquecimento
+            inicio = time.perf_counter()
+            for _ in range(repeticoes):
+                prever(lote)
+            tempos.append((time.perf_counter() - inicio) / repeticoes * 1000)
+        print(f"{tamanho:>6} {tempos[0]:>14.3f} {tempos[1]:>16.3f} {tempos[0] / tempos[1]:>7.1f}x")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    import config
+
+    comando = sys.argv[1] if len(sys.argv) > 1 else "converter"
+    model_path = sys.argv[2] if len(sys.argv) > 2 else config.MODEL_PATH
+    artifact_path = sys.argv[3] if len(sys.argv) > 3 else config.MODEL_ARTIFACT_PATH
+
+    if comando == "converter":
+        converter(model_path, artifact_path)
+    elif comando == "benchmark":
+        if not os.path.exists(artifact_path):
+            converter(model_path, artifact_path)
+        benchmark(model_path, artifact_path)
+    else:
+        print(__doc__)
+        sys.exit(1)
@@ -0,0 +1,96 @@
+"""
+Caixa de frames por sessão com contrapressão (backpressure)
+Guarda só o frame mais recente ainda não processado: um frame que chega
+enquanto outro espera substitui o anterior (descartado). A latência medida
+entre a chegada e o fim do processamento define o intervalo de envio
+sugerido ao cliente (evento 'rate_hint'), de modo que a latência dos
+resultados fica limitada em vez de crescer com a fila. O intervalo
+sugerido nunca é menor que o inicial: a dica só reduz a taxa de envio.
+"""
+
+import threading
+import time
+
+
+class FrameMailbox:
+    def __init__(self, intervalo_inicial_ms=100, intervalo_max_ms=1000, fator=1.5, alpha=0.2):
+        self.intervalo_ms = intervalo_inicial_ms
+        # Servidor folgado volta ao intervalo do cliente, sem pedir mais frames
+        self.intervalo_min_ms = intervalo_inicial_ms
+        self.intervalo_max_ms = intervalo_max_ms
+        self.fator = fator   # intervalo sugerido = latência média x fator
+        self.alpha = alpha   # peso da média móvel exponencial da latência
+        self.latencia_ms = None
+        self.fechada = False
+
+        self._pendente = None  # (frame, instante de chegada)
+        self._processando = False
+        self._lock = threading.Lock()
+
+        self.recebidos = 0
+        self.descartados = 0
+        self.processados = 0
+
+    def depositar(self, frame):
+        """
+        Guarda o frame no lugar do pendente. Retorna True se não há
+        processamento em andamento (quem chamou deve iniciar o consumidor).
+        """
+        with self._lock:
+            self.recebidos += 1
+            if self._pendente is not None:
+                self.descartados += 1
+            self._pendente = (frame, time.perf_counter())
+            if self._processando or self.fechada:
+                return False
+            self._processando = True
+            return True
+
+    def retirar(self):
+        """Próximo (frame, chegada); None encerra o consumidor"""
+        with self._lock:
+            item = self._pendente
+            self._pendente = None
+            if item is None or self.fechada:
+                self._processando = False
+                return None
+            return item
+
+    def registrar(self, chegada):
+        """Registra um frame processado; retorna o novo intervalo se mudou ≥20%"""
+        latencia = (time.perf_counter() - chegada) * 1000
+        with self._lock:
+            self.processados += 1
+            if self.latencia_ms is None:
+                self.latencia_ms = latencia
+            else:
+                self.latencia_ms += self.alpha * (latencia - self.latencia_ms)
+
+            alvo = min(max(self.latencia_ms * self.fator, self.intervalo_min_ms), self.intervalo_max_ms)
+            if abs(alvo - self.intervalo_ms) < 0.2 * self.intervalo_ms:
+                return None
+            self.intervalo_ms = int(round(alvo))
+            return self.intervalo_ms
+
+    def fechar(self):
+        """Sessão encerrada: descarta o pendente e para o consumidor"""
+        with self._lock:
+            self.fechada = True
+            self._pendente = None
+
+
+def somar_stats(caixas):
+    """Resumo das caixas ativas (para /stats/mailbox)"""
+    caixas = list(caixas)
+    latencias = [c.latencia_ms for c in caixas if c.latencia_ms is not None]
+    recebidos = sum(c.recebidos for c in caixas)
+    descartados = sum(c.descartados for c in caixas)
+    return {
+        'sessoes': len(caixas),
+        'recebidos': recebidos,
+        'descartados': descartados,
+        'processados': sum(c.processados for c in caixas),
+        'taxa_descarte': descartados / recebidos if recebidos else 0.0,
+        'latencia_media_ms': sum(latencias) / len(latencias) if latencias else None,
+        'intervalo_medio_ms': (sum(c.intervalo_ms for c in caixas) / len(caixas)) if caixas else None,
+    }
@@ -0,0 +1,239 @@
+"""
+Pool de instâncias do MediaPipe Hands por sessão
+Cada cliente tem seu próprio rastreador, para que o modo de rastreamento
+não seja quebrado por frames de outros usuários. O pool é limitado:
+sessões ociosas ou menos usadas recentemente são descartadas.
+Opcionalmente, um MotionGate (motion_gate.py) por sessão pula o MediaPipe
+em frames parados de sessões sem mão, e a região da mão no frame anterior
+(ROI) limita o próximo processamento a um recorte.
+"""
+
+import time
+from collections import OrderedDict
+
+
+class TrackerSessao:
+    """Uma instância do Hands dedicada a uma sessão"""
+
+    def __init__(self, hands, gate=None, usar_roi=False):
+        self.hands = hands
+        self.gate = gate
+        self.usar_roi = usar_roi
+        self.roi = None  # (x0, y0, x1, y1) do próximo frame; None = frame inteiro
+        self._entrada = None  # Recorte (ou None = frame inteiro) da última chamada ao MediaPipe
+        self.ultimo_uso = time.monotonic()
+        self.conectado = True
+        self.tinha_mao = False
+        self.frames_rastreamento = 0
+        self.frames_deteccao = 0
+        self.frames_pulados = 0
+        self.frames_roi = 0
+        self.roi_perdido = 0
+
+    def process(self, rgb):
+        """Roda o MediaPipe e retorna as 63 coordenadas ou None"""
+        from pipeline import calcular_roi
+
+        self.ultimo_uso = time.monotonic()
+        if self.gate is not None and not self.gate.deve_processar(rgb):
+            # Sessão ociosa e cena parada: "sem mão", sem rodar o MediaPipe
+            self.frames_pulados += 1
+            return None
+
+        # Com mão no frame anterior o MediaPipe apenas rastreia a região
+        # conhecida; sem ela, roda a detecção de palma completa (mais cara)
+        if self.tinha_mao:
+            self.frames_rastreamento += 1
+        else:
+            self.frames_deteccao += 1
+
+        if self.roi is not None:
+            coords = self._landmarks(rgb, self.roi)
+            if coords is not None:
+                self.frames_roi += 1
+            else:
+                # Mão saiu do recorte: procurar no frame inteiro
+                self.roi_perdido += 1
+                self.roi = None
+                coords = self._landmarks(rgb, None)
+        else:
+            coords = self._landmarks(rgb, None)
+
+        if self.usar_roi:
+            self.roi = None if coords is None else calcular_roi(
+                coords, rgb.shape[1], rgb.shape[0], self.roi)
+        self.tinha_mao = coords is not None
+        if self.gate is not None:
+            self.gate.registrar(self.tinha_mao)
+        return coords
+
+    def _landmarks(self, rgb, roi):
+        from pipeline import extrair_landmarks
+
+        # No modo de vídeo, o MediaPipe leva os landmarks de um frame ao
+        # próximo nas coordenadas da entrada; ao trocar de recorte (ou entre
+        # recorte e frame inteiro), o rastreamento recomeça
+        if roi != self._entrada:
+            self.hands.reset()
+            self._entrada = roi
+        return extrair_landmarks(self.hands, rgb, roi)
+
+    def close(self):
+        try:
+            self.hands.close()
+        except Exception:
+            pass
+
+
+class HandsPool:
+    def __init__(self, factory=None, max_size=32, idle_timeout=120.0, gate_factory=None,
+                 usar_roi=False):
+        """
+        factory: função que cria um Hands (padrão: pipeline.criar_hands)
+        max_size: máximo de instâncias vivas neste processo
+        idle_timeout: segundos sem frames até a instância ser liberada
+        gate_factory: função que cria o MotionGate de cada sessão (None = sem filtro)
+        usar_roi: processar só a região da mão do frame anterior (pipeline.calcular_roi)
+        """
+        if factory is None:
+            from pipeline import criar_hands
+            factory = criar_hands
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.gate_factory = gate_factory
+        self.usar_roi = usar_roi
+        self.trackers = OrderedDict()
+        self._ultima_limpeza = time.monotonic()
+
+        # Contadores acumulados (incluem sessões já descartadas)
+        self.criados = 0
+        self.reutilizados = 0
+        self.recriados = 0  # instâncias criadas para substituir uma descartada por erro
+        self._com_erro = set()
+        self.despejados_lru = 0
+        self.despejados_ociosos = 0
+        self._rastreamento_descartado = 0
+        self._deteccao_descartado = 0
+        self._pulados_descartado = 0
+        self._roi_descartado = 0
+        self._roi_perdido_descartado = 0
+
+    def acquire(self, chave):
+        """Retorna o rastreador da sessão, criando-o se necessário"""
+        self._limpar_ociosos()
+
+        tracker = self.trackers.get(chave)
+        if tracker is not None:
+            if not tracker.conectado:
+                # Reconexão: reaproveita a instância já aquecida
+                tracker.conectado = True
+                self.reutilizados += 1
+            self.trackers.move_to_end(chave)
+            return tracker
+
+        while len(self.trackers) >= self.max_size:
+            chave_antiga, _ = next(iter(self.trackers.items()))
+            self._descartar(chave_antiga)
+            self.despejados_lru += 1
+
+        if chave in self._com_erro:
+            self._com_erro.discard(chave)
+            self.recriados += 1
+        gate = self.gate_factory() if self.gate_factory else None
+        tracker = TrackerSessao(self.factory(), gate, self.usar_roi)
+        self.trackers[chave] = tracker
+        self.criados += 1
+        return tracker
+
+    def release(self, chave):
+        """Marca a sessão como desconectada; a instância fica disponível
+        para reconexão até expirar por ociosidade"""
+        tracker = self.trackers.get(chave)
+        if tracker is not None:
+            tracker.conectado = False
+
+    def discard(self, chave):
+        """Fecha a instância da sessão (ex.: após erro no MediaPipe)"""
+        if chave in self.trackers:
+            self._descartar(chave)
+            self._com_erro.add(chave)
+
+    def _descartar(self, chave):
+        tracker = self.trackers.pop(chave)
+        self._rastreamento_descartado += tracker.frames_rastreamento
+        self._deteccao_descartado += tracker.frames_deteccao
+        self._pulados_descartado += tracker.frames_pulados
+        self._roi_descartado += tracker.frames_roi
+        self._roi_perdido_descartado += tracker.roi_perdido
+        tracker.close()
+
+    def _limpar_ociosos(self):
+        agora = time.monotonic()
+        if agora - self._ultima_limpeza < 1.0:
+            return
+        self._ultima_limpeza = agora
+
+        for chave in [c for c, t in self.trackers.items()
+                      if agora - t.ultimo_uso > self.idle_timeout]:
+            self._descartar(chave)
+            self._com_erro.discard(chave)
+            self.despejados_ociosos += 1
+
+    def get_stats(self, por_sessao=False):
+        """Estatísticas do pool, proporção rastreamento/detecção e frames pulados"""
+        rastreamento = self._rastreamento_descartado + sum(
+            t.frames_rastreamento for t in self.trackers.values())
+        deteccao = self._deteccao_descartado + sum(
+            t.frames_deteccao for t in self.trackers.values())
+        pulados = self._pulados_descartado + sum(
+            t.frames_pulados for t in self.trackers.values())
+        roi = self._roi_descartado + sum(t.frames_roi for t in self.trackers.values())
+        roi_perdido = self._roi_perdido_descartado + sum(t.roi_perdido for t in self.trackers.values())
+        total = rastreamento + deteccao
+
+        stats = {
+            'ativos': len(self.trackers),
+            'conectados': sum(1 for t in self.trackers.values() if t.conectado),
+            'max_size': self.max_size,
+            'criados': self.criados,
+            'reutilizados': self.reutilizados,
+            'recriados': self.recriados,
+            'despejados_lru': self.despejados_lru,
+            'despejados_ociosos': self.despejados_ociosos,
+            'frames_rastreamento': rastreamento,
+            'frames_deteccao': deteccao,
+            'taxa_rastreamento': rastreamento / total if total else 0.0,
+            'frames_pulados': pulados,
+            'taxa_pulados': pulados / (total + pulados) if total + pulados else 0.0,
+            'frames_roi': roi,
+            'roi_perdido': roi_perdido,
+        }
+        if por_sessao:
+            stats['sessoes'] = {
+                chave: {
+                    'rastreamento': t.frames_rastreamento,
+                    'deteccao': t.frames_deteccao,
+                    'pulados': t.frames_pulados,
+                    'roi': t.frames_roi,
+                    'ocioso': t.gate.ocioso if t.gate is not None else False,
+                }
+                for chave, t in self.trackers.items()
+            }
+        return stats
+
+
+def somar_stats(lista):
+    """Combina as estatísticas de vários pools (ex.: um por worker)"""
+    total = {}
+    for stats in lista:
+        for chave, valor in stats.items():
+            if chave == 'sessoes':
+                total.setdefault('sessoes', {}).update(valor)
+            elif chave not in ('taxa_rastreamento', 'taxa_pulados'):
+                total[chave] = total.get(chave, 0) + valor
+    frames = total.get('frames_rastreamento', 0) + total.get('frames_deteccao', 0)
+    pulados = total.get('frames_pulados', 0)
+    total['taxa_rastreamento'] = total.get('frames_rastreamento', 0) / frames if frames else 0.0
+    total['taxa_pulados'] = pulados / (frames + pulados) if frames + pulados else 0.0
+    return total
@@ -0,0 +1,249 @@
+"""
+Gerador de carga Socket.IO do Libras Bridge
+Simula N clientes sinalizando ao mesmo tempo contra um servidor já em
+execução, com o protocolo do navegador: 'start_camera', frames JPEG em
+'process_frame_web' na taxa configurada e 'stop_camera'. Cada frame leva
+um 'seq', que o servidor devolve em 'frame_processed'.
+
+A carga sobe em degraus (ex.: 1, 2, 4, 8... clientes); em cada um são
+medidos a latência de ida e volta (p50/p95/p99), a taxa de frames sem
+resposta (descartados pela contrapressão), a taxa de erros e as
+estatísticas do servidor. O ponto de saturação é o primeiro degrau que
+estoura o limite de latência, de resposta ou de erros; a capacidade é o
+degrau anterior. O relatório vai para JSON.
+
+Uso:
+    python app.py &   # em outro terminal
+    python loadgen.py [--url http://localhost:5000] [--clientes 1,2,4,8,16,32]
+                      [--fps 10] [--duracao 20] [--frames pasta_ou_video]
+                      [--processos 2] [--saida relatorio_capacidade.json]
+"""
+
+import argparse
+import base64
+import json
+import multiprocessing
+import threading
+import time
+import urllib.request
+import uuid
+from datetime import datetime
+
+import numpy as np
+
+
+def carregar_frames(origem, n=100):
+    """JPEGs em base64, como o navegador envia em 'process_frame_web'"""
+    from benchmark import frames_gravados, frames_sinteticos
+
+    frames = frames_gravados(origem, n, 320, 240) if origem else frames_sinteticos(n, 320, 240)
+    return [base64.b64encode(f).decode('ascii') for f in frames]
+
+
+def _cliente(url, frames, fps, duracao, resultado, seguir_rate_hint):
+    import socketio
+
+    sio = socketio.Client(reconnection=False)
+    enviados = {}  # seq -> instante de envio
+    latencias = []
+    lock = threading.Lock()
+    intervalo = [1.0 / fps]
+
+    def ao_processar(dados):
+        agora = time.perf_counter()
+        with lock:
+            inicio = enviados.pop(dados.get('seq'), None)
+        if inicio is not None:
+            latencias.append(agora - inicio)
+
+    def ao_receber_rate_hint(dados):
+        if seguir_rate_hint and dados.get('intervalo_ms'):
+            intervalo[0] = dados['intervalo_ms'] / 1000
+
+    sio.on('frame_processed', ao_processar)
+    sio.on('rate_hint', ao_receber_rate_hint)
+
+    try:
+        sio.connect(url, auth={'client_id': uuid.uuid4().hex}, transports=['websocket'], wait_timeout=10)
+    except Exception as e:
+        resultado.append({'erro_conexao': str(e)})
+        return
+
+    total = 0
+    erros = 0
+    try:
+        sio.emit('start_camera')
+        # Início defasado, para os clientes não enviarem todos no mesmo instante
+        time.sleep(np.random.uniform(0, intervalo[0]))
+        fim = time.perf_counter() + duracao
+        proximo = time.perf_counter()
+        seq = 0
+        while time.perf_counter() < fim:
+            with lock:
+                enviados[seq] = time.perf_counter()
+            try:
+                sio.emit('process_frame_web', {'image': frames[seq % len(frames)], 'seq': seq})
+                total += 1
+            except Exception:
+                erros += 1
+            seq += 1
+            proximo += intervalo[0]
+            time.sleep(max(0.0, proximo - time.perf_counter()))
+
+        # Aguardar as respostas ainda em trânsito
+        limite = time.perf_counter() + 2.0
+        while enviados and time.perf_counter() < limite:
+            time.sleep(0.05)
+        sio.emit('stop_camera')
+    except Exception:
+        erros += 1
+    finally:
+        sio.disconnect()
+
+    resultado.append({
+        'enviados': total,
+        'respondidos': len(latencias),
+        'erros': erros,
+        'latencias': latencias,
+    })
+
+
+def _grupo(args):
+    """Processo gerador: `clientes` conexões em threads"""
+    url, frames, clientes, fps, duracao, seguir_rate_hint = args
+    resultado = []
+    threads = [threading.Thread(target=_cliente,
+                                args=(url, frames, fps, duracao, resultado, seguir_rate_hint))
+               for _ in range(clientes)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return resultado
+
+
+def estatisticas_servidor(url):
+    stats = {}
+    for rota in ('mailbox', 'batch', 'hands'):
+        try:
+            with urllib.request.urlopen(f"{url}/stats/{rota}", timeout=5) as resposta:
+                stats[rota] = json.load(resposta)
+        except (OSError, ValueError):
+            stats[rota] = None
+    return stats
+
+
+def executar_degrau(url, frames, clientes, args):
+    processos = max(1, min(args.processos, clientes))
+    por_processo = [clientes // processos + (i < clientes % processos) for i in range(processos)]
+    tarefas = [(url, frames, n, args.fps, args.duracao, args.seguir_rate_hint) for n in por_processo]
+
+    antes = estatisticas_servidor(url)
+    with multiprocessing.get_context('spawn').Pool(processos) as pool:
+        resultados = [r for grupo in pool.map(_grupo, tarefas) for r in grupo]
+    depois = estatisticas_servidor(url)
+
+    falhas_conexao = sum(1 for r in resultados if 'erro_conexao' in r)
+    ok = [r for r in resultados if 'erro_conexao' not in r]
+    enviados = sum(r['enviados'] for r in ok)
+    respondidos = sum(r['respondidos'] for r in ok)
+    erros = sum(r['erros'] for r in ok) + falhas_conexao
+    latencias = np.array([x for r in ok for x in r['latencias']]) * 1000
+
+    def percentil(p):
+        return float(np.percentile(latencias, p)) if len(latencias) else None
+
+    return {
+        'clientes': clientes,
+        'falhas_conexao': falhas_conexao,
+        'enviados': enviados,
+        'respondidos': respondidos,
+        'taxa_resposta': respondidos / enviados if enviados else 0.0,
+        'taxa_erros': erros / (enviados + falhas_conexao) if enviados + falhas_conexao else 1.0,
+        'respostas_por_s': respondidos / args.duracao,
+        'latencia_p50_ms': percentil(50),
+        'latencia_p95_ms': percentil(95),
+        'latencia_p99_ms': percentil(99),
+        'servidor_antes': antes,
+        'servidor_depois': depois,
+    }
+
+
+def saturado(degrau, args):
+    """Motivo pelo qual o degrau estoura os limites (None = dentro dos limites)"""
+    if degrau['taxa_erros'] > args.max_erros:
+        return f"taxa de erros {degrau['taxa_erros']:.1%} > {args.max_erros:.1%}"
+    if degrau['taxa_resposta'] < args.min_resposta:
+        return f"taxa de resposta {degrau['taxa_resposta']:.1%} < {args.min_resposta:.1%}"
+    if degrau['latencia_p95_ms'] is None or degrau['latencia_p95_ms'] > args.max_p95_ms:
+        return f"latência p95 {degrau['latencia_p95_ms']} ms > {args.max_p95_ms} ms"
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Carga de N clientes Socket.IO simultâneos")
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--clientes', default='1,2,4,8,16,32', help="degraus de clientes simultâneos")
+    parser.add_argument('--fps', type=float, default=10, help="frames por segundo de cada cliente")
+    parser.add_argument('--duracao', type=float, default=20, help="segundos por degrau")
+    parser.add_argument('--frames', help="pasta com JPEGs ou vídeo (padrão: frames sintéticos)")
+    parser.add_argument('--processos', type=int, default=2, help="processos geradores de carga")
+    parser.add_argument('--seguir-rate-hint', action='store_true',
+                        help="obedecer o 'rate_hint' do servidor, como o navegador")
+    parser.add_argument('--max-p95-ms', type=float, default=300)
+    parser.add_argument('--min-resposta', type=float, default=0.9,
+                        help="fração mínima de frames respondidos")
+    parser.add_argument('--max-erros', type=float, default=0.01)
+    parser.add_argument('--continuar', action='store_true', help="não parar no ponto de saturação")
+    parser.add_argument('--saida', default='relatorio_capacidade.json')
+    args = parser.parse_args()
+
+    frames = carregar_frames(args.frames)
+    degraus = [int(n) for n in args.clientes.split(',')]
+    print(f"[INFO] {args.url} | {len(frames)} frames | {args.fps:g} fps por cliente | "
+          f"{args.duracao:g}s por degrau")
+
+    resultados = []
+    saturacao = None
+    for clientes in degraus:
+        degrau = executar_degrau(args.url, frames, clientes, args)
+        degrau['saturado'] = saturado(degrau, args)
+        resultados.append(degrau)
+        p95 = degrau['latencia_p95_ms']
+        print(f"[INFO] {clientes:>4} clientes: {degrau['respostas_por_s']:.1f} resp/s, "
+              f"p95 {p95 if p95 is None else round(p95, 1)} ms, "
+              f"resposta {degrau['taxa_resposta']:.1%}, erros {degrau['taxa_erros']:.1%}")
+        if degrau['saturado'] and saturacao is None:
+            saturacao = degrau
+            print(f"[AVISO] Saturação com {clientes} clientes: {degrau['saturado']}")
+            if not args.continuar:
+                break
+
+    dentro = [d for d in resultados if not d['saturado']]
+    capacidade = max((d['clientes'] for d in dentro), default=0)
+
+    print("\n" + "=" * 86)
+    print(f"{'clientes':>8} {'resp/s':>8} {'resposta':>9} {'erros':>7} "
+          f"{'p50 (ms)':>10} {'p95 (ms)':>10} {'p99 (ms)':>10}  situação")
+    print("=" * 86)
+    for d in resultados:
+        valores = [d[f'latencia_{p}_ms'] for p in ('p50', 'p95', 'p99')]
+        latencias = ' '.join(f"{v:>10.1f}" if v is not None else f"{'-':>10}" for v in valores)
+        print(f"{d['clientes']:>8} {d['respostas_por_s']:>8.1f} {d['taxa_resposta']:>8.1%} "
+              f"{d['taxa_erros']:>6.1%} {latencias}  {'saturado' if d['saturado'] else 'ok'}")
+    print("=" * 86)
+    print(f"Capacidade: {capacidade} clientes simultâneos a {args.fps:g} fps "
+          f"(p95 ≤ {args.max_p95_ms:g} ms, resposta ≥ {args.min_resposta:.0%}, "
+          f"erros ≤ {args.max_erros:.0%})")
+
+    relatorio = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'parametros': vars(args),
+        'capacidade_clientes': capacidade,
+        'saturacao': {'clientes': saturacao['clientes'], 'motivo': saturacao['saturado']}
+                     if saturacao else None,
+        'degraus': resultados,
+    }
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    print(f"[INFO] Relatório salvo em {args.saida}")
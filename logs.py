@@ -0,0 +1,73 @@
+"""
+Log do servidor com nível configurável e limite de frequência
+Mantém o formato das mensagens do projeto ([INFO], [AVISO], [ERRO]) e
+evita que mensagens por frame (10 fps x N clientes) virem custo: as
+chamadas com limite emitem no máximo uma vez por intervalo e por chave,
+informando quantas foram suprimidas. Chaves por conexão (tuplas com o
+sid) são descartadas com esquecer(sid) quando o cliente desconecta.
+"""
+
+import logging
+import sys
+import time
+
+import config
+
+_NOMES = {
+    logging.DEBUG: 'DEBUG',
+    logging.INFO: 'INFO',
+    logging.WARNING: 'AVISO',
+    logging.ERROR: 'ERRO',
+    logging.CRITICAL: 'ERRO',
+}
+
+
+class _Formato(logging.Formatter):
+    def format(self, record):
+        return f"[{_NOMES.get(record.levelno, record.levelname)}] {record.getMessage()}"
+
+
+logger = logging.getLogger('libras_bridge')
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(_Formato())
+    logger.addHandler(_handler)
+    logger.propagate = False
+logger.setLevel(getattr(logging, str(config.LOG_LEVEL).upper(), logging.INFO))
+
+_ultimos = {}  # chave -> [instante do último envio, mensagens suprimidas]
+
+
+def limitado(nivel, chave, mensagem, intervalo=None):
+    """Registra no máximo uma mensagem por `intervalo` segundos para a chave"""
+    if not logger.isEnabledFor(nivel):
+        return
+    intervalo = config.LOG_RATE_LIMIT_S if intervalo is None else intervalo
+    agora = time.monotonic()
+    registro = _ultimos.get(chave)
+    if registro is not None and agora - registro[0] < intervalo:
+        registro[1] += 1
+        return
+    suprimidas = registro[1] if registro is not None else 0
+    _ultimos[chave] = [agora, 0]
+    if suprimidas:
+        mensagem = f"{mensagem} (+{suprimidas} semelhantes suprimidas)"
+    logger.log(nivel, mensagem)
+
+
+def esquecer(sid):
+    """Descarta as chaves de uma conexão encerrada (ex. ('mao', sid))"""
+    for chave in [c for c in _ultimos if isinstance(c, tuple) and sid in c]:
+        del _ultimos[chave]
+
+
+def debug_limitado(chave, mensagem, intervalo=None):
+    limitado(logging.DEBUG, chave, mensagem, intervalo)
+
+
+def erro_limitado(chave, mensagem, intervalo=None):
+    limitado(logging.ERROR, chave, mensagem, intervalo)
+
+
+def aviso_limitado(chave, mensagem, intervalo=None):
+    limitado(logging.WARNING, chave, mensagem, intervalo)
@@ -0,0 +1,159 @@
+"""
+Métricas do servidor no formato de texto do Prometheus (rota /metrics)
+Implementação mínima de contadores, gauges e histogramas com rótulos,
+sem dependências; as métricas do app ficam declaradas no fim do arquivo.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+# Limites (segundos) dos histogramas de latência: de 0,1 ms a 2,5 s
+BUCKETS_LATENCIA = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                    0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _rotulos(nomes, valores):
+    if not nomes:
+        return ''
+    pares = ','.join('{}="{}"'.format(n, str(v).replace('\\', '\\\\').replace('"', '\\"'))
+                     for n, v in zip(nomes, valores))
+    return '{' + pares + '}'
+
+
+def _numero(valor):
+    if valor == float('inf'):
+        return '+Inf'
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class _Metrica:
+    tipo = ''
+
+    def __init__(self, nome, descricao, rotulos=(), funcao=None):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = tuple(rotulos)
+        self.funcao = funcao  # se definida, o valor é lido na hora da coleta
+        self._lock = threading.Lock()
+        self._valores = {}
+
+    def _chave(self, labels):
+        return tuple(labels.get(n, '') for n in self.rotulos)
+
+    def exportar(self):
+        linhas = [f"# HELP {self.nome} {self.descricao}", f"# TYPE {self.nome} {self.tipo}"]
+        linhas.extend(self._amostras())
+        return linhas
+
+    def _amostras(self):
+        if self.funcao is not None:
+            try:
+                return [f"{self.nome} {_numero(self.funcao())}"]
+            except Exception:
+                return []
+        with self._lock:
+            itens = list(self._valores.items())
+        return [f"{self.nome}{_rotulos(self.rotulos, chave)} {_numero(v)}" for chave, v in itens]
+
+
+class Counter(_Metrica):
+    tipo = 'counter'
+
+    def inc(self, valor=1, **labels):
+        chave = self._chave(labels)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+
+class Gauge(_Metrica):
+    tipo = 'gauge'
+
+    def set(self, valor, **labels):
+        with self._lock:
+            self._valores[self._chave(labels)] = valor
+
+    def inc(self, valor=1, **labels):
+        chave = self._chave(labels)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def dec(self, valor=1, **labels):
+        self.inc(-valor, **labels)
+
+
+class Histogram(_Metrica):
+    tipo = 'histogram'
+
+    def __init__(self, nome, descricao, rotulos=(), buckets=BUCKETS_LATENCIA):
+        super().__init__(nome, descricao, rotulos)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._series = {}  # chave -> [contagens por bucket, soma, total]
+
+    def observe(self, valor, **labels):
+        chave = self._chave(labels)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = [[0] * len(self.buckets), 0.0, 0]
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie[0][i] += 1
+                    break
+            serie[1] += valor
+            serie[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - inicio, **labels)
+
+    def _amostras(self):
+        with self._lock:
+            itens = [(chave, list(s[0]), s[1], s[2]) for chave, s in self._series.items()]
+        linhas = []
+        nomes_le = self.rotulos + ('le',)
+        for chave, contagens, soma, total in itens:
+            acumulado = 0
+            for limite, contagem in zip(self.buckets, contagens):
+                acumulado += contagem
+                linhas.append(f"{self.nome}_bucket{_rotulos(nomes_le, chave + (_numero(limite),))} {acumulado}")
+            linhas.append(f"{self.nome}_sum{_rotulos(self.rotulos, chave)} {_numero(soma)}")
+            linhas.append(f"{self.nome}_count{_rotulos(self.rotulos, chave)} {total}")
+        return linhas
+
+
+class Registry:
+    def __init__(self):
+        self.metricas = []
+
+    def registrar(self, metrica):
+        self.metricas.append(metrica)
+        return metrica
+
+    def exportar(self):
+        linhas = []
+        for metrica in self.metricas:
+            linhas.extend(metrica.exportar())
+        return '\n'.join(linhas) + '\n'
+
+
+REGISTRO = Registry()
+
+TEMPO_ETAPA = REGISTRO.registrar(Histogram(
+    'libras_etapa_segundos', 'Duração de cada etapa do processamento de um frame', ['etapa']))
+FRAMES_RECEBIDOS = REGISTRO.registrar(Counter(
+    'libras_frames_recebidos_total', 'Frames recebidos dos clientes', ['tipo']))
+FRAMES_DESCARTADOS = REGISTRO.registrar(Counter(
+    'libras_frames_descartados_total', 'Frames substituídos por um mais recente antes de processar'))
+SESSOES_ATIVAS = REGISTRO.registrar(Gauge(
+    'libras_sessoes_ativas', 'Conexões Socket.IO abertas neste processo'))
+FALHAS_MEDIAPIPE = REGISTRO.registrar(Counter(
+    'libras_mediapipe_falhas_total', 'Erros do MediaPipe (inicialização ou processamento)', ['tipo']))
+PREDICOES = REGISTRO.registrar(Counter(
+    'libras_predicoes_total', 'Predições do modelo por gesto', ['gesto']))
+GESTOS_CONFIRMADOS = REGISTRO.registrar(Counter(
+    'libras_gestos_confirmados_total', 'Gestos confirmados enviados aos clientes', ['gesto']))
@@ -0,0 +1,138 @@
+"""
+Formato de artefato do modelo do Libras Bridge
+Um diretório com header.json (versão, rótulos, tamanho do clip, features)
+e um .npy por array. Os arrays são abertos com memory-map, então carregar
+o modelo é ler um JSON pequeno, sem sklearn, joblib ou pickle.
+
+    modelo_libras/
+        header.json
+        feature.npy  threshold.npy  left.npy  right.npy  values.npy  roots.npy
+
+Uso:
+    python model_artifact.py info [pasta]
+    python model_artifact.py inicializacao   # tempos de cold start medidos
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+from datetime import datetime
+
+import numpy as np
+
+FORMATO = "libras-bridge-model"
+VERSAO = 1
+
+
+def salvar(pasta, arrays, metadados):
+    """Grava os arrays e o header; substitui o artefato anterior de uma vez"""
+    temporaria = f"{pasta}.tmp"
+    shutil.rmtree(temporaria, ignore_errors=True)
+    os.makedirs(temporaria)
+
+    descricao = {}
+    for nome, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arquivo = f"{nome}.npy"
+        np.save(os.path.join(temporaria, arquivo), array, allow_pickle=False)
+        descricao[nome] = {
+            'arquivo': arquivo,
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+        }
+
+    header = dict(metadados)
+    header.update({
+        'formato': FORMATO,
+        'versao': VERSAO,
+        'criado_em': datetime.now().isoformat(timespec='seconds'),
+        'arrays': descricao,
+    })
+    with open(os.path.join(temporaria, "header.json"), 'w', encoding='utf-8') as f:
+        json.dump(header, f, ensure_ascii=False, indent=2)
+
+    antiga = f"{pasta}.old"
+    shutil.rmtree(antiga, ignore_errors=True)
+    if os.path.exists(pasta):
+        os.rename(pasta, antiga)
+    os.rename(temporaria, pasta)
+    shutil.rmtree(antiga, ignore_errors=True)
+    return header
+
+
+def ler_header(pasta):
+    with open(os.path.join(pasta, "header.json"), encoding='utf-8') as f:
+        header = json.load(f)
+    if header.get('formato') != FORMATO:
+        raise ValueError(f"{pasta} não é um artefato do Libras Bridge")
+    if header.get('versao') != VERSAO:
+        raise ValueError(f"Versão de artefato não suportada: {header.get('versao')}")
+    return header
+
+
+def carregar(pasta, mmap=True):
+    """Retorna (header, arrays); com mmap, os arrays são lidos sob demanda"""
+    header = ler_header(pasta)
+    arrays = {}
+    for nome, descricao in header['arrays'].items():
+        array = np.load(os.path.join(pasta, descricao['arquivo']),
+                        mmap_mode='r' if mmap else None, allow_pickle=False)
+        if array.dtype.str != descricao['dtype'] or list(array.shape) != descricao['shape']:
+            raise ValueError(f"Array {nome} não corresponde ao header de {pasta}")
+        arrays[nome] = array
+    return header, arrays
+
+
+def medir_inicializacao():
+    """Mede, em processos novos, o custo de cada etapa do cold start"""
+    import config
+
+    etapas = {
+        'numpy': "import numpy",
+        'flask + flask_socketio': "import flask, flask_socketio",
+        'cv2': "import cv2",
+        'mediapipe': "import mediapipe",
+        'sklearn + joblib': "import sklearn.ensemble, joblib",
+        'modelo .pkl (joblib)': f"import joblib; joblib.load({config.MODEL_PATH!r})",
+        'artefato (mmap)': (f"from forest_engine import CompiledForest; "
+                            f"CompiledForest.load({config.MODEL_ARTIFACT_PATH!r})"),
+        'Hands + warmup': ("import numpy as np; from pipeline import criar_hands; "
+                           "criar_hands().process(np.zeros((240, 320, 3), np.uint8))"),
+    }
+
+    def cronometrar(codigo):
+        script = ("import time; _t = time.perf_counter(); " + codigo +
+                  "; print(time.perf_counter() - _t)")
+        saida = subprocess.run([sys.executable, "-W", "ignore", "-c", script],
+                               capture_output=True, text=True, check=True)
+        return float(saida.stdout.strip().splitlines()[-1])
+
+    print("=" * 60)
+    print("TEMPOS DE INICIALIZAÇÃO (processo novo, mediana de 3)")
+    print("=" * 60)
+    for nome, codigo in etapas.items():
+        try:
+            tempos = sorted(cronometrar(codigo) for _ in range(3))
+            print(f"  {nome:<28} {tempos[1] * 1000:>9.1f} ms")
+        except subprocess.CalledProcessError as e:
+            print(f"  {nome:<28} {'falhou':>12} ({e.stderr.strip().splitlines()[-1]})")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    comando = sys.argv[1] if len(sys.argv) > 1 else "info"
+
+    if comando == "info":
+        import config
+
+        pasta = sys.argv[2] if len(sys.argv) > 2 else config.MODEL_ARTIFACT_PATH
+        header = ler_header(pasta)
+        header['arrays'] = {nome: d['shape'] for nome, d in header['arrays'].items()}
+        print(json.dumps(header, ensure_ascii=False, indent=2))
+    elif comando == "inicializacao":
+        medir_inicializacao()
+    else:
+        print(__doc__)
+        sys.exit(1)
@@ -0,0 +1,65 @@
+"""
+Filtro de movimento/presença antes do MediaPipe
+Sessões ociosas (sem mão há vários frames) só rodam a detecção completa
+quando a imagem muda (diferença entre miniaturas) ou a cada K frames;
+com mão em cena, todos os frames passam.
+"""
+
+import numpy as np
+
+LARGURA_MINIATURA = 32  # ~32x24 pixels em tons de cinza para a comparação
+
+
+def miniatura(rgb):
+    """Redução por amostragem (sem interpolação) para tons de cinza float32"""
+    passo = max(1, rgb.shape[1] // LARGURA_MINIATURA)
+    return rgb[::passo, ::passo].astype(np.float32).mean(axis=2)
+
+
+class MotionGate:
+    def __init__(self, limiar=3.0, frames_sem_mao=10, intervalo_ocioso=5):
+        """
+        limiar: diferença média absoluta (0-255) entre miniaturas que conta como movimento
+        frames_sem_mao: frames seguidos sem mão até a sessão ser considerada ociosa
+        intervalo_ocioso: sessão ociosa e imagem parada roda a detecção a cada K frames
+        """
+        self.limiar = limiar
+        self.frames_sem_mao = frames_sem_mao
+        self.intervalo_ocioso = intervalo_ocioso
+
+        self._referencia = None  # miniatura do último frame processado
+        self._sem_mao = 0        # frames processados seguidos sem mão
+        self._desde_deteccao = 0  # frames pulados desde o último processado
+
+    @classmethod
+    def da_config(cls):
+        import config
+
+        return cls(config.GATE_MOTION_THRESHOLD, config.GATE_NO_HAND_FRAMES,
+                   config.GATE_IDLE_INTERVAL)
+
+    def deve_processar(self, rgb):
+        """Decide se o frame vai ao MediaPipe; atualiza a referência se sim"""
+        atual = miniatura(rgb)
+
+        processar = self._sem_mao < self.frames_sem_mao
+        if not processar:
+            processar = self._desde_deteccao + 1 >= self.intervalo_ocioso
+        if not processar:
+            processar = (self._referencia is None or self._referencia.shape != atual.shape or
+                         np.abs(atual - self._referencia).mean() >= self.limiar)
+
+        if processar:
+            self._referencia = atual
+            self._desde_deteccao = 0
+        else:
+            self._desde_deteccao += 1
+        return processar
+
+    def registrar(self, tem_mao):
+        """Resultado do MediaPipe no frame processado"""
+        self._sem_mao = 0 if tem_mao else self._sem_mao + 1
+
+    @property
+    def ocioso(self):
+        return self._sem_mao >= self.frames_sem_mao
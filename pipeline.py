@@ -0,0 +1,176 @@
+"""
+Etapas compartilhadas do processamento de frames do Libras Bridge
+Usadas tanto pelo servidor (app.py) quanto pelos processos do worker_pool.py
+cv2, mediapipe e PIL são importados só quando usados, para que iniciar o
+servidor (ou o caminho só de landmarks) não pague por eles.
+"""
+
+import base64
+import io
+
+import numpy as np
+
+import config
+
+NUM_LANDMARKS = 21
+NUM_COORDS = NUM_LANDMARKS * 3  # x, y, z por landmark
+
+
+def criar_hands():
+    """Cria uma instância do MediaPipe Hands em modo vídeo (rastreamento)"""
+    import mediapipe as mp
+
+    return mp.solutions.hands.Hands(
+        static_image_mode=False,
+        max_num_hands=config.MAX_NUM_HANDS,
+        min_detection_confidence=config.MIN_DETECTION_CONFIDENCE,
+        min_tracking_confidence=config.MIN_TRACKING_CONFIDENCE,
+        model_complexity=0
+    )
+
+
+def confirmar_gesto(state, gesto_predito):
+    """
+    Regra de confirmação: o gesto só vale após NUM_CONFIRMATIONS predições
+    iguais seguidas. Atualiza state (ultimo_gesto, confirmacoes) e retorna
+    (gesto, confiança) ou (None, 0).
+    """
+    if gesto_predito == state.ultimo_gesto:
+        state.confirmacoes += 1
+    else:
+        state.confirmacoes = 1
+        state.ultimo_gesto = gesto_predito
+
+    if state.confirmacoes >= config.NUM_CONFIRMATIONS:
+        return gesto_predito, min(state.confirmacoes * 30, 95)
+    return None, 0
+
+
+def reiniciar_confirmacao(state):
+    """
+    Zera a sequência de predições iguais (a mão saiu ou o clip foi limpo):
+    o mesmo gesto, feito de novo, é confirmado e registrado outra vez
+    """
+    state.ultimo_gesto = None
+    state.confirmacoes = 0
+
+
+def decodificar_jpeg(dados, largura_max=320, altura_max=240):
+    """
+    Decodifica bytes JPEG direto para um array RGB.
+    Imagens maiores que largura_max x altura_max são reduzidas já na
+    decodificação (escala DCT do libjpeg), sem decodificar em tamanho cheio.
+    """
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(dados))
+    if image.format == 'JPEG':
+        image.draft('RGB', (largura_max, altura_max))
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return np.asarray(image)
+
+
+def decodificar_base64(image_b64, largura_max=320, altura_max=240):
+    """Decodifica um JPEG em base64 para um array RGB"""
+    return decodificar_jpeg(base64.b64decode(image_b64), largura_max, altura_max)
+
+
+def decodificar_imagem(dados):
+    """Aceita JPEG binário (bytes) ou em base64 (str), até FRAME_INPUT_WIDTH x HEIGHT"""
+    if isinstance(dados, str):
+        return decodificar_base64(dados, config.FRAME_INPUT_WIDTH, config.FRAME_INPUT_HEIGHT)
+    return decodificar_jpeg(bytes(dados), config.FRAME_INPUT_WIDTH, config.FRAME_INPUT_HEIGHT)
+
+
+def decodificar_landmarks(dados):
+    """
+    Decodifica os landmarks enviados pelo cliente: 63 float32 little-endian
+    (252 bytes, x0 y0 z0 x1 ...) ou uma lista de 63 números.
+    Payload vazio significa "nenhuma mão neste frame" e retorna None.
+    """
+    if isinstance(dados, (list, tuple)):
+        vetor = np.asarray(dados, dtype=np.float32)
+    else:
+        vetor = np.frombuffer(dados, dtype='<f4')
+
+    if vetor.size == 0:
+        return None
+    if vetor.size != NUM_COORDS:
+        raise ValueError(f"esperados {NUM_COORDS} valores, recebidos {vetor.size}")
+    if not np.isfinite(vetor).all():
+        raise ValueError("landmarks contêm NaN/inf")
+    return vetor
+
+
+def extrair_landmarks(hands, rgb, roi=None):
+    """
+    Roda o MediaPipe num frame RGB e retorna as 63 coordenadas (x, y, z)
+    da primeira mão detectada, ou None se nenhuma mão foi encontrada.
+    Com roi (x0, y0, x1, y1 em pixels), processa só o recorte e devolve as
+    coordenadas normalizadas em relação ao frame inteiro.
+    """
+    if roi is None:
+        entrada = rgb
+        # Redimensionar se necessário para consistência
+        if rgb.shape[1] > 320:
+            import cv2
+
+            entrada = cv2.resize(rgb, (320, 240))
+    else:
+        x0, y0, x1, y1 = roi
+        entrada = np.ascontiguousarray(rgb[y0:y1, x0:x1])
+        if max(entrada.shape[:2]) > config.ROI_MAX_SIZE:
+            import cv2
+
+            escala = config.ROI_MAX_SIZE / max(entrada.shape[:2])
+            entrada = cv2.resize(entrada, None, fx=escala, fy=escala, interpolation=cv2.INTER_AREA)
+
+    results = hands.process(entrada)
+    if not results.multi_hand_landmarks:
+        return None
+
+    coords = []
+    for lm in results.multi_hand_landmarks[0].landmark:
+        coords.extend([lm.x, lm.y, lm.z])
+
+    if roi is not None:
+        # Recorte -> frame inteiro; z segue a escala de x (largura da imagem)
+        altura, largura = rgb.shape[:2]
+        pontos = np.asarray(coords, dtype=np.float64).reshape(NUM_LANDMARKS, 3)
+        pontos[:, 0] = (x0 + pontos[:, 0] * (x1 - x0)) / largura
+        pontos[:, 1] = (y0 + pontos[:, 1] * (y1 - y0)) / altura
+        pontos[:, 2] *= (x1 - x0) / largura
+        coords = pontos.ravel().tolist()
+    return coords
+
+
+def calcular_roi(coords, largura, altura, atual=None):
+    """
+    Região quadrada (x0, y0, x1, y1 em pixels) em volta da mão, expandida
+    por ROI_EXPANSION, para o próximo frame. A região atual é mantida
+    enquanto a mão estiver bem dentro dela (o rastreamento do MediaPipe
+    depende de coordenadas estáveis). None = usar o frame inteiro.
+    """
+    pontos = np.asarray(coords, dtype=np.float32).reshape(NUM_LANDMARKS, 3)
+    xs = pontos[:, 0] * largura
+    ys = pontos[:, 1] * altura
+    mao = max(xs.max() - xs.min(), ys.max() - ys.min())
+
+    if atual is not None:
+        x0, y0, x1, y1 = atual
+        margem = 0.1 * (x1 - x0)
+        if (xs.min() >= x0 + margem and xs.max() <= x1 - margem and
+                ys.min() >= y0 + margem and ys.max() <= y1 - margem and
+                mao * config.ROI_EXPANSION >= 0.5 * (x1 - x0)):
+            return atual
+
+    lado = int(min(max(mao * config.ROI_EXPANSION, config.ROI_MIN_SIZE), largura, altura))
+    if lado * lado >= 0.5 * largura * altura:
+        return None  # Recorte quase do tamanho do frame: não compensa
+
+    cx = (xs.min() + xs.max()) / 2
+    cy = (ys.min() + ys.max()) / 2
+    x0 = int(round(min(max(cx - lado / 2, 0), largura - lado)))
+    y0 = int(round(min(max(cy - lado / 2, 0), altura - lado)))
+    return (x0, y0, x0 + lado, y0 + lado)
@@ -1,27 +1,25 @@
-import os
-import numpy as np
+from features import extrair_features, spec_da_config
+from dataset_store import DatasetStore, carregar
 
-# Pastas dos gestos
-gestos = ["ola", "sim", "nao"]
 
-X = []  # sequências de frames
-y = []  # rótulos
+def carregar_dataset(pasta=None, gestos=None):
+    """
+    Retorna X (n, 30, 63) e y (n,) do store empacotado (dataset_store.py),
+    ingerindo antes só os clips de dataset/<gesto>/*.npy que ainda não
+    estão nele. X é mapeado do disco; os gestos são as subpastas do dataset.
+    """
+    return carregar(pasta, gestos=gestos)
 
-for gesto in gestos:
-    pasta = f"dataset/{gesto}"
-    for arquivo in os.listdir(pasta):
-        if arquivo.endswith(".npy"):
-            caminho = os.path.join(pasta, arquivo)
-            clip = np.load(caminho)  # formato (30, 63)
-            X.append(clip)
-            y.append(gesto)
 
-X = np.array(X)  # (n_amostras, 30, 63)
-y = np.array(y)
+if __name__ == "__main__":
+    store = DatasetStore()
+    novos = store.ingerir_pasta()
+    X, y = store.X, store.y  # X: (n_amostras, 30, 63)
 
-print("Formato de X:", X.shape)
-print("Formato de y:", y.shape)
+    print(f"[INFO] {novos} clips novos ou alterados; {len(store)} no total em {store.pasta}")
+    print("Gestos:", store.contagem())
+    print("Formato de X:", X.shape)
+    print("Formato de y:", y.shape)
 
-np.save("X.npy", X)
-np.save("y.npy", y)
-print("[INFO] Arquivos X.npy e y.npy salvos com sucesso!")
+    spec = spec_da_config()
+    print(f"Features por amostra com {spec}: {extrair_features(X[:1], spec).shape[1]}")
@@ -1,70 +1,325 @@
+"""
+Reconhecimento em tempo real pela webcam (ou por um arquivo de vídeo)
+
+Modo em pipeline (padrão), com três estágios e filas limitadas:
+- captura (thread): lê a câmera continuamente e guarda só o frame mais
+  recente, para que frames não se acumulem no driver e virem atraso
+- inferência (thread): MediaPipe, clip e confirmação do gesto
+- exibição (thread principal): desenha landmarks, gesto e FPS/latência
+
+Com --serial, as três etapas rodam em sequência num único laço (modo
+original), para comparação.
+
+Com --video, os frames vêm de um arquivo e não há janela (--mostrar para
+exibir): serve para medir o pipeline numa máquina sem câmera. O arquivo é
+lido o mais rápido possível, sem descartar frames; com --tempo-real ele é
+lido no ritmo do vídeo, como uma câmera.
+
+Uso:
+    python realtime.py [--serial]
+    python realtime.py --video gravacao.mp4 [--tempo-real] [--mostrar] [--serial]
+"""
+
+import argparse
+import queue
+import threading
+import time
+
 import cv2
-import mediapipe as mp
 import numpy as np
-import joblib
-from collections import deque
 
-# Carregar modelo
-modelo = joblib.load("modelo_libras.pkl")
+import config
+from features import extrair_features, spec_do_modelo
+from forest_engine import carregar_modelo
+from hands_pool import TrackerSessao
+from motion_gate import MotionGate
+from pipeline import NUM_LANDMARKS, confirmar_gesto, criar_hands
+from session_store import ClientState
 
-# Configuração MediaPipe
-mp_hands = mp.solutions.hands
-mp_draw = mp.solutions.drawing_utils
-hands = mp_hands.Hands(static_image_mode=False,
-                       max_num_hands=1,
-                       min_detection_confidence=0.7,
-                       model_complexity=0)
+CONEXOES_MAO = [(0, 1), (1, 2), (2, 3), (3, 4), (0, 5), (5, 6), (6, 7), (7, 8),
+                (5, 9), (9, 10), (10, 11), (11, 12), (9, 13), (13, 14), (14, 15),
+                (15, 16), (13, 17), (17, 18), (18, 19), (19, 20), (0, 17)]
 
-# Fila para armazenar frames
-clip_size = 30
-frames_clip = deque(maxlen=clip_size)
 
-# Histórico para confirmação
-ultimo_gesto = None
-confirmacoes = 0
+class UltimoFrame:
+    """Uma posição: o frame novo substitui o que ainda não foi consumido"""
 
-cap = cv2.VideoCapture(0)
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._fechado = False
+        self.descartados = 0
 
-while cap.isOpened():
-    ret, frame = cap.read()
-    if not ret:
-        break
+    def colocar(self, item):
+        with self._cond:
+            if self._item is not None:
+                self.descartados += 1
+            self._item = item
+            self._cond.notify()
 
-    # Espelhar a câmera
-    frame = cv2.flip(frame, 1)
+    def retirar(self, timeout=0.5):
+        with self._cond:
+            if self._item is None and not self._fechado:
+                self._cond.wait(timeout)
+            item, self._item = self._item, None
+            return item
 
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = hands.process(rgb)
+    def fechar(self):
+        with self._cond:
+            self._fechado = True
+            self._cond.notify_all()
 
-    if results.multi_hand_landmarks:
-        for hand_landmarks in results.multi_hand_landmarks:
-            mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+    @property
+    def fechado(self):
+        return self._fechado and self._item is None
 
-            coords = []
-            for lm in hand_landmarks.landmark:
-                coords.extend([lm.x, lm.y, lm.z])
 
-            frames_clip.append(coords)
+def colocar_descartando(fila, item):
+    """Fila limitada: se cheia, descarta o item mais antigo"""
+    while True:
+        try:
+            fila.put_nowait(item)
+            return True
+        except queue.Full:
+            try:
+                fila.get_nowait()
+            except queue.Empty:
+                pass
 
-    # Quando tiver frames suficientes, prever
-    if len(frames_clip) == clip_size:
-        entrada = np.array(frames_clip).flatten().reshape(1, -1)
-        gesto_predito = modelo.predict(entrada)[0]
 
-        if gesto_predito == ultimo_gesto:
-            confirmacoes += 1
-        else:
-            confirmacoes = 1
-            ultimo_gesto = gesto_predito
+class Reconhecedor:
+    """Estágio de inferência: rastreador da mão, clip e confirmação"""
+
+    def __init__(self, modelo):
+        self.modelo = modelo
+        self.feature_spec = spec_do_modelo(modelo)
+        self.tracker = TrackerSessao(criar_hands(), MotionGate.da_config() if config.GATE_ENABLED else None,
+                                     config.ROI_ENABLED)
+        self.state = ClientState('realtime')
+        self.gesto_confirmado = None  # Mantido na tela entre predições
+
+    def processar(self, frame):
+        """frame BGR já espelhado -> (coords ou None, gesto confirmado)"""
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        coords = self.tracker.process(rgb)
+        if coords is not None:
+            self.state.frames_clip.append(coords)
+
+        # Quando tiver frames suficientes, prever (a cada FRAME_SKIP frames novos)
+        if self.state.frames_clip.pronto(config.FRAME_SKIP):
+            self.state.frames_clip.marcar_predicao()
+            entrada = extrair_features(self.state.frames_clip.window(), self.feature_spec)
+            # exige N clipes iguais seguidos
+            self.gesto_confirmado, _ = confirmar_gesto(self.state, self.modelo.predict(entrada)[0])
+        return coords, self.gesto_confirmado
+
+    def close(self):
+        self.tracker.close()
+
+
+class Estatisticas:
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.exibidos = 0
+        self.latencias = []  # captura -> exibição, em segundos
+        self._janela = []  # instantes dos últimos frames exibidos, para o FPS
+
+    def registrar(self, capturado_em):
+        agora = time.perf_counter()
+        self.exibidos += 1
+        self.latencias.append(agora - capturado_em)
+        self._janela.append(agora)
+        if len(self._janela) > 30:
+            self._janela.pop(0)
+
+    @property
+    def fps(self):
+        if len(self._janela) < 2:
+            return 0.0
+        return (len(self._janela) - 1) / (self._janela[-1] - self._janela[0])
+
+    def resumo(self):
+        duracao = time.perf_counter() - self.inicio
+        latencias = np.array(self.latencias or [0.0]) * 1000
+        return {
+            'frames': self.exibidos,
+            'duracao_s': duracao,
+            'fps': self.exibidos / duracao if duracao else 0.0,
+            'latencia_p50_ms': float(np.percentile(latencias, 50)),
+            'latencia_p95_ms': float(np.percentile(latencias, 95)),
+        }
+
+
+def desenhar(frame, coords, gesto, stats):
+    if coords is not None:
+        altura, largura = frame.shape[:2]
+        pontos = (np.asarray(coords).reshape(NUM_LANDMARKS, 3)[:, :2] * (largura, altura)).astype(int)
+        for a, b in CONEXOES_MAO:
+            cv2.line(frame, tuple(pontos[a]), tuple(pontos[b]), config.COLOR_CONNECTIONS, 1)
+        for ponto in pontos:
+            cv2.circle(frame, tuple(ponto), config.LANDMARK_CIRCLE_RADIUS, config.COLOR_LANDMARKS, -1)
 
-        if confirmacoes >= 2:  # exige 2 clipes iguais seguidos
-            cv2.putText(frame, f"Gesto confirmado: {gesto_predito}",
-                        (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+    if gesto is not None:
+        cv2.putText(frame, f"Gesto confirmado: {gesto}",
+                    (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+    latencia = stats.latencias[-1] * 1000 if stats.latencias else 0.0
+    cv2.putText(frame, f"{stats.fps:.1f} FPS | {latencia:.0f} ms",
+                (10, frame.shape[0] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, config.COLOR_TEXT, 1)
 
+
+def abrir_fonte(video):
+    if video:
+        return cv2.VideoCapture(video)
+    cap = cv2.VideoCapture(config.CAMERA_INDEX)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, config.CAMERA_WIDTH)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, config.CAMERA_HEIGHT)
+    cap.set(cv2.CAP_PROP_FPS, config.CAMERA_FPS)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # sem fila de frames antigos no driver
+    return cap
+
+
+def exibir(frame, mostrar):
+    """Mostra o frame; retorna False se o usuário pediu para sair (ESC)"""
+    if not mostrar:
+        return True
     cv2.imshow("Reconhecimento em tempo real", frame)
+    return (cv2.waitKey(1) & 0xFF) != 27
+
+
+def executar_serial(cap, reconhecedor, mostrar):
+    stats = Estatisticas()
+    while cap.isOpened():
+        ret, frame = cap.read()
+        if not ret:
+            break
+        capturado_em = time.perf_counter()
+        frame = cv2.flip(frame, 1)  # Espelhar a câmera
+        coords, gesto = reconhecedor.processar(frame)
+        stats.registrar(capturado_em)
+        desenhar(frame, coords, gesto, stats)
+        if not exibir(frame, mostrar):
+            break
+    return stats, {}
+
+
+def executar_pipeline(cap, reconhecedor, mostrar, descartar, intervalo=0.0):
+    """
+    descartar=True: a captura mantém só o frame mais recente e a exibição
+    descarta o frame mais antigo se atrasar (câmera); False: filas
+    limitadas com espera, sem perder frames (arquivo o mais rápido possível)
+    """
+    entrada = UltimoFrame() if descartar else queue.Queue(maxsize=4)
+    saida = queue.Queue(maxsize=2)
+    parar = threading.Event()
+    contadores = {'capturados': 0, 'processados': 0, 'descartados_exibicao': 0}
+
+    def capturar():
+        proximo = time.perf_counter()
+        while not parar.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                break
+            contadores['capturados'] += 1
+            item = (frame, time.perf_counter())
+            if descartar:
+                entrada.colocar(item)
+            else:
+                while not parar.is_set():
+                    try:
+                        entrada.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+            if intervalo:
+                proximo += intervalo
+                time.sleep(max(0.0, proximo - time.perf_counter()))
+        if descartar:
+            entrada.fechar()
+        else:
+            entrada.put(None)
+
+    def inferir():
+        while not parar.is_set():
+            if descartar:
+                item = entrada.retirar()
+                if item is None:
+                    if entrada.fechado:
+                        break
+                    continue
+            else:
+                item = entrada.get()
+                if item is None:
+                    break
+            frame, capturado_em = item
+            frame = cv2.flip(frame, 1)  # Espelhar a câmera
+            coords, gesto = reconhecedor.processar(frame)
+            contadores['processados'] += 1
+            item = (frame, coords, gesto, capturado_em)
+            if not descartar:
+                saida.put(item)
+                continue
+            if saida.full():
+                contadores['descartados_exibicao'] += 1
+            colocar_descartando(saida, item)
+        colocar_descartando(saida, None)
+
+    threads = [threading.Thread(target=capturar, daemon=True),
+               threading.Thread(target=inferir, daemon=True)]
+    for t in threads:
+        t.start()
+
+    # Exibição na thread principal (exigência do cv2.imshow em vários sistemas)
+    stats = Estatisticas()
+    while True:
+        item = saida.get()
+        if item is None:
+            break
+        frame, coords, gesto, capturado_em = item
+        stats.registrar(capturado_em)
+        desenhar(frame, coords, gesto, stats)
+        if not exibir(frame, mostrar):
+            break
+
+    parar.set()
+    for t in threads:
+        t.join(timeout=2)
+    if descartar:
+        contadores['descartados_captura'] = entrada.descartados
+    return stats, contadores
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconhecimento de Libras em tempo real")
+    parser.add_argument('--serial', action='store_true', help="captura, inferência e exibição em sequência")
+    parser.add_argument('--video', help="ler deste arquivo em vez da câmera (sem janela)")
+    parser.add_argument('--tempo-real', action='store_true',
+                        help="com --video: ler no ritmo do vídeo, descartando frames como a câmera")
+    parser.add_argument('--mostrar', action='store_true', help="com --video: exibir a janela")
+    args = parser.parse_args()
+
+    # Carregar modelo (floresta compilada, se disponível)
+    modelo = carregar_modelo(config.MODEL_PATH, config.MODEL_ARTIFACT_PATH)
+    reconhecedor = Reconhecedor(modelo)
+
+    cap = abrir_fonte(args.video)
+    mostrar = args.mostrar or not args.video
+    if args.serial:
+        stats, contadores = executar_serial(cap, reconhecedor, mostrar)
+    else:
+        fps_video = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        stats, contadores = executar_pipeline(
+            cap, reconhecedor, mostrar,
+            descartar=not args.video or args.tempo_real,
+            intervalo=1.0 / fps_video if args.video and args.tempo_real else 0.0)
 
-    if cv2.waitKey(1) & 0xFF == 27:  # ESC
-        break
+    cap.release()
+    reconhecedor.close()
+    if mostrar:
+        cv2.destroyAllWindows()
 
-cap.release()
-cv2.destroyAllWindows()
+    r = stats.resumo()
+    print(f"[INFO] Modo {'serial' if args.serial else 'pipeline'}: {r['frames']} frames em "
+          f"{r['duracao_s']:.1f}s ({r['fps']:.1f} FPS), latência captura->exibição "
+          f"p50 {r['latencia_p50_ms']:.1f} ms, p95 {r['latencia_p95_ms']:.1f} ms")
+    if contadores:
+        print(f"[INFO] {contadores}")
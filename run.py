@@ -48,7 +48,7 @@ def check_dependencies():
 
 def check_model():
     """Verifica se o modelo treinado existe"""
-    if not os.path.exists("modelo_libras.pkl"):
+    if not (os.path.exists("modelo_libras.pkl") or os.path.exists("modelo_libras/header.json")):
         print("\n⚠️  AVISO: Modelo não encontrado!")
         print("   Execute os seguintes comandos:")
         print("   1. python coleta_dados.py  (para cada gesto)")
@@ -0,0 +1,213 @@
+"""
+Estado de sessão dos clientes do Libras Bridge
+O estado (clip de landmarks, último gesto, confirmações) fica num backend
+plugável, para que vários workers e nós possam servir o mesmo app:
+
+- 'memory': dicionário no próprio processo (um worker, comportamento original)
+- 'redis': store compatível com Redis (GET/SET/DELETE), compartilhado entre
+  processos; o cliente pode ser trocado por um substituto local (LocalRedis)
+
+O estado é indexado pelo id persistente do cliente (não pelo sid do
+Socket.IO), então sobrevive a uma reconexão que caia em outro worker.
+"""
+
+import json
+import struct
+import threading
+import time
+
+import numpy as np
+
+import config
+from clip_buffer import ClipBuffer
+from logs import erro_limitado
+
+_TAMANHO_META = struct.Struct('<I')
+
+
+class ClientState:
+    def __init__(self, client_key=None):
+        self.client_key = client_key  # Identificador persistente entre reconexões
+        self.clip_size = config.CLIP_SIZE
+        self.frames_clip = ClipBuffer(self.clip_size)
+        self.ultimo_gesto = None
+        self.confirmacoes = 0
+        self.last_hand_detected = False
+
+    def to_bytes(self):
+        """Tamanho do JSON (4 bytes) + JSON dos campos + janela float32"""
+        janela = self.frames_clip.window()
+        meta = json.dumps({
+            'client_key': self.client_key,
+            'clip_size': self.clip_size,
+            'ultimo_gesto': None if self.ultimo_gesto is None else str(self.ultimo_gesto),
+            'confirmacoes': self.confirmacoes,
+            'last_hand_detected': self.last_hand_detected,
+            'novos': self.frames_clip.novos,
+            'frames': len(janela),
+        }).encode('utf-8')
+        return _TAMANHO_META.pack(len(meta)) + meta + janela.astype('<f4').tobytes()
+
+    @classmethod
+    def from_bytes(cls, dados):
+        (tamanho,) = _TAMANHO_META.unpack_from(dados)
+        inicio = _TAMANHO_META.size
+        meta = json.loads(bytes(dados[inicio:inicio + tamanho]).decode('utf-8'))
+
+        state = cls(meta['client_key'])
+        state.ultimo_gesto = meta['ultimo_gesto']
+        state.confirmacoes = meta['confirmacoes']
+        state.last_hand_detected = meta['last_hand_detected']
+        # Um estado salvo com outro CLIP_SIZE é descartado (clip incompatível);
+        # clip vazio (start_camera/stop_camera) não tem janela a restaurar
+        if meta['clip_size'] == state.clip_size and meta['frames']:
+            janela = np.frombuffer(dados, dtype='<f4', offset=inicio + tamanho)
+            state.frames_clip.restaurar(janela.reshape(meta['frames'], -1), meta['novos'])
+        return state
+
+
+class InMemorySessionStore:
+    """Estados no próprio processo; exige um único worker"""
+
+    compartilhado = False
+
+    def __init__(self):
+        self._estados = {}
+
+    def get(self, chave):
+        return self._estados.get(chave)
+
+    def save(self, chave, state):
+        self._estados[chave] = state
+
+    def delete(self, chave):
+        self._estados.pop(chave, None)
+
+    def release(self, chave):
+        """Conexão encerrada neste processo"""
+        self.delete(chave)
+
+    def get_stats(self):
+        return {'backend': 'memory', 'sessoes_locais': len(self._estados)}
+
+
+class RedisSessionStore:
+    """
+    Estados serializados num store compatível com Redis, com cache local
+    das sessões conectadas a este processo. Com sticky sessions cada sessão
+    é atendida por um só worker, então o cache local é a cópia de trabalho
+    e o store recebe uma gravação por frame (write-through).
+    """
+
+    compartilhado = True
+
+    def __init__(self, cliente, prefixo='libras:sessao:', ttl=3600):
+        self.cliente = cliente
+        self.prefixo = prefixo
+        self.ttl = ttl
+        self._locais = {}
+        self.leituras = 0
+        self.gravacoes = 0
+        self.erros = 0
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        """redis://... usa redis-py; local:// usa o substituto em memória"""
+        if url.startswith('local://'):
+            return cls(LocalRedis(), **kwargs)
+        import redis
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get(self, chave):
+        state = self._locais.get(chave)
+        if state is not None:
+            return state
+        try:
+            dados = self.cliente.get(self.prefixo + chave)
+        except Exception as e:
+            self.erros += 1
+            erro_limitado('sessao_leitura', f"Leitura do estado da sessão {chave}: {e}")
+            return None
+        self.leituras += 1
+        if dados is None:
+            return None
+        try:
+            state = ClientState.from_bytes(dados)
+        except Exception as e:
+            # Estado ilegível: descartado, a sessão recomeça do zero
+            self.erros += 1
+            erro_limitado('sessao_decodificacao', f"Estado da sessão {chave} descartado: {e}")
+            self.delete(chave)
+            return None
+        self._locais[chave] = state
+        return state
+
+    def save(self, chave, state):
+        self._locais[chave] = state
+        try:
+            self.cliente.set(self.prefixo + chave, state.to_bytes(), ex=self.ttl)
+            self.gravacoes += 1
+        except Exception as e:
+            # O cache local continua atendendo; só a cópia compartilhada atrasa
+            self.erros += 1
+            erro_limitado('sessao_gravacao', f"Gravação do estado da sessão {chave}: {e}")
+
+    def delete(self, chave):
+        self._locais.pop(chave, None)
+        try:
+            self.cliente.delete(self.prefixo + chave)
+        except Exception as e:
+            self.erros += 1
+            erro_limitado('sessao_remocao', f"Remoção do estado da sessão {chave}: {e}")
+
+    def release(self, chave):
+        """Conexão encerrada: o estado fica no store até o TTL, para reconexões"""
+        self._locais.pop(chave, None)
+
+    def get_stats(self):
+        return {
+            'backend': 'redis',
+            'sessoes_locais': len(self._locais),
+            'leituras': self.leituras,
+            'gravacoes': self.gravacoes,
+            'erros': self.erros,
+        }
+
+
+class LocalRedis:
+    """Substituto em memória do cliente Redis (get/set com ex/delete)"""
+
+    def __init__(self):
+        self._dados = {}
+        self._lock = threading.Lock()
+
+    def get(self, chave):
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                return None
+            valor, expira = item
+            if expira is not None and expira <= time.monotonic():
+                del self._dados[chave]
+                return None
+            return valor
+
+    def set(self, chave, valor, ex=None):
+        expira = time.monotonic() + ex if ex else None
+        with self._lock:
+            self._dados[chave] = (bytes(valor), expira)
+        return True
+
+    def delete(self, *chaves):
+        with self._lock:
+            return sum(self._dados.pop(chave, None) is not None for chave in chaves)
+
+
+def criar_session_store(backend=None, url=None, ttl=None):
+    backend = backend or config.SESSION_BACKEND
+    if backend == 'memory':
+        return InMemorySessionStore()
+    if backend == 'redis':
+        return RedisSessionStore.from_url(url or config.SESSION_REDIS_URL,
+                                          ttl=ttl or config.SESSION_TTL)
+    raise ValueError(f"SESSION_BACKEND desconhecido: {backend}")
@@ -0,0 +1,9 @@
+"""
+Os testes que importam app.py não tocam o traducoes.db do repositório
+"""
+
+import os
+import tempfile
+
+os.environ.setdefault('LIBRAS_TRANSLATION_LOG',
+                      os.path.join(tempfile.mkdtemp(prefix='libras_testes_'), 'traducoes.db'))
@@ -0,0 +1,71 @@
+"""
+Servidor: regra de confirmação e registro das traduções de uma sessão
+"""
+
+import numpy as np
+import pytest
+
+import app
+import config
+from session_store import ClientState
+from translation_log import TranslationLog
+
+COORDS = np.full(63, 0.5, dtype=np.float32)
+
+
+@pytest.fixture
+def registro(tmp_path, monkeypatch):
+    log = TranslationLog(str(tmp_path / "traducoes.db"))
+    monkeypatch.setattr(app, 'translation_log', log)
+    monkeypatch.setattr(app, 'obter_modelo', lambda: object())
+    monkeypatch.setattr(app, 'prever', lambda entrada: ['ola'])
+    yield log
+    log.fechar()
+
+
+def _sinalizar(state, frames=None):
+    for _ in range(frames or config.CLIP_SIZE + config.NUM_CONFIRMATIONS * config.FRAME_SKIP * 3):
+        app.process_landmarks_logic(COORDS, state)
+
+
+def _pausa(state, frames=5):
+    for _ in range(frames):
+        app.process_landmarks_logic(None, state)
+
+
+def test_gesto_mantido_registrado_uma_vez(registro):
+    state = ClientState('sessao')
+    _sinalizar(state)
+    _sinalizar(state)
+    registro.flush()
+    assert registro.contar('sessao') == 1
+
+
+def test_mesmo_gesto_depois_de_pausa_registrado_duas_vezes(registro):
+    state = ClientState('sessao')
+    _sinalizar(state)
+    _pausa(state)
+    _sinalizar(state)
+    registro.flush()
+    assert registro.contar('sessao') == 2
+
+
+def test_client_id_em_uso_nao_e_compartilhado():
+    primeiro = app.socketio.test_client(app.app, auth={'client_id': 'aba'})
+    segundo = app.socketio.test_client(app.app, auth={'client_id': 'aba'})
+    try:
+        chaves = {sid: app.get_client_key(sid) for sid in app.sids_conectados}
+        assert list(chaves.values()).count('aba') == 1
+        # A conexão que ficou com o sid não recebe o estado da outra
+        sid_segundo = next(sid for sid, chave in chaves.items() if chave == sid)
+        assert app.get_client_state(sid_segundo) is not app.get_client_state('aba')
+    finally:
+        primeiro.disconnect()
+        segundo.disconnect()
+
+    # Com a primeira conexão fechada, o id volta a ser aceito
+    terceiro = app.socketio.test_client(app.app, auth={'client_id': 'aba'})
+    try:
+        assert 'aba' in app.client_keys.values()
+    finally:
+        terceiro.disconnect()
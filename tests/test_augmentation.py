@@ -0,0 +1,42 @@
+"""
+Aumento de dados: forma e dtype dos lotes, com cada transformação ligada
+"""
+
+import numpy as np
+
+from augmentation import Aumentador, lotes
+
+
+def _clips(n=8, T=30, seed=0):
+    return np.random.default_rng(seed).random((n, T, 63))  # float64 de propósito
+
+
+def test_saida_float32_com_a_forma_da_entrada():
+    clips = _clips()
+    saida = Aumentador(espelhar=0.5, ruido=0.01, escala=0.1, rotacao_graus=10,
+                       distorcao_tempo=0.3, seed=0).aplicar(clips)
+    assert saida.shape == clips.shape
+    assert saida.dtype == np.float32
+
+
+def test_distorcao_temporal_mantem_float32():
+    pontos = _clips().astype(np.float32).reshape(8, 30, 21, 3)
+    saida = Aumentador(distorcao_tempo=0.5, seed=0).distorcer_tempo(pontos)
+    assert saida.dtype == np.float32
+    # O primeiro e o último frame não se movem (t = 0 e t = T-1)
+    np.testing.assert_allclose(saida[:, [0, -1]], pontos[:, [0, -1]], atol=1e-6)
+
+
+def test_sem_transformacoes_devolve_os_clips():
+    clips = _clips()
+    saida = Aumentador(espelhar=0, ruido=0, escala=0, rotacao_graus=0,
+                       distorcao_tempo=0, seed=0).aplicar(clips)
+    np.testing.assert_allclose(saida, clips.astype(np.float32))
+
+
+def test_lotes_cobrem_cada_clip_uma_vez_por_copia():
+    clips = _clips(n=10)
+    y = np.arange(10)
+    rotulos = np.concatenate([lote_y for lote, lote_y in lotes(clips, y, tamanho_lote=4,
+                                                               copias=2, seed=0)])
+    assert sorted(rotulos) == sorted(np.concatenate([y, y]))
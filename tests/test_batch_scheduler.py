@@ -0,0 +1,53 @@
+"""
+Agendador de lote: espera a janela com lote incompleto, não espera com
+lote cheio, e entrega cada predição ao clip de origem
+"""
+
+import numpy as np
+
+from batch_scheduler import BatchScheduler
+
+
+def _agendador(n_clips, max_batch, rodadas, predict_fn=None):
+    """Executa run() por `rodadas` esperas; retorna (esperas, lotes, resultados)"""
+    esperas, lotes, resultados = [], [], []
+
+    def prever(X):
+        lotes.append(len(X))
+        return [f"g{int(x[0])}" for x in X]
+
+    def esperar(segundos):
+        esperas.append(segundos)
+        if len(esperas) == rodadas:
+            agendador.stop()
+
+    agendador = BatchScheduler(predict_fn or prever, lambda item, gesto: resultados.append((item['sid'], gesto)),
+                               window_ms=10, max_batch=max_batch, sleep_fn=esperar, stats_interval=0)
+    for i in range(n_clips):
+        agendador.submit(f"sid{i}", None, np.full((1, 4), i, dtype=np.float32))
+    agendador.run()
+    return agendador, esperas, lotes, resultados
+
+
+def test_lote_incompleto_espera_a_janela():
+    agendador, esperas, lotes, resultados = _agendador(3, max_batch=8, rodadas=2)
+    assert esperas == [0.01, 0.01]
+    assert lotes == [3]  # uma chamada ao modelo para os três clips
+    assert resultados == [('sid0', 'g0'), ('sid1', 'g1'), ('sid2', 'g2')]
+    assert agendador.get_stats()['total_clips'] == 3
+
+
+def test_lote_cheio_nao_espera_a_janela():
+    agendador, esperas, lotes, resultados = _agendador(5, max_batch=2, rodadas=4)
+    # Lote cheio à espera: só cede o loop (0); o resto vai na janela seguinte
+    assert esperas == [0, 0, 0.01, 0.01]
+    assert lotes == [2, 2, 1]
+    assert [sid for sid, _ in resultados] == [f"sid{i}" for i in range(5)]
+    assert agendador.maior_lote == 2 and agendador.pending() == 0
+
+
+def test_falha_na_predicao_entrega_none_a_cada_clip():
+    def falhar(X):
+        raise RuntimeError("modelo indisponível")
+    _, _, _, resultados = _agendador(2, max_batch=8, rodadas=1, predict_fn=falhar)
+    assert resultados == [('sid0', None), ('sid1', None)]
@@ -0,0 +1,58 @@
+"""
+Buffer circular do clip: janela contígua em ordem cronológica ao dar a
+volta e cadência das predições (stride)
+"""
+
+import numpy as np
+
+from clip_buffer import ClipBuffer
+
+CLIP_SIZE = 5
+
+
+def _frame(n):
+    return np.full(3, n, dtype=np.float32)
+
+
+def test_janela_contigua_e_cronologica_ao_dar_a_volta():
+    buffer = ClipBuffer(CLIP_SIZE, num_coords=3)
+    for n in range(3):
+        buffer.append(_frame(n))
+    assert len(buffer) == 3 and not buffer.is_full()
+    assert list(buffer.window()[:, 0]) == [0, 1, 2]
+
+    for n in range(3, 2 * CLIP_SIZE + 3):
+        buffer.append(_frame(n))
+        janela = buffer.window()
+        inicio = max(0, n - CLIP_SIZE + 1)
+        assert list(janela[:, 0]) == list(range(inicio, n + 1))
+        # View do buffer (sem cópia) e contígua em todas as posições de escrita
+        assert janela.base is not None and janela.flags['C_CONTIGUOUS']
+
+
+def test_predicao_a_cada_stride_frames():
+    buffer = ClipBuffer(CLIP_SIZE, num_coords=3)
+    stride = 2
+    predicoes = []
+    for n in range(CLIP_SIZE + 6):
+        buffer.append(_frame(n))
+        if buffer.pronto(stride):
+            predicoes.append(n)
+            buffer.marcar_predicao()
+    # A primeira com a janela cheia, depois a cada `stride` frames
+    assert predicoes == [CLIP_SIZE - 1, CLIP_SIZE + 1, CLIP_SIZE + 3, CLIP_SIZE + 5]
+    assert buffer.novos == 0
+
+
+def test_limpar_e_restaurar():
+    buffer = ClipBuffer(CLIP_SIZE, num_coords=3)
+    for n in range(CLIP_SIZE + 2):
+        buffer.append(_frame(n))
+    salvo = buffer.window().copy()
+
+    buffer.clear()
+    assert len(buffer) == 0 and not buffer.pronto()
+
+    buffer.restaurar(salvo, novos=1)
+    np.testing.assert_array_equal(buffer.window(), salvo)
+    assert buffer.pronto(1) and not buffer.pronto(2)
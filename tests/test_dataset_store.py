@@ -0,0 +1,67 @@
+"""
+Store empacotado: ingestão de clips novos e de clips regravados em dataset/
+"""
+
+import json
+import os
+
+import numpy as np
+
+from dataset_store import DatasetStore
+
+CLIP_SIZE = 30
+
+
+def _gravar(pasta, gesto, n, valor, mtime_ns=None):
+    caminho = os.path.join(pasta, gesto, f"clip_{n}.npy")
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    np.save(caminho, np.full((CLIP_SIZE, 63), valor, dtype=np.float32))
+    if mtime_ns is not None:
+        os.utime(caminho, ns=(mtime_ns, mtime_ns))
+    return caminho
+
+
+def test_clip_regravado_substituido_no_lugar(tmp_path):
+    dataset, pasta_store = str(tmp_path / "dataset"), str(tmp_path / "store")
+    for n in range(3):
+        _gravar(dataset, 'ola', n, n, mtime_ns=1_000_000_000)
+    store = DatasetStore(pasta_store, CLIP_SIZE)
+    assert store.ingerir_pasta(dataset) == 3
+    assert store.ingerir_pasta(dataset) == 0
+    revisao = store.revisao
+
+    # Mesmo nome, conteúdo novo
+    _gravar(dataset, 'ola', 1, 7.0, mtime_ns=2_000_000_000)
+    _gravar(dataset, 'ola', 3, 3.0)
+    assert store.ingerir_pasta(dataset) == 2
+    assert len(store) == 4
+    assert float(store.X[1, 0, 0]) == 7.0
+    assert list(store.revisados_desde(revisao)) == [1, 3]
+
+    # O que foi gravado é o que outro processo lê
+    reaberto = DatasetStore(pasta_store)
+    assert reaberto.revisao == store.revisao
+    assert float(reaberto.X[1, 0, 0]) == 7.0
+    assert reaberto.ingerir_pasta(dataset) == 0
+
+
+def test_clip_sem_assinatura_nao_e_regravado(tmp_path):
+    dataset, pasta_store = str(tmp_path / "dataset"), str(tmp_path / "store")
+    _gravar(dataset, 'sim', 0, 1.0)
+    store = DatasetStore(pasta_store, CLIP_SIZE)
+    store.ingerir_pasta(dataset)
+
+    # Índice de antes das assinaturas
+    indice = os.path.join(pasta_store, "indice.jsonl")
+    with open(indice, encoding='utf-8') as f:
+        registros = [json.loads(linha) for linha in f]
+    for registro in registros:
+        del registro['assinatura'], registro['revisao']
+    with open(indice, 'w', encoding='utf-8') as f:
+        f.writelines(json.dumps(r) + "\n" for r in registros)
+
+    antigo = DatasetStore(pasta_store)
+    revisao = antigo.revisao
+    assert antigo.ingerir_pasta(dataset) == 0
+    assert antigo.registro(0)['assinatura'] is not None
+    assert len(antigo.revisados_desde(revisao)) == 0
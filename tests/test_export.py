@@ -0,0 +1,47 @@
+"""
+Exportador contínuo: colunas extras depois de limpar o histórico e
+gravação do buffer numa sessão parada
+"""
+
+import csv
+import json
+import time
+
+import config
+from export import TranslationExporter
+
+
+def _ler_csv(caminho):
+    with open(caminho, encoding='utf-8', newline='') as f:
+        return list(csv.reader(f))
+
+
+def test_limpar_historico_descarta_colunas_extras(tmp_path):
+    with TranslationExporter(tmp_path, streaming=True, formatos=('csv',)) as exportador:
+        exportador.add_translation('ola', 90, video='a.mp4')
+        exportador.clear_history()
+        exportador.add_translation('sim', 80)
+        arquivos = exportador.arquivos()['csv']
+
+    assert len(arquivos) == 2
+    assert _ler_csv(arquivos[0])[0] == ['data', 'hora', 'gesto', 'confianca', 'video']
+    cabecalho, linha = _ler_csv(arquivos[-1])
+    assert cabecalho == ['data', 'hora', 'gesto', 'confianca']
+    assert linha[2:] == ['sim', '80']
+
+
+def test_sessao_parada_grava_o_buffer_no_prazo(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'EXPORT_FLUSH_EVERY', 1000)
+    monkeypatch.setattr(config, 'EXPORT_FLUSH_INTERVAL_S', 0.05)
+    with TranslationExporter(tmp_path, streaming=True, formatos=('jsonl',)) as exportador:
+        exportador.add_translation('ola', 90)
+        caminho = exportador.arquivos()['jsonl'][0]
+
+        prazo = time.monotonic() + 2
+        while time.monotonic() < prazo:
+            with open(caminho, encoding='utf-8') as f:
+                linhas = f.read().splitlines()
+            if linhas:
+                break
+            time.sleep(0.01)
+        assert [json.loads(linha)['gesto'] for linha in linhas] == ['ola']
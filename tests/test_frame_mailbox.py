@@ -0,0 +1,55 @@
+"""
+Caixa de frames: o mais recente substitui o pendente, e a latência define
+o intervalo de envio sugerido ao cliente
+"""
+
+import time
+
+from frame_mailbox import FrameMailbox
+
+
+def _processar(caixa, latencia_ms):
+    """Registra um frame processado com a latência dada"""
+    return caixa.registrar(time.perf_counter() - latencia_ms / 1000)
+
+
+def test_servidor_folgado_nao_pede_mais_frames_que_o_inicial():
+    caixa = FrameMailbox(intervalo_inicial_ms=100, intervalo_max_ms=1000, fator=1.5)
+    for _ in range(20):
+        assert _processar(caixa, 1) is None
+    assert caixa.intervalo_ms == 100
+
+    # Depois de uma fase lenta, a dica volta ao intervalo inicial, não abaixo
+    caixa.alpha = 1.0
+    assert _processar(caixa, 400) == 600
+    assert _processar(caixa, 1) == 100
+
+
+def test_frame_mais_recente_substitui_o_pendente():
+    caixa = FrameMailbox()
+    assert caixa.depositar('f1') is True   # inicia o consumidor
+    assert caixa.depositar('f2') is False  # consumidor já em andamento
+    assert caixa.depositar('f3') is False
+
+    frame, _ = caixa.retirar()
+    assert frame == 'f3'
+    assert (caixa.recebidos, caixa.descartados) == (3, 2)
+
+    # Fila vazia encerra o consumidor; o próximo frame o inicia de novo
+    assert caixa.retirar() is None
+    assert caixa.depositar('f4') is True
+
+    caixa.fechar()
+    assert caixa.retirar() is None
+    assert caixa.depositar('f5') is False
+
+
+def test_media_movel_da_latencia_define_a_dica():
+    caixa = FrameMailbox(intervalo_inicial_ms=100, intervalo_max_ms=1000, fator=2.0, alpha=0.5)
+    assert _processar(caixa, 100) == 200          # primeira medida: 100 ms x 2
+    assert abs(caixa.latencia_ms - 100) < 5
+    assert _processar(caixa, 120) is None         # média 110 -> 220: menos de 20%
+    assert _processar(caixa, 300) == 410          # média 205 -> 410
+    for _ in range(10):
+        _processar(caixa, 5000)
+    assert caixa.intervalo_ms == 1000             # limitado ao máximo
@@ -0,0 +1,55 @@
+"""
+Rastreador da sessão: o rastreamento do MediaPipe recomeça ao trocar
+entre recorte (ROI) e frame inteiro
+"""
+
+import numpy as np
+
+import pipeline
+from hands_pool import TrackerSessao
+
+RGB = np.zeros((480, 640, 3), dtype=np.uint8)
+MAO = np.column_stack([np.linspace(0.45, 0.55, 21), np.linspace(0.45, 0.55, 21),
+                       np.zeros(21)]).ravel().astype(np.float32)
+
+
+class HandsFalso:
+    def __init__(self):
+        self.reinicios = 0
+        self.chamadas = []  # (roi, reinícios até a chamada)
+
+    def reset(self):
+        self.reinicios += 1
+
+
+def _tracker(monkeypatch, respostas):
+    respostas = list(respostas)
+
+    def extrair(hands, rgb, roi=None):
+        hands.chamadas.append((roi, hands.reinicios))
+        return respostas.pop(0)
+    monkeypatch.setattr(pipeline, 'extrair_landmarks', extrair)
+    return TrackerSessao(HandsFalso(), usar_roi=True)
+
+
+def test_reinicia_ao_trocar_entre_recorte_e_frame_inteiro(monkeypatch):
+    # inteiro (mão) -> recorte (mão) -> recorte (perdida) + inteiro (mão) -> recorte (mão)
+    tracker = _tracker(monkeypatch, [MAO, MAO, None, MAO, MAO])
+    for _ in range(4):
+        assert tracker.process(RGB) is not None
+
+    rois = [roi for roi, _ in tracker.hands.chamadas]
+    reinicios = [n for _, n in tracker.hands.chamadas]
+    assert rois[0] is None and rois[1] is not None and rois[2] == rois[1]
+    assert rois[3] is None and rois[4] is not None
+    # Um reinício a cada troca, nenhum entre frames com a mesma entrada
+    assert reinicios == [0, 1, 1, 2, 3]
+
+
+def test_sem_roi_nao_reinicia(monkeypatch):
+    respostas = [MAO, MAO, None, MAO]
+    tracker = _tracker(monkeypatch, respostas)
+    tracker.usar_roi = False
+    for _ in range(4):
+        tracker.process(RGB)
+    assert tracker.hands.reinicios == 0
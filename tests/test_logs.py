@@ -0,0 +1,29 @@
+"""
+Log com limite de frequência: chaves por conexão não se acumulam
+"""
+
+import logging
+
+import logs
+
+
+def test_esquecer_descarta_so_as_chaves_da_conexao(monkeypatch):
+    monkeypatch.setattr(logs, '_ultimos', {})
+    monkeypatch.setattr(logs.logger, 'level', logging.DEBUG)
+    logs.debug_limitado(('mao', 'sid1'), "mão")
+    logs.debug_limitado(('frame', 'sid1'), "frame")
+    logs.debug_limitado(('frame', 'sid2'), "frame")
+    logs.erro_limitado('predicao', "erro")
+
+    logs.esquecer('sid1')
+    assert set(logs._ultimos) == {('frame', 'sid2'), 'predicao'}
+
+
+def test_suprime_dentro_do_intervalo(monkeypatch):
+    monkeypatch.setattr(logs, '_ultimos', {})
+    emitidas = []
+    monkeypatch.setattr(logs.logger, 'log', lambda nivel, mensagem: emitidas.append(mensagem))
+    for _ in range(3):
+        logs.aviso_limitado('x', "repetida", intervalo=60)
+    assert emitidas == ["repetida"]
+    assert logs._ultimos['x'][1] == 2
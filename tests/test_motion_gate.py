@@ -0,0 +1,48 @@
+"""
+Filtro de movimento: com mão todos os frames passam; sessão ociosa pula
+frames iguais, roda a detecção a cada K frames e volta com movimento
+"""
+
+import numpy as np
+
+from motion_gate import MotionGate
+
+PARADO = np.full((480, 640, 3), 100, dtype=np.uint8)
+MUDOU = np.full((480, 640, 3), 140, dtype=np.uint8)
+
+
+def _ocioso(frames_sem_mao=3, intervalo_ocioso=4):
+    gate = MotionGate(limiar=3.0, frames_sem_mao=frames_sem_mao, intervalo_ocioso=intervalo_ocioso)
+    for _ in range(frames_sem_mao):
+        assert gate.deve_processar(PARADO)
+        gate.registrar(False)
+    assert gate.ocioso
+    return gate
+
+
+def test_com_mao_todos_os_frames_passam():
+    gate = MotionGate(frames_sem_mao=3, intervalo_ocioso=4)
+    for _ in range(20):
+        assert gate.deve_processar(PARADO)
+        gate.registrar(True)
+    assert not gate.ocioso
+
+
+def test_ocioso_pula_frames_iguais_e_detecta_a_cada_k():
+    gate = _ocioso(intervalo_ocioso=4)
+    decisoes = []
+    for _ in range(8):
+        processou = gate.deve_processar(PARADO)
+        decisoes.append(processou)
+        if processou:
+            gate.registrar(False)
+    assert decisoes == [False, False, False, True] * 2
+
+
+def test_movimento_acorda_a_sessao_ociosa():
+    gate = _ocioso()
+    assert not gate.deve_processar(PARADO)
+    assert gate.deve_processar(MUDOU)
+    gate.registrar(True)
+    assert not gate.ocioso
+    assert gate.deve_processar(MUDOU)  # com mão, mesmo sem movimento
@@ -0,0 +1,73 @@
+"""
+Estado de sessão: serialização do ClientState e dois stores (como dois
+workers) compartilhando o mesmo LocalRedis
+"""
+
+import numpy as np
+
+import config
+from session_store import ClientState, LocalRedis, RedisSessionStore
+
+
+def _estado(chave='cliente-1', frames=None, seed=0):
+    state = ClientState(chave)
+    rng = np.random.default_rng(seed)
+    for _ in range(config.CLIP_SIZE + 7 if frames is None else frames):
+        state.frames_clip.append(rng.random(63, dtype=np.float32))
+    state.ultimo_gesto = 'ola'
+    state.confirmacoes = 2
+    state.last_hand_detected = True
+    return state
+
+
+def _assert_iguais(a, b):
+    assert (a.client_key, a.ultimo_gesto, a.confirmacoes, a.last_hand_detected) == \
+        (b.client_key, b.ultimo_gesto, b.confirmacoes, b.last_hand_detected)
+    assert b.frames_clip.novos == a.frames_clip.novos
+    np.testing.assert_array_equal(b.frames_clip.window(), a.frames_clip.window())
+
+
+def test_ida_e_volta_em_bytes():
+    for frames in (config.CLIP_SIZE + 7, 5, 0):
+        state = _estado(frames=frames)
+        _assert_iguais(state, ClientState.from_bytes(state.to_bytes()))
+
+
+def test_estado_de_outro_clip_size_descarta_a_janela(monkeypatch):
+    dados = _estado().to_bytes()
+    monkeypatch.setattr(config, 'CLIP_SIZE', config.CLIP_SIZE + 1)
+    state = ClientState.from_bytes(dados)
+    assert state.ultimo_gesto == 'ola' and len(state.frames_clip) == 0
+
+
+def test_um_store_grava_e_outro_le():
+    redis = LocalRedis()
+    worker_a, worker_b = RedisSessionStore(redis), RedisSessionStore(redis)
+
+    state = _estado()
+    worker_a.save('cliente-1', state)
+    # Cache local de A: a mesma instância, sem ler do store
+    assert worker_a.get('cliente-1') is state and worker_a.leituras == 0
+
+    # B não tem a sessão em cache: lê a cópia gravada por A
+    lido = worker_b.get('cliente-1')
+    assert lido is not state and worker_b.leituras == 1
+    _assert_iguais(state, lido)
+
+    # Reconexão em A depois de B continuar a sessão (write-through)
+    lido.confirmacoes = 5
+    worker_b.save('cliente-1', lido)
+    worker_a.release('cliente-1')
+    assert worker_a.get('cliente-1').confirmacoes == 5
+
+    worker_b.delete('cliente-1')
+    worker_a.release('cliente-1')
+    assert worker_a.get('cliente-1') is None
+
+
+def test_estado_ilegivel_e_descartado():
+    redis = LocalRedis()
+    store = RedisSessionStore(redis)
+    redis.set(store.prefixo + 'cliente-1', b'\xff\xff')
+    assert store.get('cliente-1') is None
+    assert store.erros == 1 and redis.get(store.prefixo + 'cliente-1') is None
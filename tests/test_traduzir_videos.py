@@ -0,0 +1,95 @@
+"""
+Tradução de vídeos em trechos: a mesma saída da execução sequencial
+(--trecho-s 0), numa sequência de clips gravados (dataset/) com pausas
+"""
+
+import glob
+import os
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+import config
+from features import FeatureSpec, extrair_features
+from traduzir_videos import PAUSA_SINCRONIA, Trecho, juntar_trechos
+
+PASTA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), config.DATASET_PATH)
+SPEC = FeatureSpec()
+FPS = 30.0
+BLOCO = 64
+
+
+def _gravacao(seed=0):
+    """Coordenadas por frame (None = sem mão): gestos de 2 clips e pausas de vários tamanhos"""
+    arquivos = sorted(glob.glob(os.path.join(PASTA, '*', 'clip_*.npy')))
+    if not arquivos:
+        pytest.skip(f"sem clips em {PASTA}")
+    rng = np.random.default_rng(seed)
+    gestos = sorted({os.path.basename(os.path.dirname(a)) for a in arquivos})
+    por_gesto = {g: [a for a in arquivos if os.path.basename(os.path.dirname(a)) == g] for g in gestos}
+
+    clips, rotulos, frames = [], [], []
+    for i in range(24):
+        # O mesmo gesto duas vezes seguidas de vez em quando (pausa entre eles)
+        gesto = gestos[rng.integers(len(gestos))] if i % 4 else gestos[0]
+        for arquivo in rng.choice(por_gesto[gesto], 2):
+            clip = np.load(arquivo).astype(np.float32)
+            clips.append(clip)
+            rotulos.append(gesto)
+            frames.extend(clip)
+        frames.extend([None] * int(rng.choice([0, 3, PAUSA_SINCRONIA - 1, PAUSA_SINCRONIA,
+                                               PAUSA_SINCRONIA + 7, 3 * PAUSA_SINCRONIA,
+                                               5 * PAUSA_SINCRONIA + 11])))
+    modelo = RandomForestClassifier(n_estimators=10, random_state=0)
+    modelo.fit(extrair_features(np.stack(clips), SPEC), rotulos)
+    return frames, modelo
+
+
+def _executar(frames, modelo, inicio, fim, sincronizado):
+    """O laço de _traduzir_trecho, com as coordenadas já extraídas"""
+    trecho = Trecho('video', inicio, fim, sincronizado, SPEC, FPS)
+    indice = leitura = inicio if sincronizado else max(0, inicio - PAUSA_SINCRONIA)
+    while not trecho.encerrado:
+        bloco = frames[indice:indice + BLOCO]
+        if not bloco:
+            trecho.fim_real = indice
+            break
+        for coords in bloco:
+            trecho.passo(indice, coords)
+            indice += 1
+            if trecho.encerrado:
+                break
+        trecho.confirmar(modelo)
+    return {'inicio': inicio, 'fim': fim, 'sincronias': trecho.sincronias,
+            'fim_real': trecho.fim_real, 'frames': indice - leitura, 'traducoes': trecho.traducoes}
+
+
+def _em_trechos(frames, modelo, passo, alterar=None):
+    resultados = [_executar(frames, modelo, ini, min(ini + passo, len(frames)), ini == 0)
+                  for ini in range(0, len(frames), passo)]
+    if alterar:
+        alterar(resultados)
+    return juntar_trechos(resultados, lambda ini, fim: _executar(frames, modelo, ini, fim, True))
+
+
+@pytest.mark.parametrize('passo', [37, 90, 151, 400])
+def test_trechos_iguais_a_execucao_sequencial(passo):
+    frames, modelo = _gravacao()
+    sequencial, _ = _em_trechos(frames, modelo, len(frames))
+    assert len(sequencial) >= 10
+
+    traducoes, _ = _em_trechos(frames, modelo, passo)
+    assert sorted(traducoes, key=lambda t: t['frame']) == sequencial
+
+
+def test_trecho_sem_a_sincronia_do_anterior_e_refeito():
+    frames, modelo = _gravacao(seed=1)
+    sequencial, _ = _em_trechos(frames, modelo, len(frames))
+
+    def perder_sincronias(resultados):
+        # Como se o rastreador do 2º trecho tivesse visto a mão numa pausa
+        resultados[1]['sincronias'] = []
+    traducoes, refeitos = _em_trechos(frames, modelo, 120, perder_sincronias)
+    assert len(refeitos) == 1
+    assert sorted(traducoes, key=lambda t: t['frame']) == sequencial
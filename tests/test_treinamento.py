@@ -0,0 +1,58 @@
+"""
+Treino incremental: as árvores da floresta implantada sobrevivem ao bloco
+novo, e um gesto novo pode vencer mesmo com um bloco pequeno
+"""
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+import config
+from forest_engine import CompiledForest, FlorestaCombinada
+from treinamento import arvores_do_bloco
+
+
+CENTROS = {'nao': 0.0, 'ola': 3.0, 'sim': 6.0, 'obrigado': 9.0}
+
+
+def _dados(gestos, por_gesto=40, seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.concatenate([rng.normal(CENTROS[g], 1.0, (por_gesto, 8)) for g in gestos])
+    y = np.repeat(gestos, por_gesto)
+    return X, y
+
+
+def _floresta(X, y, n, seed):
+    return RandomForestClassifier(n_estimators=n, random_state=seed).fit(X, y)
+
+
+def test_arvores_da_base_sobrevivem_com_gesto_novo():
+    X, y = _dados(['nao', 'ola', 'sim'])
+    base = _floresta(X, y, config.TRAIN_N_ESTIMATORS, 0)
+
+    X_novo, y_novo = _dados(['nao', 'obrigado', 'ola', 'sim'], por_gesto=10, seed=1)
+    n_novas = arvores_do_bloco(len(base.estimators_), len(y_novo), len(y))
+    bloco = _floresta(X_novo, y_novo, n_novas, 1)
+    combinado = FlorestaCombinada.combinar(base, bloco, config.TRAIN_MAX_TREES)
+
+    assert combinado.n_estimators <= config.TRAIN_MAX_TREES
+    originais = {id(arvore) for arvore in base.estimators_}
+    mantidas = [a for a in combinado.estimators_ if id(a) in originais]
+    assert len(mantidas) >= config.TRAIN_MAX_TREES - config.TRAIN_MAX_TREES // 2
+    # As mais recentes da base ficam, na ordem original
+    assert mantidas == base.estimators_[-len(mantidas):]
+    assert len(base.estimators_) == config.TRAIN_N_ESTIMATORS  # a base não é alterada
+
+    assert list(combinado.classes_) == ['nao', 'obrigado', 'ola', 'sim']
+    assert (combinado.predict(X_novo[y_novo == 'obrigado']) == 'obrigado').mean() > 0.9
+    assert (combinado.predict(X) == y).mean() > 0.9
+
+
+def test_floresta_compilada_igual_a_combinada():
+    X, y = _dados(['nao', 'ola'])
+    X_novo, y_novo = _dados(['nao', 'obrigado', 'ola'], por_gesto=10, seed=1)
+    combinado = FlorestaCombinada.combinar(_floresta(X, y, 30, 0), _floresta(X_novo, y_novo, 10, 1), 35)
+    compilado = CompiledForest.from_sklearn(combinado)
+
+    entradas = np.concatenate([X, X_novo])
+    np.testing.assert_allclose(compilado.predict_proba(entradas), combinado.predict_proba(entradas))
+    assert (compilado.predict(entradas) == combinado.predict(entradas)).all()
@@ -0,0 +1,352 @@
+"""
+Tradução offline de vídeos gravados (aulas, atendimentos)
+Cada vídeo é dividido em trechos, distribuídos entre processos; cada
+processo tem uma instância do MediaPipe Hands e uma cópia do modelo. Os
+frames são decodificados em blocos de --bloco frames, passam pelo
+rastreador (com o filtro e o ROI de config.py, como no servidor) e pelo
+mesmo clip/confirmação de process_frame_logic; as predições de um bloco
+são feitas numa única chamada ao modelo.
+
+Depois de PAUSA_SINCRONIA frames seguidos sem mão (e, se a pausa
+continuar, a cada PAUSA_SINCRONIA frames), clip, confirmação e rastreador
+(MediaPipe, filtro, ROI) recomeçam do zero, como no início do vídeo. Esses pontos de sincronia costuram os trechos: cada trecho só
+traduz a partir da sua primeira sincronia e vai além do fim até a
+primeira sincronia depois dele. Um trecho só é usado se recomeçou
+exatamente onde o anterior terminou; senão, ele é refeito a partir dali.
+Assim a saída é a mesma da execução sequencial (--trecho-s 0); num vídeo
+sem pausas, o primeiro trecho acaba percorrendo o vídeo inteiro.
+
+As traduções (gesto confirmado e posição no vídeo) vão para o
+TranslationExporter (export.py), um arquivo por vídeo em cada formato.
+
+Uso:
+    python traduzir_videos.py video.mp4 pasta_de_videos/ [--processos 4]
+        [--formatos csv,json,txt] [--saida exports] [--trecho-s 60] [--bloco 64]
+"""
+
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import config
+from features import extrair_features
+from pipeline import confirmar_gesto, reiniciar_confirmacao
+from session_store import ClientState
+
+EXTENSOES = ('.mp4', '.avi', '.mov', '.mkv', '.webm', '.m4v')
+
+PAUSA_SINCRONIA = config.CLIP_SIZE  # Frames seguidos sem mão que recomeçam todo o estado
+
+# Estado de cada processo (definido em _inicializar)
+_hands = None
+_modelo = None
+_spec = None
+
+
+def listar_videos(entradas):
+    videos = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            for raiz, _, arquivos in os.walk(entrada):
+                videos.extend(os.path.join(raiz, a) for a in sorted(arquivos)
+                              if a.lower().endswith(EXTENSOES))
+        elif os.path.isfile(entrada):
+            videos.append(entrada)
+        else:
+            print(f"[AVISO] {entrada} não encontrado")
+    return videos
+
+
+def propriedades(video):
+    """(frames, fps) do vídeo"""
+    import cv2
+
+    cap = cv2.VideoCapture(video)
+    frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+    return frames, fps
+
+
+def _inicializar():
+    global _hands, _modelo, _spec
+    import cv2
+
+    from features import spec_do_modelo
+    from forest_engine import carregar_modelo
+    from pipeline import criar_hands
+
+    cv2.setNumThreads(1)  # um núcleo por processo
+    _hands = criar_hands()
+    _modelo = carregar_modelo(config.MODEL_PATH, config.MODEL_ARTIFACT_PATH)
+    _spec = spec_do_modelo(_modelo)
+
+
+def _ler_bloco(cap, n):
+    frames = []
+    for _ in range(n):
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    return frames
+
+
+def _reduzir(rgb):
+    """Mesmo limite de resolução dos frames recebidos pelo servidor"""
+    import cv2
+
+    altura, largura = rgb.shape[:2]
+    escala = min(config.FRAME_INPUT_WIDTH / largura, config.FRAME_INPUT_HEIGHT / altura)
+    if escala >= 1:
+        return rgb
+    return cv2.resize(rgb, (round(largura * escala), round(altura * escala)),
+                      interpolation=cv2.INTER_AREA)
+
+
+class Trecho:
+    """
+    Clip e confirmação de um trecho [inicio, fim), frame a frame (coords
+    ou None = sem mão). Só traduz depois da primeira sincronia (ou desde
+    inicio, se `sincronizado`) e termina na primeira sincronia em >= fim.
+    """
+
+    def __init__(self, nome, inicio, fim, sincronizado, spec, fps):
+        self.inicio, self.fim = inicio, fim
+        self.spec, self.fps = spec, fps
+        self.state = ClientState(nome)
+        self.sincronias = [inicio] if sincronizado else []
+        self.sem_mao = 0
+        # (frame, entrada do modelo) ou (frame, None) = reinício da confirmação
+        self.eventos = []
+        self.traducoes = []
+        self.fim_real = None  # Sincronia em que o trecho terminou, ou o fim do vídeo
+
+    @property
+    def encerrado(self):
+        return self.fim_real is not None
+
+    def passo(self, indice, coords):
+        """Frame `indice`; True num ponto de sincronia (o rastreador deve recomeçar)"""
+        clip = self.state.frames_clip
+        if coords is not None:
+            self.sem_mao = 0
+            self.state.last_hand_detected = True
+            clip.append(coords)
+            if clip.pronto(config.FRAME_SKIP):
+                clip.marcar_predicao()
+                # Cópia: com features brutas é uma view do clip, que muda até o bloco ser previsto
+                self.eventos.append((indice, extrair_features(clip.window(), self.spec)[0].copy()))
+            return False
+
+        if self.state.last_hand_detected:
+            # Como no servidor: a mão saiu, o mesmo gesto depois é uma tradução nova
+            self.eventos.append((indice, None))
+        self.state.last_hand_detected = False
+        self.sem_mao += 1
+        # Na pausa longa, uma sincronia a cada PAUSA_SINCRONIA frames, em
+        # posições fixas do vídeo: um trecho que começa no meio da pausa
+        # encontra as mesmas sincronias que a execução sequencial
+        sincronia = indice + 1
+        if not (self.sem_mao == PAUSA_SINCRONIA or
+                (self.sem_mao > PAUSA_SINCRONIA and sincronia % PAUSA_SINCRONIA == 0)):
+            return False
+        clip.clear()
+        self.eventos.append((indice, None))
+        self.sincronias.append(sincronia)
+        if sincronia >= self.fim:
+            self.fim_real = sincronia
+        return True
+
+    def confirmar(self, modelo):
+        """Predições pendentes numa única chamada ao modelo, aplicadas em ordem"""
+        entradas = [entrada for _, entrada in self.eventos if entrada is not None]
+        preditos = iter(modelo.predict(np.stack(entradas)) if entradas else ())
+        for quadro, entrada in self.eventos:
+            if entrada is None:
+                reiniciar_confirmacao(self.state)
+                continue
+            gesto, confianca = confirmar_gesto(self.state, next(preditos))
+            # Só a confirmação (não cada predição seguinte igual) é uma tradução
+            if (gesto is not None and self.state.confirmacoes == config.NUM_CONFIRMATIONS
+                    and self.sincronias and quadro >= self.sincronias[0]):
+                self.traducoes.append({'frame': quadro, 'tempo_s': quadro / self.fps,
+                                       'gesto': str(gesto), 'confianca': confianca})
+        self.eventos = []
+
+
+def _traduzir_trecho(video, inicio, fim, fps, sincronizado, bloco):
+    """Gestos confirmados a partir da primeira sincronia em [inicio, ...)"""
+    import cv2
+
+    from hands_pool import TrackerSessao
+    from motion_gate import MotionGate
+
+    def novo_rastreador():
+        _hands.reset()  # sem rastreamento herdado de antes da sincronia
+        return TrackerSessao(_hands, MotionGate.da_config() if config.GATE_ENABLED else None,
+                             config.ROI_ENABLED)
+
+    inicio_cpu = time.process_time()
+    tracker = novo_rastreador()
+    trecho = Trecho(video, inicio, fim, sincronizado, _spec, fps)
+
+    cap = cv2.VideoCapture(video)
+    # Sem sincronia no início, a leitura começa uma pausa antes, para que
+    # uma pausa que atravessa o início do trecho também seja reconhecida
+    leitura = inicio if sincronizado else max(0, inicio - PAUSA_SINCRONIA)
+    indice = leitura
+    if indice:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, indice)
+
+    while not trecho.encerrado:
+        frames = _ler_bloco(cap, bloco)
+        if not frames:
+            trecho.fim_real = indice  # fim do vídeo
+            break
+        # MediaPipe e clip frame a frame; as predições do bloco, de uma vez
+        for frame in frames:
+            coords = tracker.process(_reduzir(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+            sincronia = trecho.passo(indice, coords)
+            indice += 1
+            if trecho.encerrado:
+                break
+            if sincronia:
+                tracker = novo_rastreador()
+        trecho.confirmar(_modelo)
+    cap.release()
+
+    return {
+        'video': video,
+        'inicio': inicio,
+        'fim': fim,
+        'sincronias': trecho.sincronias,
+        'fim_real': trecho.fim_real,
+        'frames': indice - leitura,
+        'cpu_s': time.process_time() - inicio_cpu,
+        'traducoes': trecho.traducoes,
+    }
+
+
+def juntar_trechos(resultados, refazer):
+    """
+    Traduções de um vídeo a partir dos resultados dos seus trechos. `pos` é
+    sempre uma sincronia da execução sequencial: um trecho só é usado se
+    também recomeçou em pos; senão, refazer(pos, fim) o executa de novo a
+    partir de pos. Retorna (traduções, trechos refeitos).
+    """
+    resultados = sorted(resultados, key=lambda r: r['inicio'])
+    traducoes, refeitos, pos = [], [], 0
+    for i, r in enumerate(resultados):
+        if r['fim_real'] <= pos:
+            continue  # coberto pelo trecho anterior, que passou do seu fim
+        if pos not in r['sincronias']:
+            if pos >= r['fim'] and i < len(resultados) - 1:
+                continue  # o próximo trecho começa antes de pos
+            r = refazer(pos, max(r['fim'], pos + 1))
+            refeitos.append(r)
+        traducoes.extend(t for t in r['traducoes'] if t['frame'] >= pos)
+        pos = r['fim_real']
+    return traducoes, refeitos
+
+
+def formatar_tempo(segundos):
+    horas, resto = divmod(segundos, 3600)
+    minutos, segundos = divmod(resto, 60)
+    return f"{int(horas):02d}:{int(minutos):02d}:{segundos:06.3f}"
+
+
+def exportar(video, traducoes, formatos, saida):
+    from export import TranslationExporter
+
+    exporter = TranslationExporter(saida)
+    # data/hora: data do arquivo de vídeo + posição no vídeo
+    base = datetime.fromtimestamp(os.path.getmtime(video))
+    for t in sorted(traducoes, key=lambda t: t['frame']):
+        exporter.add_translation(t['gesto'], t['confianca'], base + timedelta(seconds=t['tempo_s']),
+                                 video=os.path.basename(video), tempo=formatar_tempo(t['tempo_s']),
+                                 frame=t['frame'])
+    nome = os.path.splitext(os.path.basename(video))[0]
+    exportadores = {'csv': exporter.export_csv, 'json': exporter.export_json,
+                    'txt': exporter.export_txt}
+    return [exportadores[f](f"{nome}_traducoes.{f}") for f in formatos]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tradução offline de vídeos em Libras")
+    parser.add_argument('entradas', nargs='+', help="arquivos de vídeo ou pastas")
+    parser.add_argument('--processos', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--formatos', default='csv,json', help="csv, json e/ou txt")
+    parser.add_argument('--saida', default='exports')
+    parser.add_argument('--trecho-s', type=float, default=60,
+                        help="segundos de vídeo por tarefa (0 = vídeo inteiro)")
+    parser.add_argument('--bloco', type=int, default=64, help="frames decodificados por bloco")
+    args = parser.parse_args()
+
+    formatos = [f for f in args.formatos.split(',') if f]
+    videos = listar_videos(args.entradas)
+    if not videos:
+        print("[ERRO] Nenhum vídeo encontrado")
+        raise SystemExit(1)
+
+    tarefas = []
+    for video in videos:
+        frames, fps = propriedades(video)
+        if frames <= 0:
+            print(f"[AVISO] {video}: não foi possível ler o número de frames")
+            continue
+        passo = max(int(args.trecho_s * fps), 1) if args.trecho_s > 0 else frames
+        tarefas.extend((video, inicio, min(inicio + passo, frames), fps)
+                       for inicio in range(0, frames, passo))
+    print(f"[INFO] {len(videos)} vídeos, {len(tarefas)} trechos, {args.processos} processos")
+
+    por_video = {video: [] for video in videos}
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.processos, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_inicializar) as executor:
+        futuros = [executor.submit(_traduzir_trecho, video, ini, fim, fps, ini == 0, args.bloco)
+                   for video, ini, fim, fps in tarefas]
+        for futuro in as_completed(futuros):
+            resultado = futuro.result()
+            por_video[resultado['video']].append(resultado)
+
+        juntados = {}
+        for video, resultados in por_video.items():
+            if resultados:
+                fps = next(f for v, _, _, f in tarefas if v == video)
+                juntados[video] = juntar_trechos(resultados, lambda ini, fim: executor.submit(
+                    _traduzir_trecho, video, ini, fim, fps, True, args.bloco).result())
+    duracao = time.perf_counter() - inicio
+
+    total_frames = 0
+    total_extras = 0
+    total_refeitos = 0
+    total_cpu = 0.0
+    print("\n" + "=" * 80)
+    print(f"{'vídeo':<40} {'frames':>8} {'traduções':>10} {'frames/s (CPU)':>16}")
+    print("=" * 80)
+    for video, (traducoes, refeitos) in juntados.items():
+        resultados = por_video[video] + refeitos
+        # Frames do vídeo; o que os trechos processaram além disso (leitura
+        # antes do início, passagem do fim, trechos refeitos) é contado à parte
+        frames = max(r['fim_real'] for r in resultados)
+        cpu = sum(r['cpu_s'] for r in resultados)
+        total_frames += frames
+        total_extras += sum(r['frames'] for r in resultados) - frames
+        total_refeitos += len(refeitos)
+        total_cpu += cpu
+        exportar(video, traducoes, formatos, args.saida)
+        print(f"{os.path.basename(video)[:40]:<40} {frames:>8} {len(traducoes):>10} "
+              f"{frames / cpu if cpu else 0:>16.1f}")
+    print("=" * 80)
+    print(f"Total: {total_frames} frames em {duracao:.1f}s = {total_frames / duracao:.1f} frames/s "
+          f"({total_frames / duracao / args.processos:.1f} por processo, "
+          f"{total_frames / total_cpu if total_cpu else 0:.1f} por segundo de CPU)")
+    if total_extras > 0:
+        print(f"      + {total_extras} frames processados na sincronia entre trechos (não contados acima)"
+              + (f"; {total_refeitos} trechos refeitos" if total_refeitos else ""))
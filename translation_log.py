@@ -0,0 +1,209 @@
+"""
+Registro das traduções confirmadas de cada sessão do Libras Bridge (SQLite)
+
+O caminho do frame só enfileira a tradução em memória (registrar); uma
+tarefa de background grava a fila em lotes de até TRANSLATION_LOG_BATCH
+linhas por transação, a cada TRANSLATION_LOG_FLUSH_MS. Com eventlet, a
+escrita no SQLite roda numa thread nativa (tpool), sem travar o loop de
+eventos. Com a fila cheia (disco lento ou travado), a tradução é
+descartada com um aviso, em vez de acumular memória.
+
+A leitura (iterar) usa outra conexão e busca as linhas em blocos, para o
+export de uma sessão ser enviado aos poucos; como a escrita, cada acesso
+ao SQLite vai para o tpool com eventlet. As traduções ainda na fila
+(no máximo TRANSLATION_LOG_FLUSH_MS) só aparecem depois da gravação.
+
+Uso:
+    python translation_log.py [sessao]   # sessões registradas ou traduções de uma
+"""
+
+import os
+import sqlite3
+import sys
+import time
+from collections import deque
+from datetime import datetime
+
+import config
+from export import montar_item
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS traducoes (
+    id INTEGER PRIMARY KEY,
+    sessao TEXT NOT NULL,
+    gesto TEXT NOT NULL,
+    confianca NUMERIC NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_traducoes_sessao ON traducoes (sessao, id);
+"""
+
+
+def _conectar(caminho):
+    conexao = sqlite3.connect(caminho, timeout=5, check_same_thread=False)
+    # WAL: leitores (export) não bloqueiam a gravação, e vice-versa
+    conexao.execute("PRAGMA journal_mode=WAL")
+    conexao.execute("PRAGMA synchronous=NORMAL")
+    return conexao
+
+
+class TranslationLog:
+    def __init__(self, caminho=None, lote_max=None, intervalo_ms=None, tamanho_fila=None,
+                 sleep_fn=time.sleep, async_mode='threading'):
+        """
+        sleep_fn: função de espera (use socketio.sleep com eventlet)
+        async_mode: modo do Flask-SocketIO; com eventlet a escrita vai para o tpool
+        """
+        self.caminho = caminho or config.TRANSLATION_LOG_PATH
+        self.lote_max = lote_max or config.TRANSLATION_LOG_BATCH
+        self.intervalo = (config.TRANSLATION_LOG_FLUSH_MS if intervalo_ms is None else intervalo_ms) / 1000.0
+        self.tamanho_fila = tamanho_fila or config.TRANSLATION_LOG_QUEUE_SIZE
+        self.sleep_fn = sleep_fn
+        self.async_mode = async_mode
+
+        pasta = os.path.dirname(self.caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        self._conexao = _conectar(self.caminho)
+        self._conexao.executescript(ESQUEMA)
+
+        self.pendentes = deque()
+        self.running = False
+
+        # Estatísticas
+        self.gravadas = 0
+        self.descartadas = 0
+        self.falhas = 0
+        self.total_lotes = 0
+        self.tempos_gravacao = deque(maxlen=1000)
+
+    def registrar(self, sessao, gesto, confianca, timestamp=None):
+        """Enfileira uma tradução (não toca o disco); False se a fila estiver cheia"""
+        if len(self.pendentes) >= self.tamanho_fila:
+            self.descartadas += 1
+            return False
+        timestamp = timestamp or datetime.now()
+        self.pendentes.append((str(sessao), str(gesto), confianca, timestamp.isoformat()))
+        return True
+
+    def pending(self):
+        return len(self.pendentes)
+
+    def run(self):
+        """Loop de gravação; deve rodar como tarefa de background"""
+        self.running = True
+        print(f"[INFO] Registro de traduções em {self.caminho} "
+              f"(lotes de até {self.lote_max}, a cada {self.intervalo * 1000:.0f}ms)")
+        while self.running:
+            if len(self.pendentes) < self.lote_max:
+                self.sleep_fn(self.intervalo)
+            if self.pendentes:
+                self.flush()
+
+    def stop(self):
+        self.running = False
+
+    def flush(self):
+        """Grava as traduções pendentes (até lote_max) numa única transação"""
+        lote = []
+        while self.pendentes and len(lote) < self.lote_max:
+            lote.append(self.pendentes.popleft())
+        if not lote:
+            return 0
+
+        inicio = time.perf_counter()
+        try:
+            self._executar(self._inserir, lote)
+        except Exception as e:
+            self.falhas += len(lote)
+            print(f"[ERRO] Gravação de {len(lote)} traduções em {self.caminho}: {e}")
+            return 0
+        self.tempos_gravacao.append(time.perf_counter() - inicio)
+        self.total_lotes += 1
+        self.gravadas += len(lote)
+        return len(lote)
+
+    def _executar(self, funcao, *args):
+        # Com eventlet, a chamada bloqueante vai para uma thread nativa,
+        # liberando o loop de eventos para os outros sockets
+        if self.async_mode == 'eventlet':
+            from eventlet import tpool
+            return tpool.execute(funcao, *args)
+        return funcao(*args)
+
+    def _inserir(self, lote):
+        with self._conexao:
+            self._conexao.executemany(
+                "INSERT INTO traducoes (sessao, gesto, confianca, timestamp) VALUES (?, ?, ?, ?)", lote)
+
+    def fechar(self):
+        """Para o loop e grava tudo o que ainda estiver na fila (no encerramento)"""
+        self.stop()
+        while self.pendentes:
+            lote = [self.pendentes.popleft() for _ in range(min(self.lote_max, len(self.pendentes)))]
+            try:
+                self._inserir(lote)
+                self.gravadas += len(lote)
+            except Exception as e:
+                self.falhas += len(lote)
+                print(f"[ERRO] Gravação de {len(lote)} traduções em {self.caminho}: {e}")
+        self._conexao.close()
+
+    def _consultar(self, sql, parametros=()):
+        conexao = _conectar(self.caminho)
+        try:
+            return conexao.execute(sql, parametros).fetchall()
+        finally:
+            conexao.close()
+
+    def contar(self, sessao):
+        return self._executar(self._consultar, "SELECT COUNT(*) FROM traducoes WHERE sessao = ?",
+                              (sessao,))[0][0]
+
+    def sessoes(self):
+        """(sessão, traduções, última) de cada sessão registrada"""
+        return self._executar(self._consultar, "SELECT sessao, COUNT(*), MAX(timestamp) FROM traducoes "
+                                               "GROUP BY sessao ORDER BY MAX(timestamp)")
+
+    def iterar(self, sessao, bloco=500):
+        """
+        Traduções da sessão, em ordem, no formato de export.py; lidas do
+        disco em blocos de `bloco` linhas (nunca o histórico inteiro)
+        """
+        conexao = self._executar(_conectar, self.caminho)
+        try:
+            cursor = self._executar(conexao.execute, "SELECT gesto, confianca, timestamp FROM traducoes "
+                                                     "WHERE sessao = ? ORDER BY id", (sessao,))
+            while True:
+                linhas = self._executar(cursor.fetchmany, bloco)
+                if not linhas:
+                    break
+                for gesto, confianca, timestamp in linhas:
+                    yield montar_item(gesto, confianca, datetime.fromisoformat(timestamp))
+        finally:
+            conexao.close()
+
+    def get_stats(self):
+        tempos = sorted(self.tempos_gravacao)
+        return {
+            'caminho': self.caminho,
+            'pendentes': len(self.pendentes),
+            'gravadas': self.gravadas,
+            'descartadas': self.descartadas,
+            'falhas': self.falhas,
+            'total_lotes': self.total_lotes,
+            'lote_medio': self.gravadas / self.total_lotes if self.total_lotes else 0.0,
+            'gravacao_ms_p50': tempos[len(tempos) // 2] * 1000 if tempos else 0.0,
+            'gravacao_ms_max': tempos[-1] * 1000 if tempos else 0.0,
+        }
+
+
+if __name__ == "__main__":
+    log = TranslationLog()
+    if len(sys.argv) > 1:
+        for item in log.iterar(sys.argv[1]):
+            print(f"{item['data']} {item['hora']}  {item['gesto']:<12} {item['confianca']:.0f}%")
+    else:
+        for sessao, total, ultima in log.sessoes():
+            print(f"{sessao:<40} {total:>8} traduções  última: {ultima}")
+    log.fechar()
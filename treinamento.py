@@ -1,29 +1,454 @@
+"""
+Treinamento do classificador de gestos do Libras Bridge
+
+Uso:
+    python treinamento.py            # RandomForest de TRAIN_N_ESTIMATORS árvores
+        [--aumentar K]               # K blocos de árvores, cada um com uma cópia aumentada
+    python treinamento.py --busca    # busca de modelos com validação cruzada
+        [--alvo 0.95] [--folds 5] [--familias rf,et,lr] [--json relatorio_treino.json]
+    python treinamento.py --incremental  # só os clips novos ou alterados do store
+
+A busca avalia florestas de vários tamanhos e profundidades, ExtraTrees
+e regressão logística com validação cruzada k-fold (todos os folds de
+todos os candidatos em paralelo) e mede, para cada um, a latência de
+predição de um clip e o tamanho do modelo. O modelo salvo é o mais
+rápido cuja acurácia média atinge o alvo (TRAIN_ACCURACY_TARGET).
+
+O treino incremental acrescenta à floresta implantada um bloco de árvores
+treinado com os clips do store que o modelo ainda não viu (novos, ou
+regravados desde o último treino: revisão do store) e uma amostra
+dos já vistos (TRAIN_REPLAY_PER_CLASS por gesto), então o custo acompanha
+os dados novos e não o total. O resultado é uma FlorestaCombinada
+(forest_engine.py): gestos novos entram na união das classes, e as árvores
+antigas se abstêm neles. O bloco tem no máximo metade de TRAIN_MAX_TREES;
+acima do limite saem as árvores mais antigas, então a floresta anterior
+mantém sempre pelo menos a outra metade. Cada treino registra em
+MODEL_MANIFEST_PATH a versão, o modo e as posições do store que usou
+(incluindo os clips já vistos sorteados para o replay).
+"""
+
+import argparse
+import json
+import math
+import os
+import pickle
+import shutil
+import time
+from datetime import datetime
+
+import joblib
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score
-import joblib
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+import config
+from augmentation import Aumentador, lotes
+from dataset_store import DatasetStore
+from features import extrair_features, spec_da_config, spec_do_modelo
+from forest_engine import CompiledForest, FlorestaCombinada, converter, sha1_arquivo
+
+
+def candidatos(familias=('rf', 'et', 'lr')):
+    """(nome, estimador) de cada candidato da busca"""
+    lista = []
+    if 'rf' in familias:
+        for n in (25, 50, 100, 200, 500):
+            for profundidade in (None, 10, 5):
+                lista.append((f"rf n={n} prof={profundidade or '-'}",
+                              RandomForestClassifier(n_estimators=n, max_depth=profundidade,
+                                                     random_state=42)))
+    if 'et' in familias:
+        for n in (25, 50, 100, 200):
+            for profundidade in (None, 10):
+                lista.append((f"et n={n} prof={profundidade or '-'}",
+                              ExtraTreesClassifier(n_estimators=n, max_depth=profundidade,
+                                                   random_state=42)))
+    if 'lr' in familias:
+        for C in (0.1, 1.0):
+            lista.append((f"lr C={C:g}",
+                          make_pipeline(StandardScaler(),
+                                        LogisticRegression(C=C, max_iter=1000))))
+    return lista
+
+
+def _avaliar_fold(indice, estimador, X, y, treino, teste):
+    modelo = clone(estimador)
+    inicio = time.perf_counter()
+    modelo.fit(X[treino], y[treino])
+    tempo_fit = time.perf_counter() - inicio
+    return indice, accuracy_score(y[teste], modelo.predict(X[teste])), tempo_fit
+
+
+def para_inferencia(modelo):
+    """O que os caminhos de inferência usam: florestas vão compiladas"""
+    return CompiledForest.from_sklearn(modelo) if hasattr(modelo, 'estimators_') else modelo
+
+
+def tamanho_modelo(modelo):
+    """Bytes do artefato compilado (florestas) ou do modelo serializado"""
+    if isinstance(modelo, CompiledForest):
+        return sum(getattr(modelo, nome).nbytes
+                   for nome in ('feature', 'threshold', 'left', 'right', 'values', 'roots'))
+    return len(pickle.dumps(modelo))
+
+
+def latencia_ms(modelo, X, repeticoes=200):
+    """Mediana da predição de um clip por vez, como no servidor"""
+    entradas = [X[i:i + 1] for i in np.arange(repeticoes) % len(X)]
+    for entrada in entradas[:10]:
+        modelo.predict(entrada)
+    tempos = np.empty(repeticoes)
+    for i, entrada in enumerate(entradas):
+        inicio = time.perf_counter()
+        modelo.predict(entrada)
+        tempos[i] = time.perf_counter() - inicio
+    return float(np.median(tempos) * 1000)
+
+
+def buscar(X, y, lista, folds=None, n_jobs=None):
+    """
+    Acurácia (validação cruzada), tempo de treino, latência e tamanho de
+    cada candidato. Retorna (resultados, modelos treinados com todos os dados).
+    """
+    folds = folds or config.TRAIN_CV_FOLDS
+    n_jobs = config.TRAIN_N_JOBS if n_jobs is None else n_jobs
+    divisoes = list(StratifiedKFold(folds, shuffle=True, random_state=42).split(X, y))
+
+    inicio = time.perf_counter()
+    saidas = Parallel(n_jobs=n_jobs)(
+        delayed(_avaliar_fold)(i, estimador, X, y, treino, teste)
+        for i, (_, estimador) in enumerate(lista) for treino, teste in divisoes)
+    tempo_cv = time.perf_counter() - inicio
+    print(f"[INFO] Validação cruzada: {len(saidas)} treinos em {tempo_cv:.1f}s")
+
+    resultados, modelos = [], []
+    for i, (nome, estimador) in enumerate(lista):
+        acuracias = np.array([acc for j, acc, _ in saidas if j == i])
+        tempos_fit = [t for j, _, t in saidas if j == i]
+
+        # Modelo final com todos os dados; florestas treinam em paralelo
+        modelo = clone(estimador)
+        if 'n_jobs' in modelo.get_params():
+            modelo.set_params(n_jobs=n_jobs)
+        modelo.fit(X, y)
+        if 'n_jobs' in modelo.get_params():
+            modelo.set_params(n_jobs=None)  # predição de um clip: sem overhead de threads
+        inferencia = para_inferencia(modelo)
+
+        resultados.append({
+            'modelo': nome,
+            'parametros': {k: v for k, v in estimador.get_params().items()
+                           if k in ('n_estimators', 'max_depth', 'logisticregression__C')},
+            'acuracia_media': float(acuracias.mean()),
+            'acuracia_desvio': float(acuracias.std()),
+            'treino_s': float(np.mean(tempos_fit)),
+            'latencia_ms': latencia_ms(inferencia, X),
+            'tamanho_kb': tamanho_modelo(inferencia) / 1024,
+        })
+        modelos.append(modelo)
+    return resultados, modelos
+
+
+def escolher(resultados, alvo):
+    """Índice do candidato mais rápido (depois o menor) que atinge o alvo"""
+    aptos = [i for i, r in enumerate(resultados) if r['acuracia_media'] >= alvo]
+    if not aptos:
+        return max(range(len(resultados)), key=lambda i: resultados[i]['acuracia_media'])
+    return min(aptos, key=lambda i: (resultados[i]['latencia_ms'], resultados[i]['tamanho_kb']))
+
+
+def salvar_modelo(modelo, spec):
+    """Grava o .pkl e, para florestas, o artefato compilado"""
+    # O spec vai junto para a inferência usar as mesmas features
+    modelo.feature_spec_ = spec.to_dict()
+    joblib.dump(modelo, config.MODEL_PATH)
+    print(f"[INFO] Modelo salvo como {config.MODEL_PATH}")
+
+    if hasattr(modelo, 'estimators_'):
+        # Versão compilada para inferência rápida (app.py / realtime.py)
+        converter(config.MODEL_PATH, config.MODEL_ARTIFACT_PATH)
+    elif os.path.exists(config.MODEL_ARTIFACT_PATH):
+        # Artefato de uma floresta anterior: a inferência passa a usar o .pkl
+        shutil.rmtree(config.MODEL_ARTIFACT_PATH)
+        print(f"[INFO] {config.MODEL_ARTIFACT_PATH}/ removido (o modelo não é uma floresta)")
+
+
+def ler_manifesto():
+    if not os.path.exists(config.MODEL_MANIFEST_PATH):
+        return {'versoes': []}
+    with open(config.MODEL_MANIFEST_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def registrar_versao(store, modelo, modo, inicio, **extra):
+    """
+    Acrescenta ao manifesto o modelo recém-salvo e os clips [inicio, n) que
+    viu (o treino incremental também passa replay: posições já vistas usadas)
+    """
+    manifesto = ler_manifesto()
+    fim = len(store)
+    versao = {
+        'versao': len(manifesto['versoes']) + 1,
+        'modo': modo,
+        'criado_em': datetime.now().isoformat(timespec='seconds'),
+        'clips': [inicio, fim],
+        'gestos': [str(c) for c in modelo.classes_],
+        'arvores': len(modelo.estimators_) if hasattr(modelo, 'estimators_') else None,
+        'pkl_sha1': sha1_arquivo(config.MODEL_PATH),
+    }
+    versao.update(extra)
+    manifesto['versoes'].append(versao)
+    manifesto.update({
+        'store': store.pasta,
+        'clips_vistos': fim,
+        'revisao_store': store.revisao,
+        # Para reconhecer o mesmo store (posições) na próxima atualização
+        'ultimo_clip': store.registro(fim - 1) if fim else None,
+    })
+    with open(config.MODEL_MANIFEST_PATH, 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2)
+    print(f"[INFO] Versão {versao['versao']} ({modo}) registrada em {config.MODEL_MANIFEST_PATH}")
+
+
+def _mesmo_clip(registro, anterior):
+    """Mesmo clip na posição (a assinatura e a revisão mudam se ele for regravado)"""
+    campos = ('gesto', 'origem', 'adicionado_em')
+    return anterior is not None and all(registro.get(c) == anterior.get(c) for c in campos)
+
+
+def _base_incremental(manifesto, store):
+    """Motivo pelo qual o modelo implantado não serve de base (None = serve)"""
+    if not manifesto['versoes']:
+        return f"sem {config.MODEL_MANIFEST_PATH}"
+    if manifesto['versoes'][-1]['pkl_sha1'] != sha1_arquivo(config.MODEL_PATH):
+        return f"{config.MODEL_PATH} não é a última versão do manifesto"
+    vistos = manifesto['clips_vistos']
+    if vistos > len(store) or (vistos and not _mesmo_clip(store.registro(vistos - 1), manifesto['ultimo_clip'])):
+        return f"{store.pasta} foi reconstruído desde o último treino"
+    return None
+
+
+def arvores_do_bloco(n_atual, novos, vistos, max_arvores=None):
+    """
+    Árvores do bloco incremental: proporcional aos clips novos, com mínimo
+    TRAIN_INCREMENTAL_MIN_TREES e no máximo metade de max_arvores (o resto
+    fica para as árvores anteriores)
+    """
+    max_arvores = max_arvores or config.TRAIN_MAX_TREES
+    n_novas = max(config.TRAIN_INCREMENTAL_MIN_TREES, math.ceil(n_atual * novos / max(vistos, 1)))
+    return max(1, min(n_novas, max_arvores // 2))
+
+
+def amostra_replay(y, por_gesto, rng):
+    """Até `por_gesto` posições de cada gesto em y"""
+    return np.sort(np.concatenate(
+        [rng.permutation(np.flatnonzero(y == g))[:por_gesto] for g in np.unique(y)]
+        or [np.empty(0, dtype=np.intp)]))
+
+
+def treinar_incremental(store, spec_config):
+    manifesto = ler_manifesto()
+    problema = _base_incremental(manifesto, store)
+    if problema:
+        print(f"[ERRO] Treino incremental indisponível: {problema}. Rode: python treinamento.py")
+        raise SystemExit(1)
+
+    modelo = joblib.load(config.MODEL_PATH)
+    if not hasattr(modelo, 'estimators_'):
+        print("[ERRO] O treino incremental exige uma floresta (RandomForest/ExtraTrees)")
+        raise SystemExit(1)
+
+    vistos, total = manifesto['clips_vistos'], len(store)
+    # Clips já vistos cujo arquivo foi regravado depois do último treino
+    alterados = store.revisados_desde(manifesto.get('revisao_store', 0))
+    alterados = alterados[alterados < vistos]
+    if vistos == total and not len(alterados):
+        print(f"[INFO] Nenhum clip novo ou alterado desde a versão {manifesto['versoes'][-1]['versao']}")
+        return
+
+    # As features têm de ser as do modelo implantado, não as da config
+    spec = spec_do_modelo(modelo)
+    if spec != spec_config:
+        print(f"[AVISO] Usando as features do modelo implantado ({spec}), não as de config.py")
+
+    y_todos = store.y
+    rng = np.random.default_rng(len(manifesto['versoes']))
+    anteriores = np.setdiff1d(np.arange(vistos), alterados)
+    replay = anteriores[amostra_replay(y_todos[anteriores], config.TRAIN_REPLAY_PER_CLASS, rng)]
+    novos = np.concatenate([alterados, np.arange(vistos, total)])
+    indices = np.concatenate([replay, novos])
+    gestos_novos = sorted(str(g) for g in set(y_todos[novos]) - set(modelo.classes_))
+
+    # Só as posições usadas saem do memory-map
+    X = extrair_features(store.X[indices], spec)
+    y = y_todos[indices]
+
+    # As árvores anteriores se abstêm nos gestos novos (FlorestaCombinada):
+    # o bloco não precisa ter o tamanho da floresta para que eles vençam
+    n_atual = len(modelo.estimators_)
+    n_novas = arvores_do_bloco(n_atual, len(novos), vistos)
+    descartadas = max(0, n_atual + n_novas - config.TRAIN_MAX_TREES)
+    print(f"[INFO] {len(novos)} clips novos ({len(alterados)} regravados) + {len(replay)} já vistos; "
+          f"gestos novos: {gestos_novos or '-'}; {n_novas} árvores novas"
+          + (f", {descartadas} mais antigas descartadas (TRAIN_MAX_TREES = {config.TRAIN_MAX_TREES})"
+             if descartadas else ""))
+
+    referencia = modelo.florestas[-1] if isinstance(modelo, FlorestaCombinada) else modelo
+    bloco = clone(referencia).set_params(n_estimators=n_novas, warm_start=False,
+                                     random_state=len(manifesto['versoes']) + 42,
+                                     n_jobs=config.TRAIN_N_JOBS)
+    inicio = time.perf_counter()
+    bloco.fit(X, y)
+    print(f"[INFO] Treino: {time.perf_counter() - inicio:.1f}s")
+
+    combinado = FlorestaCombinada.combinar(modelo, bloco, config.TRAIN_MAX_TREES)
+    combinado.set_params(n_jobs=None)
+
+    # Conferência nos clips já vistos que ficaram fora da amostra
+    fora = np.setdiff1d(anteriores, replay)
+    if len(fora):
+        fora = rng.permutation(fora)[:500]
+        acc = accuracy_score(y_todos[fora], combinado.predict(extrair_features(store.X[fora], spec)))
+        print(f"[INFO] Acurácia em {len(fora)} clips antigos fora da amostra: {acc:.1%}")
+
+    salvar_modelo(combinado, spec)
+    registrar_versao(store, combinado, 'incremental', vistos, replay=[int(i) for i in replay],
+                     regravados=[int(i) for i in alterados],
+                     arvores_adicionadas=n_novas, arvores_descartadas=descartadas,
+                     gestos_novos=gestos_novos)
+
+
+def aumentar(clips, y, spec, aumentador):
+    """Features de uma versão aumentada de cada clip, geradas em lotes"""
+    partes, rotulos = [], []
+    for lote, lote_y in lotes(clips, y, copias=1, aumentador=aumentador):
+        partes.append(extrair_features(lote, spec))
+        rotulos.append(lote_y)
+    return np.concatenate(partes), np.concatenate(rotulos)
+
+
+def treinar_com_aumento(modelo, X, y, clips, spec, copias, seed=0):
+    """
+    Floresta treinada em `copias` blocos (warm_start): cada bloco de árvores
+    vê os clips reais e uma cópia aumentada nova deles. Só uma cópia das
+    features aumentadas fica em memória por vez, não as `copias`.
+    """
+    aumentador = Aumentador(seed=seed)
+    n_total = modelo.n_estimators
+    modelo.set_params(warm_start=True)
+    for bloco in range(copias):
+        X_aum, y_aum = aumentar(clips, y, spec, aumentador)
+        modelo.set_params(n_estimators=n_total * (bloco + 1) // copias)
+        modelo.fit(np.concatenate([X, X_aum]), np.concatenate([y, y_aum]))
+        del X_aum, y_aum
+    modelo.set_params(warm_start=False)
+    print(f"[INFO] Aumento: {aumentador.clips_gerados} clips em {copias} blocos "
+          f"({aumentador.vazao:.0f} clips/s)")
+    return modelo
+
+
+def treinar_padrao(X, y, spec, clips=None, copias=0):
+    # Dividir em treino/teste
+    treino, teste = train_test_split(np.arange(len(y)), test_size=0.2, random_state=42)
+    X_train, X_test, y_train, y_test = X[treino], X[teste], y[treino], y[teste]
+
+    modelo = RandomForestClassifier(n_estimators=config.TRAIN_N_ESTIMATORS, random_state=42,
+                                    n_jobs=config.TRAIN_N_JOBS)
+    inicio = time.perf_counter()
+    # Só o treino recebe cópias aumentadas; o teste fica com os clips reais
+    if copias:
+        treino = np.sort(treino)
+        treinar_com_aumento(modelo, X[treino], y[treino], clips[treino], spec,
+                            min(copias, modelo.n_estimators))
+    else:
+        modelo.fit(X_train, y_train)
+    print(f"[INFO] Treino: {time.perf_counter() - inicio:.1f}s")
+
+    # Avaliação
+    y_pred = modelo.predict(X_test)
+    acc = accuracy_score(y_test, y_pred)
+    print("Acurácia do modelo:", acc)
+
+    modelo.set_params(n_jobs=None)
+    salvar_modelo(modelo, spec)
+    return modelo
+
+
+def treinar_com_busca(X, y, spec, args):
+    resultados, modelos = buscar(X, y, candidatos(args.familias.split(',')), args.folds)
+    escolhido = escolher(resultados, args.alvo)
+
+    print("\n" + "=" * 92)
+    print(f"{'modelo':<22} {'acurácia (CV)':>15} {'treino (s)':>11} {'latência (ms)':>14} "
+          f"{'tamanho (KB)':>13}  alvo")
+    print("=" * 92)
+    for i, r in enumerate(resultados):
+        marca = '*' if i == escolhido else ' '
+        print(f"{marca}{r['modelo']:<21} {r['acuracia_media'] * 100:>8.1f}±{r['acuracia_desvio'] * 100:<4.1f}% "
+              f"{r['treino_s']:>11.2f} {r['latencia_ms']:>14.3f} {r['tamanho_kb']:>13.1f}  "
+              f"{'ok' if r['acuracia_media'] >= args.alvo else '-'}")
+    print("=" * 92)
+
+    r = resultados[escolhido]
+    if r['acuracia_media'] < args.alvo:
+        print(f"[AVISO] Nenhum candidato atinge {args.alvo:.1%}; usando o mais preciso")
+    print(f"[INFO] Escolhido: {r['modelo']} ({r['acuracia_media']:.1%}, {r['latencia_ms']:.3f} ms, "
+          f"{r['tamanho_kb']:.1f} KB)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'clips': len(X),
+                'feature_spec': spec.to_dict(),
+                'folds': args.folds,
+                'alvo': args.alvo,
+                'escolhido': r['modelo'],
+                'candidatos': resultados,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"[INFO] Relatório salvo em {args.json}")
 
-# Carregar dados
-X = np.load("X.npy")   # (n, 30, 63)
-y = np.load("y.npy")
+    salvar_modelo(modelos[escolhido], spec)
+    return modelos[escolhido]
 
-# Achatar sequência (30x63 = 1890 features)
-n_amostras, n_frames, n_features = X.shape
-X = X.reshape((n_amostras, n_frames * n_features))
 
-# Dividir em treino/teste
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Treinamento do classificador de gestos")
+    parser.add_argument('--incremental', action='store_true',
+                        help="acrescentar ao modelo implantado árvores treinadas só com os clips novos")
+    parser.add_argument('--aumentar', type=int, default=config.AUG_COPIES,
+                        help="cópias aumentadas de cada clip de treino (augmentation.py)")
+    parser.add_argument('--busca', action='store_true',
+                        help="escolher o modelo por validação cruzada, latência e tamanho")
+    parser.add_argument('--alvo', type=float, default=config.TRAIN_ACCURACY_TARGET,
+                        help="acurácia média mínima do modelo escolhido")
+    parser.add_argument('--folds', type=int, default=config.TRAIN_CV_FOLDS)
+    parser.add_argument('--familias', default='rf,et,lr',
+                        help="rf (RandomForest), et (ExtraTrees), lr (regressão logística)")
+    parser.add_argument('--json', help="grava o relatório da busca neste arquivo")
+    args = parser.parse_args()
 
-# Modelo mais robusto
-modelo = RandomForestClassifier(n_estimators=500, random_state=42)
-modelo.fit(X_train, y_train)
+    # Carregar dados (store empacotado, com os clips novos de dataset/)
+    store = DatasetStore()
+    novos = store.ingerir_pasta()
+    print(f"[INFO] {len(store)} clips ({novos} novos ou alterados no store), gestos: {store.contagem()}")
 
-# Avaliação
-y_pred = modelo.predict(X_test)
-acc = accuracy_score(y_test, y_pred)
-print("Acurácia do modelo:", acc)
+    spec = spec_da_config()
+    if args.incremental:
+        treinar_incremental(store, spec)
+    else:
+        # Extrair features (padrão: sequência achatada, 30x63 = 1890 features)
+        X, y = extrair_features(store.X, spec), store.y   # X do store: (n, 30, 63), mapeado do disco
+        print(f"[INFO] Features: {spec} -> {X.shape[1]} por amostra")
 
-# Salvar
-joblib.dump(modelo, "modelo_libras.pkl")
-print("[INFO] Modelo salvo como modelo_libras.pkl")
+        if args.busca:
+            modelo = treinar_com_busca(X, y, spec, args)
+        else:
+            modelo = treinar_padrao(X, y, spec, store.X, args.aumentar)
+        registrar_versao(store, modelo, 'busca' if args.busca else 'completo', 0,
+                         copias_aumentadas=0 if args.busca else args.aumentar)
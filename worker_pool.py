@@ -0,0 +1,131 @@
+"""
+Pool de processos para o processamento de frames do Libras Bridge
+Decodificação, MediaPipe e predição rodam fora do loop de eventos;
+cada processo mantém seus próprios rastreadores Hands e sua cópia do modelo
+"""
+
+import itertools
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+# Estado de cada processo do pool (inicializado em _inicializar_worker)
+_hands_pool = None
+_modelo = None
+
+
+def _inicializar_worker(model_path, hands_pool_size, hands_idle_timeout, artifact_path, usar_gate,
+                        usar_roi):
+    global _hands_pool, _modelo
+    from forest_engine import carregar_modelo
+    from hands_pool import HandsPool
+    from motion_gate import MotionGate
+
+    _hands_pool = HandsPool(max_size=hands_pool_size, idle_timeout=hands_idle_timeout,
+                            gate_factory=MotionGate.da_config if usar_gate else None,
+                            usar_roi=usar_roi)
+    try:
+        _modelo = carregar_modelo(model_path, artifact_path)
+    except Exception as e:
+        print(f"[ERRO] Worker {os.getpid()}: falha ao carregar modelo: {e}")
+        _modelo = None
+    print(f"[INFO] Worker {os.getpid()} pronto")
+
+
+def _processar_frame(chave, imagem):
+    """Executado no worker: JPEG (bytes ou base64) -> RGB -> landmarks"""
+    from pipeline import decodificar_imagem
+
+    rgb = decodificar_imagem(imagem)
+    try:
+        return {'ok': True, 'coords': _hands_pool.acquire(chave).process(rgb)}
+    except Exception as e:
+        print(f"[ERRO] Worker {os.getpid()}: falha no MediaPipe: {e}")
+        # Descartar o detector em caso de erro de contexto GL; o próximo
+        # frame da sessão recebe uma instância nova
+        _hands_pool.discard(chave)
+        return {'ok': False, 'coords': None}
+
+
+def _liberar_sessao(chave):
+    _hands_pool.release(chave)
+
+
+def _estatisticas_hands(por_sessao):
+    return _hands_pool.get_stats(por_sessao)
+
+
+def _prever(X):
+    """Executado no worker: predição com a cópia local do modelo"""
+    if _modelo is None:
+        raise RuntimeError("Modelo não carregado no worker")
+    return _modelo.predict(X)
+
+
+class FrameWorkerPool:
+    def __init__(self, model_path, num_workers=0, async_mode='threading',
+                 hands_pool_size=32, hands_idle_timeout=120.0, artifact_path=None,
+                 usar_gate=False, usar_roi=False):
+        """
+        num_workers: 0 usa um processo por núcleo
+        async_mode: modo do Flask-SocketIO, para esperar sem travar o loop
+        hands_pool_size / hands_idle_timeout: limites do HandsPool de cada worker
+        artifact_path: artefato compilado (model_artifact.py), se existir
+        usar_gate: filtro de movimento/presença (motion_gate.py) em cada sessão
+        usar_roi: processar só a região da mão do frame anterior
+        """
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.async_mode = async_mode
+        # Um executor de processo único por worker: os frames de uma sessão
+        # vão sempre para o mesmo processo, onde está o seu rastreador.
+        # spawn: cada worker inicia limpo (MediaPipe não é seguro após fork)
+        contexto = multiprocessing.get_context('spawn')
+        self.executores = [
+            ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=contexto,
+                initializer=_inicializar_worker,
+                initargs=(model_path, hands_pool_size, hands_idle_timeout, artifact_path, usar_gate,
+                          usar_roi)
+            )
+            for _ in range(self.num_workers)
+        ]
+        self._proximo = itertools.cycle(self.executores)
+        print(f"[INFO] Pool de processos criado com {self.num_workers} workers")
+
+    def _executor_da_sessao(self, chave):
+        return self.executores[zlib.crc32(str(chave).encode()) % self.num_workers]
+
+    def _aguardar(self, future):
+        # Com eventlet, a espera bloqueante vai para uma thread nativa,
+        # liberando o loop de eventos para os outros sockets
+        if self.async_mode == 'eventlet':
+            from eventlet import tpool
+            return tpool.execute(future.result)
+        return future.result()
+
+    def process_frame(self, chave, imagem):
+        """
+        imagem: JPEG em bytes ou em base64
+        Retorna {'ok': bool, 'coords': lista de 63 floats ou None}
+        """
+        executor = self._executor_da_sessao(chave)
+        return self._aguardar(executor.submit(_processar_frame, chave, imagem))
+
+    def release(self, chave):
+        """Libera o rastreador da sessão para reconexão (sem esperar)"""
+        self._executor_da_sessao(chave).submit(_liberar_sessao, chave)
+
+    def predict(self, X):
+        # Predições não dependem da sessão: distribuir entre os workers
+        return self._aguardar(next(self._proximo).submit(_prever, X))
+
+    def hands_stats(self, por_sessao=False):
+        """Estatísticas de HandsPool de cada worker"""
+        futures = [executor.submit(_estatisticas_hands, por_sessao) for executor in self.executores]
+        return [self._aguardar(future) for future in futures]
+
+    def shutdown(self):
+        for executor in self.executores:
+            executor.shutdown(wait=False, cancel_futures=True)